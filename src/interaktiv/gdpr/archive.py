@@ -0,0 +1,217 @@
+import gzip
+import json
+from bisect import bisect_right
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from typing import IO
+
+from BTrees.LOBTree import LOBTree
+from persistent import Persistent
+from plone import api
+from ZODB.blob import Blob
+from zope.annotation.interfaces import IAnnotations
+
+from interaktiv.gdpr.registry.deletion_log import TDeletionLogEntry
+from interaktiv.gdpr.storage import (
+    DeletionLogRecord,
+    DeletionLogStorage,
+    datetime_to_timestamp,
+    get_partition_key,
+    timestamp_to_datetime,
+)
+
+DELETION_LOG_ARCHIVE_ANNOTATION_KEY = "interaktiv.gdpr.deletion_log_archive"
+
+# Number of entries compressed into one gzip member of a segment. Every
+# member start is a point of the sparse index.
+ENTRIES_PER_MEMBER = 1000
+
+# Entries in these statuses are still needed by the marked deletion and
+# are never archived
+UNARCHIVED_STATUSES = ("pending",)
+
+# Maximum number of entries of a segment written by a rotation. Every
+# partition is archived in segments of at most this many entries, so a
+# rotation never holds more records in memory.
+MAX_SEGMENT_ENTRIES = 10000
+
+
+class DeletionLogArchiveSegment(Persistent):
+    """An immutable, compressed segment of archived deletion log entries.
+
+    The entries are stored ordered by datetime as JSON Lines in a blob,
+    compressed as a sequence of gzip members of ENTRIES_PER_MEMBER entries.
+    The sparse index holds the timestamp of the first entry and the byte
+    offset of each member, so reading a time window only decompresses the
+    members from the one containing its start.
+    """
+
+    def __init__(self, records: list[DeletionLogRecord]) -> None:
+        self.blob = Blob()
+        self.count = len(records)
+        self.first_timestamp = records[0].get_timestamp()
+        self.last_timestamp = records[-1].get_timestamp()
+
+        sparse_index = []
+        with self.blob.open("w") as blob_file:
+            for start in range(0, len(records), ENTRIES_PER_MEMBER):
+                chunk = records[start : start + ENTRIES_PER_MEMBER]
+                sparse_index.append((chunk[0].get_timestamp(), blob_file.tell()))
+                with gzip.GzipFile(fileobj=blob_file, mode="wb", mtime=0) as member:
+                    for record in chunk:
+                        line = json.dumps(record.to_dict(), ensure_ascii=False)
+                        member.write(line.encode("utf-8") + b"\n")
+            self.size = blob_file.tell()
+        self.sparse_index = tuple(sparse_index)
+
+    def open(self) -> IO[bytes]:
+        """Open the raw gzip compressed JSON Lines data for reading."""
+        return self.blob.open("r")
+
+    def overlaps(self, since: int | None = None, until: int | None = None) -> bool:
+        if since is not None and self.last_timestamp < since:
+            return False
+        if until is not None and self.first_timestamp > until:
+            return False
+        return True
+
+    def iter_entries(
+        self, since: int | None = None, until: int | None = None
+    ) -> Iterator[TDeletionLogEntry]:
+        """Stream the entries logged within [since, until] (timestamps)."""
+        offset = 0
+        if since is not None:
+            member_timestamps = [timestamp for timestamp, _offset in self.sparse_index]
+            position = max(0, bisect_right(member_timestamps, since) - 1)
+            offset = self.sparse_index[position][1]
+
+        with self.open() as blob_file:
+            blob_file.seek(offset)
+            with gzip.GzipFile(fileobj=blob_file, mode="rb") as lines:
+                for line in lines:
+                    entry = json.loads(line)
+                    timestamp = datetime_to_timestamp(entry["datetime"])
+                    if since is not None and timestamp < since:
+                        continue
+                    if until is not None and timestamp > until:
+                        return
+                    yield entry
+
+    def info(self) -> dict:
+        return {
+            "count": self.count,
+            "first": timestamp_to_datetime(self.first_timestamp).isoformat(),
+            "last": timestamp_to_datetime(self.last_timestamp).isoformat(),
+            "size": self.size,
+        }
+
+
+class DeletionLogArchive(Persistent):
+    """The archived part of the deletion log, kept apart from the hot log.
+
+    Segments are keyed by the timestamp of their first entry.
+    """
+
+    def __init__(self) -> None:
+        self.segments = LOBTree()
+
+    def __len__(self) -> int:
+        return sum(segment.count for segment in self.segments.values())
+
+    def add_segment(self, records: Iterable[DeletionLogRecord]) -> int | None:
+        records = sorted(records, key=lambda record: record.get_timestamp())
+        if not records:
+            return None
+
+        segment = DeletionLogArchiveSegment(records)
+        segment_id = segment.first_timestamp
+        while segment_id in self.segments:
+            segment_id += 1
+        self.segments[segment_id] = segment
+        return segment_id
+
+    def get_segment(self, segment_id: int) -> DeletionLogArchiveSegment | None:
+        return self.segments.get(segment_id)
+
+    def rotate(self, storage: DeletionLogStorage, cutoff: datetime) -> int:
+        """Move the entries logged and last changed before cutoff from the
+        storage into new segments, except those in UNARCHIVED_STATUSES.
+
+        Every partition is archived in segments of at most
+        MAX_SEGMENT_ENTRIES entries. Returns the number of archived entries.
+        """
+        cutoff_timestamp = datetime_to_timestamp(cutoff)
+        cutoff_partition_key = get_partition_key(cutoff)
+
+        archived = 0
+        for partition_key in storage.partition_keys():
+            # Entries without a parseable datetime live in partition 0 and
+            # are never archived
+            if not partition_key:
+                continue
+            if partition_key > cutoff_partition_key:
+                break
+
+            entry_ids = _get_archivable_ids(storage, partition_key, cutoff_timestamp)
+            for start in range(0, len(entry_ids), MAX_SEGMENT_ENTRIES):
+                chunk = entry_ids[start : start + MAX_SEGMENT_ENTRIES]
+                self.add_segment(storage.get(entry_id) for entry_id in chunk)
+                for entry_id in chunk:
+                    storage.remove(entry_id)
+                archived += len(chunk)
+
+        if archived:
+            storage.remove_empty_partitions(before=cutoff_partition_key)
+        return archived
+
+    def search(
+        self,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        uid: str | None = None,
+        status: str | None = None,
+    ) -> Iterator[TDeletionLogEntry]:
+        """Stream the archived entries matching all given criteria."""
+        since_timestamp = datetime_to_timestamp(since) if since else None
+        until_timestamp = datetime_to_timestamp(until) if until else None
+
+        for segment in self.segments.values():
+            if not segment.overlaps(since_timestamp, until_timestamp):
+                continue
+            for entry in segment.iter_entries(since_timestamp, until_timestamp):
+                if uid is not None and entry.get("uid") != uid:
+                    continue
+                if status is not None and entry.get("status") != status:
+                    continue
+                yield entry
+
+
+def _get_archivable_ids(
+    storage: DeletionLogStorage, partition_key: int, cutoff_timestamp: int
+) -> list[int]:
+    entry_ids = []
+    for entry_id, record in storage.items_of_partition(partition_key):
+        timestamp = record.get_timestamp()
+        changed = record.get_timestamp("status_changed")
+        if (
+            record.get("status") not in UNARCHIVED_STATUSES
+            and timestamp is not None
+            and timestamp < cutoff_timestamp
+            and (changed is None or changed < cutoff_timestamp)
+        ):
+            entry_ids.append(entry_id)
+        # Only the ids are kept, the records are loaded again per segment
+        record._p_deactivate()
+    return entry_ids
+
+
+def get_deletion_log_archive(create: bool = False) -> DeletionLogArchive | None:
+    portal = api.portal.get()
+    annotations = IAnnotations(portal)
+    archive = annotations.get(DELETION_LOG_ARCHIVE_ANNOTATION_KEY)
+
+    if archive is None and create:
+        archive = DeletionLogArchive()
+        annotations[DELETION_LOG_ARCHIVE_ANNOTATION_KEY] = archive
+
+    return archive
@@ -1,2 +1,3 @@
 MARKED_FOR_DELETION_CONTAINER_ID = "marked-for-deletion"
 MARKED_FOR_DELETION_REQUEST_PARAM_NAME = "mark_for_deletion"
+DELETION_LOG_STATUSES = ("pending", "deleted", "withdrawn")
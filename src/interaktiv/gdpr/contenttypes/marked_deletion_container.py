@@ -10,3 +10,8 @@ class IMarkedDeletionContainer(IFolderishDocument):
 @implementer(IMarkedDeletionContainer)
 class MarkedDeletionContainer(FolderishDocument):
     """ . """
+
+    # Items are stored under their UID, see interaktiv.gdpr.move. Without
+    # an order adding and removing them does not depend on the number of
+    # items in the container.
+    _ordering = "unordered"
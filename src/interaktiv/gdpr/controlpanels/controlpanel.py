@@ -1,11 +1,12 @@
 from datetime import datetime, timedelta
 
 from plone import api
+from plone.memoize.view import memoize
 from Products.Five.browser import BrowserView
 from Products.Five.browser.pagetemplatefile import ViewPageTemplateFile
 
 from interaktiv.gdpr.deletion_log import DeletionLog
-from interaktiv.gdpr.registry.deletion_log import IGDPRSettingsSchema, TDeletionLogEntry
+from interaktiv.gdpr.settings import GDPRSettings, get_gdpr_settings
 
 
 class ControlpanelView(BrowserView):
@@ -19,7 +20,8 @@ class ControlpanelView(BrowserView):
             return ""
 
         try:
-            dt = datetime.fromisoformat(iso_datetime)
+            # Log times are in UTC, shown in the time zone of the server
+            dt = datetime.fromisoformat(iso_datetime).astimezone()
             lang = self.request.get("LANGUAGE", "de")
 
             if lang == "de":
@@ -35,7 +37,8 @@ class ControlpanelView(BrowserView):
             return ""
 
         try:
-            dt = datetime.fromisoformat(iso_datetime)
+            # Log times are in UTC, shown in the time zone of the server
+            dt = datetime.fromisoformat(iso_datetime).astimezone()
             scheduled_date = dt + timedelta(days=self.get_retention_days())
             lang = self.request.get("LANGUAGE", "de")
 
@@ -47,38 +50,28 @@ class ControlpanelView(BrowserView):
         except (ValueError, TypeError):
             return ""
 
-    @staticmethod
-    def get_retention_days() -> int:
-        return DeletionLog.get_retention_days()
+    @memoize
+    def get_settings(self) -> GDPRSettings:
+        return get_gdpr_settings()
 
-    @staticmethod
-    def is_feature_enabled() -> bool:
-        # noinspection PyUnresolvedReferences
-        try:
-            return api.portal.get_registry_record(
-                name="marked_deletion_enabled", interface=IGDPRSettingsSchema
-            )
-        except (KeyError, api.exc.InvalidParameterError):
-            return True
+    def get_retention_days(self) -> int:
+        return self.get_settings().retention_days
 
-    @staticmethod
-    def is_deletion_log_enabled() -> bool:
-        return DeletionLog.is_deletion_log_enabled()
+    def is_feature_enabled(self) -> bool:
+        return self.get_settings().marked_deletion_enabled
 
-    @staticmethod
-    def get_display_days() -> int:
-        return DeletionLog.get_display_days()
+    def is_deletion_log_enabled(self) -> bool:
+        return self.get_settings().deletion_log_enabled
 
-    @staticmethod
-    def get_pending_entries() -> list[TDeletionLogEntry]:
-        return DeletionLog.get_entries_by_status("pending")
+    def get_display_days(self) -> int:
+        return self.get_settings().display_days
 
-    @staticmethod
-    def get_deletion_log_for_display() -> list[TDeletionLogEntry]:
-        return DeletionLog.get_deletion_log_for_display()
+    def get_archive_days(self) -> int:
+        return self.get_settings().archive_days
 
-    def get_pending_count(self) -> int:
-        return len(self.get_pending_entries())
+    @staticmethod
+    def get_pending_count() -> int:
+        return DeletionLog.count_entries_by_status("pending")
 
     @staticmethod
     def get_datatables_language_url() -> str:
@@ -0,0 +1,167 @@
+import json
+from datetime import datetime, timedelta
+from html import escape
+from typing import Any
+
+from zope.i18n import translate
+
+from interaktiv.gdpr import _
+from interaktiv.gdpr.controlpanels.controlpanel import ControlpanelView
+from interaktiv.gdpr.deletion_log import DeletionLog
+from interaktiv.gdpr.registry.deletion_log import TDeletionLogEntry
+from interaktiv.gdpr.services.log.get import MAX_PAGE_SIZE
+
+# Deletion log field each column of the tables is sorted on. The date
+# columns follow the time order of the log, columns missing here are not
+# sortable.
+PENDING_SORT_COLUMNS = {
+    1: "portal_type",
+    2: "original_path",
+    3: "user_id",
+    4: "datetime",
+    5: "datetime",
+}
+LOG_SORT_COLUMNS = {
+    1: "portal_type",
+    2: "original_path",
+    3: "user_id",
+    4: "datetime",
+    8: "status",
+}
+
+STATUS_LABELS = {
+    "pending": _("status_pending", default="Pending"),
+    "deleted": _("status_deleted", default="Deleted"),
+    "withdrawn": _("status_withdrawn", default="Withdrawn"),
+}
+
+
+class ControlpanelDataView(ControlpanelView):
+    """Server side data source of the tables of the control panel.
+
+    Implements the server side processing protocol of DataTables: paging,
+    sorting and searching are done by querying the deletion log, only the
+    rows of the requested page are read and rendered.
+    """
+
+    def __call__(self) -> str:
+        if self.request.get("table") == "log":
+            result = self.get_table_data(
+                {"since": datetime.now() - timedelta(days=self.get_display_days())},
+                LOG_SORT_COLUMNS,
+                self._render_log_row,
+            )
+        else:
+            result = self.get_table_data(
+                {"status": "pending"}, PENDING_SORT_COLUMNS, self._render_pending_row
+            )
+
+        self.request.response.setHeader("Content-Type", "application/json")
+        return json.dumps(result)
+
+    def _get_int_param(self, name: str, default: int) -> int:
+        try:
+            return int(self.request.get(name, default))
+        except (ValueError, TypeError):
+            return default
+
+    def _get_search_criteria(self) -> dict[str, str]:
+        search = self.request.get("search[value]", "")
+        if not search or not isinstance(search, str):
+            return {}
+        # Paths are matched as prefix, anything else in the title
+        if search.startswith("/"):
+            return {"path": search}
+        return {"title": search}
+
+    def _get_sort_criteria(self, sort_columns: dict[int, str]) -> dict[str, Any]:
+        sort_on = sort_columns.get(self._get_int_param("order[0][column]", -1))
+        criteria: dict[str, Any] = {
+            "reverse": self.request.get("order[0][dir]") == "desc"
+        }
+        if sort_on is not None and sort_on != "datetime":
+            criteria["sort_on"] = sort_on
+        return criteria
+
+    def get_table_data(
+        self,
+        criteria: dict[str, Any],
+        sort_columns: dict[int, str],
+        render_row: Any,
+    ) -> dict[str, Any]:
+        start = max(0, self._get_int_param("start", 0))
+        length = self._get_int_param("length", 10)
+        # DataTables asks for all rows with -1
+        size = MAX_PAGE_SIZE if length < 0 else min(length, MAX_PAGE_SIZE)
+
+        search_criteria = self._get_search_criteria()
+        filtered, entries = DeletionLog.search_deletion_log(
+            start=start,
+            size=size,
+            **criteria,
+            **search_criteria,
+            **self._get_sort_criteria(sort_columns),
+        )
+        total = filtered
+        if search_criteria:
+            total = DeletionLog.count_deletion_log(**criteria)
+
+        return {
+            "draw": self._get_int_param("draw", 0),
+            "recordsTotal": total,
+            "recordsFiltered": filtered,
+            "data": [render_row(entry) for entry in entries],
+        }
+
+    def _translate(self, message: str) -> str:
+        return translate(message, context=self.request)
+
+    def _render_status(self, status: str) -> str:
+        label = STATUS_LABELS.get(status)
+        if label is None:
+            return escape(status)
+        return f'<span class="status-{status}">{escape(self._translate(label))}</span>'
+
+    def _render_actions(self, entry: TDeletionLogEntry) -> str:
+        arguments = ", ".join(
+            json.dumps(entry.get(name, ""))
+            for name in ("uid", "title", "original_path")
+        )
+        withdraw = self._translate(_("button_withdraw", default="Withdraw"))
+        delete = self._translate(_("button_delete", default="Delete"))
+        return (
+            '<div class="action-buttons">'
+            f'<button type="button" class="btn btn-sm btn-withdraw" '
+            f'onclick="{escape(f"showWithdrawModal({arguments})")}">'
+            f"{escape(withdraw)}</button>"
+            f'<button type="button" class="btn btn-sm btn-delete" '
+            f'onclick="{escape(f"showDeleteModal({arguments})")}">'
+            f"{escape(delete)}</button>"
+            "</div>"
+        )
+
+    def _render_pending_row(self, entry: TDeletionLogEntry) -> list[str]:
+        return [
+            escape(str(entry.get("title", ""))),
+            escape(str(entry.get("portal_type", ""))),
+            escape(str(entry.get("original_path", ""))),
+            escape(str(entry.get("user_id", ""))),
+            escape(self.format_datetime(entry.get("datetime"))),
+            escape(self.get_scheduled_deletion_date(entry.get("datetime"))),
+            escape(str(entry.get("subobject_count", ""))),
+            escape(str(entry.get("review_state", ""))),
+            self._render_actions(entry),
+        ]
+
+    def _render_log_row(self, entry: TDeletionLogEntry) -> list[str]:
+        return [
+            escape(str(entry.get("title", ""))),
+            escape(str(entry.get("portal_type", ""))),
+            escape(str(entry.get("original_path", ""))),
+            escape(str(entry.get("user_id", ""))),
+            escape(self.format_datetime(entry.get("datetime"))),
+            escape(str(entry.get("subobject_count", ""))),
+            escape(self.format_datetime(entry.get("status_changed"))),
+            escape(str(entry.get("status_changed_by", ""))),
+            self._render_status(entry.get("status", "")),
+        ]
@@ -1,46 +1,156 @@
-from datetime import datetime, timedelta
+from collections.abc import Iterable, Iterator
+from datetime import datetime, timedelta, timezone
+from typing import Any
 
+import transaction
 from plone import api
 from plone.dexterity.content import DexterityContent
 
 from interaktiv.gdpr import logger
+from interaktiv.gdpr.archive import get_deletion_log_archive
 from interaktiv.gdpr.config import MARKED_FOR_DELETION_CONTAINER_ID
-from interaktiv.gdpr.registry.deletion_log import (
-    IDeletionLogSchema,
-    IGDPRSettingsSchema,
-    TDeletionLogEntry,
+from interaktiv.gdpr.interfaces import IMarkedForDeletion
+from interaktiv.gdpr.purge import purge
+from interaktiv.gdpr.registry.deletion_log import TDeletionLogEntry
+from interaktiv.gdpr.resolver import get_object_by_uid, resolve_uids
+from interaktiv.gdpr.scheduled_deletion import ScheduledDeletionRun
+from interaktiv.gdpr.settings import get_gdpr_settings
+from interaktiv.gdpr.storage import (
+    MIN_DATED_ENTRY_ID,
+    DeletionLogRecord,
+    DeletionLogStorage,
+    datetime_to_timestamp,
+    get_deletion_log_storage,
+    timestamp_to_datetime,
 )
-from interaktiv.gdpr.utils import get_registry_setting
+from interaktiv.gdpr.virtual_deletion import is_virtual_mode
+
+# Number of entries after which iter_search_deletion_log() reduces the
+# pickle cache
+CACHE_GC_INTERVAL = 1000
 
 
 class DeletionLog:
 
     @staticmethod
     def get_deletion_log() -> list[TDeletionLogEntry]:
-        return (
-            api.portal.get_registry_record(
-                name="deletion_log", interface=IDeletionLogSchema
-            )
-            or []
-        )
+        storage = get_deletion_log_storage()
+        if storage is None:
+            return []
+        return [record.to_dict() for record in storage.values()]
 
     @staticmethod
     def set_deletion_log(log: list[TDeletionLogEntry]) -> None:
-        api.portal.set_registry_record(
-            name="deletion_log", interface=IDeletionLogSchema, value=log
-        )
+        storage = get_deletion_log_storage(create=True)
+        storage.clear()
+        for entry in log:
+            storage.append(entry)
+
+    @staticmethod
+    def get_deletion_log_length() -> int:
+        storage = get_deletion_log_storage()
+        return len(storage) if storage is not None else 0
+
+    @staticmethod
+    def iter_search_deletion_log(**criteria: Any) -> Iterator[TDeletionLogEntry]:
+        """Yield all entries matching the criteria of search_deletion_log().
+
+        Each record is turned back into a ghost once it is read and the
+        pickle cache is reduced regularly, so iterating the whole log needs
+        bounded memory. Without criteria the partitions are walked lazily.
+        """
+        storage = get_deletion_log_storage()
+        if storage is None:
+            return
+
+        if criteria:
+            records = (storage.get(entry_id) for entry_id in storage.query(**criteria))
+        else:
+            records = storage.values()
+
+        for number, record in enumerate(records, 1):
+            entry = record.to_dict()
+            record._p_deactivate()
+            yield entry
+            if number % CACHE_GC_INTERVAL == 0 and storage._p_jar is not None:
+                storage._p_jar.cacheGC()
+
+    @staticmethod
+    def get_deletion_log_version() -> tuple[int, float]:
+        """Return a counter changed by every write to the log and the time
+        of the last write in seconds since the epoch."""
+        storage = get_deletion_log_storage()
+        if storage is None:
+            return 0, 0.0
+        return storage.version.counter, storage.version.modified
+
+    @staticmethod
+    def iter_deletion_log(
+        start: int = 0, since: datetime | None = None
+    ) -> Iterator[TDeletionLogEntry]:
+        storage = get_deletion_log_storage()
+        if storage is None:
+            return
+        for record in storage.values(start=start, since=since):
+            yield record.to_dict()
+
+    @staticmethod
+    def search_deletion_log(
+        start: int = 0, size: int | None = None, **criteria: Any
+    ) -> tuple[int, list[TDeletionLogEntry]]:
+        """Search the deletion log, see DeletionLogStorage.query() for the
+        criteria.
+
+        Returns the total number of matching entries and the entries from
+        start to start + size. Only the ids up to the end of the page are
+        read and only the records of the page are loaded, the total is
+        counted from the indexes unless a title is searched.
+        """
+        storage = get_deletion_log_storage()
+        if storage is None:
+            return 0, []
+        if criteria.get("title"):
+            # Matching the title reads the records anyway
+            entry_ids = storage.query(**criteria)
+            total = len(entry_ids)
+        else:
+            limit = None if size is None else start + size
+            entry_ids = storage.query(**criteria, limit=limit)
+            total = DeletionLog.count_deletion_log(**criteria)
+        end = None if size is None else start + size
+        return total, [
+            storage.get(entry_id).to_dict() for entry_id in entry_ids[start:end]
+        ]
+
+    @staticmethod
+    def count_deletion_log(**criteria: Any) -> int:
+        """Return the number of entries matching the criteria, see
+        DeletionLogStorage.count(). The order criteria are ignored."""
+        storage = get_deletion_log_storage()
+        if storage is None:
+            return 0
+        for name in ("sort_on", "reverse"):
+            criteria.pop(name, None)
+        if criteria.get("title"):
+            return len(storage.query(**criteria))
+        criteria.pop("title", None)
+        return storage.count(**criteria)
 
     @staticmethod
     def is_deletion_log_enabled() -> bool:
-        return get_registry_setting("deletion_log_enabled", IGDPRSettingsSchema, False)
+        return get_gdpr_settings().deletion_log_enabled
 
     @staticmethod
     def get_display_days() -> int:
-        return get_registry_setting("display_days", IGDPRSettingsSchema, 90)
+        return get_gdpr_settings().display_days
 
     @staticmethod
     def get_retention_days() -> int:
-        return get_registry_setting("retention_days", IGDPRSettingsSchema, 30)
+        return get_gdpr_settings().retention_days
+
+    @staticmethod
+    def get_archive_days() -> int:
+        return get_gdpr_settings().archive_days
 
     @classmethod
     def get_deletion_log_for_display(
@@ -49,17 +159,21 @@ class DeletionLog:
         if days is None:
             days = cls.get_display_days()
 
-        log = cls.get_deletion_log()
         cutoff_date = datetime.now() - timedelta(days=days)
+        cutoff_timestamp = datetime_to_timestamp(cutoff_date)
 
-        filtered_entries = []
-        for entry in log:
-            try:
-                entry_date = datetime.fromisoformat(entry.get("datetime", ""))
-                if entry_date >= cutoff_date:
-                    filtered_entries.append(entry)
-            except (ValueError, TypeError):
-                filtered_entries.append(entry)
+        storage = get_deletion_log_storage()
+        if storage is None:
+            return []
+
+        # Entries without a parseable datetime are always shown. They are
+        # kept in partition 0, before all partitions found by since.
+        filtered_entries = [
+            record.to_dict() for _entry_id, record in storage.items_of_partition(0)
+        ]
+        for record in storage.values(since=cutoff_date):
+            if record.get_timestamp() >= cutoff_timestamp:
+                filtered_entries.append(record.to_dict())
 
         return filtered_entries
 
@@ -67,16 +181,48 @@ class DeletionLog:
     def add_entry(
         cls, obj: DexterityContent, status: str = "pending"
     ) -> TDeletionLogEntry | None:
+        entries = cls.add_entries([obj], status=status)
+        return entries[0] if entries else None
+
+    @classmethod
+    def add_entries(
+        cls, objs: Iterable[DexterityContent], status: str = "pending"
+    ) -> list[TDeletionLogEntry]:
+        """Add a log entry for each object and write them at once."""
         if not cls.is_deletion_log_enabled():
             logger.debug("Deletion log feature is disabled, skipping log entry")
-            return None
+            return []
 
-        uid = obj.UID()
-        log = cls.get_deletion_log()
-        now = datetime.now().isoformat()
+        now = datetime.now(timezone.utc).isoformat()
         current_user = api.user.get_current()
         user_id = current_user.getId() if current_user else "system"
 
+        entries = [cls._create_entry(obj, status, now, user_id) for obj in objs]
+        if not entries:
+            return []
+
+        storage = get_deletion_log_storage(create=True)
+        for entry in entries:
+            storage.append(entry)
+
+            logger.info(
+                f"Deletion log entry added:\n"
+                f"  UID: {entry['uid']}\n"
+                f"  Title: {entry['title']}\n"
+                f"  Portal Type: {entry['portal_type']}\n"
+                f"  Original Path: {entry['original_path']}\n"
+                f"  User: {entry['user_id']}\n"
+                f"  Subobject Count: {entry['subobject_count']}\n"
+                f"  Review State: {entry['review_state']}\n"
+                f"  Status: {entry['status']}"
+            )
+
+        return entries
+
+    @staticmethod
+    def _create_entry(
+        obj: DexterityContent, status: str, now: str, user_id: str
+    ) -> TDeletionLogEntry:
         try:
             review_state = api.content.get_state(obj)
         except Exception:
@@ -87,8 +233,8 @@ class DeletionLog:
         except (AttributeError, TypeError):
             subobject_count = 0
 
-        entry: TDeletionLogEntry = {
-            "uid": uid,
+        return {
+            "uid": obj.UID(),
             "datetime": now,
             "title": obj.title_or_id(),
             "portal_type": obj.portal_type,
@@ -101,109 +247,265 @@ class DeletionLog:
             "status_changed_by": user_id,
         }
 
-        log.append(entry)
-        cls.set_deletion_log(log)
-
-        logger.info(
-            f"Deletion log entry added:\n"
-            f"  UID: {entry['uid']}\n"
-            f"  Title: {entry['title']}\n"
-            f"  Portal Type: {entry['portal_type']}\n"
-            f"  Original Path: {entry['original_path']}\n"
-            f"  User: {entry['user_id']}\n"
-            f"  Subobject Count: {entry['subobject_count']}\n"
-            f"  Review State: {entry['review_state']}\n"
-            f"  Status: {entry['status']}"
-        )
-
-        return entry
-
     @classmethod
     def update_entry_status(cls, uid: str, new_status: str) -> TDeletionLogEntry | None:
+        entries = cls.update_entries_status([uid], new_status)
+        return entries[0] if entries else None
+
+    @classmethod
+    def update_entries_status(
+        cls, uids: Iterable[str], new_status: str
+    ) -> list[TDeletionLogEntry]:
+        """Change the status of the pending entries of all given UIDs.
+
+        UIDs without a pending entry are ignored. Returns the changed
+        entries.
+        """
         if not cls.is_deletion_log_enabled():
             logger.debug("Deletion log feature is disabled, skipping status update")
-            return None
+            return []
 
-        log = cls.get_deletion_log()
-        now = datetime.now().isoformat()
+        storage = get_deletion_log_storage()
+        if storage is None:
+            return []
+
+        now = datetime.now(timezone.utc).isoformat()
         current_user = api.user.get_current()
         user_id = current_user.getId() if current_user else "system"
 
-        for entry in reversed(log):
-            if entry["uid"] == uid and entry["status"] == "pending":
-                old_status = entry["status"]
-                entry["status"] = new_status
-                entry["status_changed"] = now
-                entry["status_changed_by"] = user_id
-                cls.set_deletion_log(log)
+        entries = []
+        for uid in dict.fromkeys(uids):
+            entry_id = cls._find_pending_entry_id(storage, uid)
+            if entry_id is None:
+                continue
+            storage.update(
+                entry_id,
+                status=new_status,
+                status_changed=now,
+                status_changed_by=user_id,
+            )
+            entries.append(storage.get(entry_id).to_dict())
 
-                logger.info(
-                    f"Deletion log entry status updated:\n"
-                    f"  UID: {uid}\n"
-                    f"  Title: {entry['title']}\n"
-                    f"  Old Status: {old_status}\n"
-                    f"  New Status: {new_status}\n"
-                    f"  Changed by: {user_id}"
-                )
-                return entry
+        if entries:
+            logger.info(
+                f"Deletion log status of {len(entries)} entries changed to "
+                f"{new_status} by {user_id}: "
+                f"{', '.join(entry['uid'] for entry in entries)}"
+            )
+        return entries
 
+    @staticmethod
+    def _find_pending_entry_id(storage: DeletionLogStorage, uid: str) -> int | None:
+        for entry_id in reversed(list(storage.get_ids("uid", uid))):
+            if storage.has_id("status", "pending", entry_id):
+                return entry_id
         return None
 
     @classmethod
     def get_entry_by_uid(cls, uid: str) -> TDeletionLogEntry | None:
-        log = cls.get_deletion_log()
-        for entry in log:
-            if entry["uid"] == uid:
-                return entry
-        return None
+        storage = get_deletion_log_storage()
+        if storage is None:
+            return None
+        entry_id = next(iter(storage.get_ids("uid", uid)), None)
+        if entry_id is None:
+            return None
+        return storage.get(entry_id).to_dict()
 
     @classmethod
     def get_pending_entry_by_uid(cls, uid: str) -> TDeletionLogEntry | None:
-        log = cls.get_deletion_log()
-        for entry in reversed(log):
-            if entry["uid"] == uid and entry["status"] == "pending":
-                return entry
-        return None
+        storage = get_deletion_log_storage()
+        if storage is None:
+            return None
+        entry_id = cls._find_pending_entry_id(storage, uid)
+        if entry_id is None:
+            return None
+        return storage.get(entry_id).to_dict()
+
+    @classmethod
+    def get_pending_entries_by_uids(
+        cls, uids: Iterable[str]
+    ) -> dict[str, TDeletionLogEntry]:
+        """Return the pending entries of the given UIDs by UID. UIDs without
+        a pending entry are left out."""
+        storage = get_deletion_log_storage()
+        if storage is None:
+            return {}
+
+        entries = {}
+        for uid in dict.fromkeys(uids):
+            entry_id = cls._find_pending_entry_id(storage, uid)
+            if entry_id is not None:
+                entries[uid] = storage.get(entry_id).to_dict()
+        return entries
 
     @classmethod
     def get_entries_by_status(cls, status: str) -> list[TDeletionLogEntry]:
-        log = cls.get_deletion_log()
-        return [entry for entry in log if entry["status"] == status]
+        return [record.to_dict() for record in cls._get_records_by_status(status)]
+
+    @staticmethod
+    def count_entries_by_status(status: str) -> int:
+        storage = get_deletion_log_storage()
+        if storage is None:
+            return 0
+        return storage.count_status(status)
+
+    @staticmethod
+    def repair_status_counts() -> dict[str, int]:
+        """Recompute the per status counters of the deletion log.
+
+        Returns the corrected differences per status.
+        """
+        storage = get_deletion_log_storage()
+        if storage is None:
+            return {}
+        corrected = storage.repair_status_counts()
+        if corrected:
+            logger.warning(f"Repaired deletion log status counters: {corrected}")
+        return corrected
+
+    @staticmethod
+    def _get_records_by_status(status: str) -> list[DeletionLogRecord]:
+        storage = get_deletion_log_storage()
+        if storage is None:
+            return []
+        return [storage.get(entry_id) for entry_id in storage.get_ids("status", status)]
 
     @classmethod
     def get_pending_objects(cls) -> list[DexterityContent]:
-        pending_entries = cls.get_entries_by_status("pending")
+        uids = [record["uid"] for record in cls._get_records_by_status("pending")]
+        brains = resolve_uids(uids)
         objects = []
-        for entry in pending_entries:
-            obj = api.content.get(UID=entry["uid"])
+        for uid in uids:
+            obj = get_object_by_uid(uid) if uid in brains else None
             if obj is not None:
                 objects.append(obj)
         return objects
 
     @classmethod
-    def get_expired_pending_entries(cls) -> list[TDeletionLogEntry]:
-        retention_days = cls.get_retention_days()
-        cutoff_date = datetime.now() - timedelta(days=retention_days)
-        pending_entries = cls.get_entries_by_status("pending")
+    def get_expired_pending_ids(
+        cls, after: int = 0, limit: int | None = None
+    ) -> list[int]:
+        """Return the ids of the expired pending entries in time order.
+
+        Entries are expired when they were logged before the second that
+        lies the retention days back. Entry ids are ordered by time, so
+        these are a range of the pending ids and no record is loaded.
+        Only the ids after the id after are read, at most limit of them.
+        """
+        storage = get_deletion_log_storage()
+        if storage is None:
+            return []
+
+        return storage.query(
+            status="pending",
+            until=cls._get_expiry_cutoff(),
+            min_id=after + 1,
+            limit=limit,
+        )
 
-        expired_entries = []
-        for entry in pending_entries:
-            try:
-                entry_date = datetime.fromisoformat(entry.get("datetime", ""))
-                if entry_date < cutoff_date:
-                    expired_entries.append(entry)
-            except (ValueError, TypeError):
-                logger.warning(f"Could not parse datetime for entry {entry.get('uid')}")
+    @classmethod
+    def count_expired_pending_ids(cls, after: int = 0) -> int:
+        """Return the number of ids get_expired_pending_ids() returns,
+        without listing them."""
+        storage = get_deletion_log_storage()
+        if storage is None:
+            return 0
+
+        return storage.count(
+            status="pending", until=cls._get_expiry_cutoff(), min_id=after + 1
+        )
 
+    @classmethod
+    def _get_expiry_cutoff(cls) -> datetime:
+        cutoff_date = datetime.now() - timedelta(days=cls.get_retention_days())
+        return cutoff_date - timedelta(seconds=1)
+
+    @classmethod
+    def get_next_expiry(cls) -> datetime | None:
+        """Return when the oldest pending entry expires, None without
+        pending entries.
+
+        Expiry follows the order of the entry ids, so only the first
+        pending id and its record are read. A change of the retention days
+        applies at once, there is nothing to re-key.
+        """
+        storage = get_deletion_log_storage()
+        if storage is None:
+            return None
+
+        entry_id = storage.get_first_id("status", "pending", min_id=MIN_DATED_ENTRY_ID)
+        timestamp = None
+        if entry_id is not None:
+            timestamp = storage.get(entry_id).get_timestamp()
+        if timestamp is None:
+            return None
+        logged = timestamp_to_datetime(timestamp)
+        return logged + timedelta(days=cls.get_retention_days())
+
+    @staticmethod
+    def _get_expired_records(entry_ids: Iterable[int]) -> list[DeletionLogRecord]:
+        storage = get_deletion_log_storage()
+        expired_entries = []
+        for entry_id in entry_ids:
+            record = storage.get(entry_id)
+            # Entries without a parseable datetime have the lowest ids
+            if record.get_timestamp() is None:
+                logger.warning(
+                    f"Could not parse datetime for entry {record.get('uid')}"
+                )
+            else:
+                expired_entries.append(record)
         return expired_entries
 
+    @classmethod
+    def get_expired_pending_entries(cls) -> list[DeletionLogRecord]:
+        return cls._get_expired_records(cls.get_expired_pending_ids())
+
+    @classmethod
+    def rotate_deletion_log(cls) -> int:
+        """Move entries older than the archive days into a compressed
+        archive segment. Pending entries stay in the log.
+
+        Returns the number of archived entries.
+        """
+        storage = get_deletion_log_storage()
+        if storage is None:
+            return 0
+
+        archive_days = cls.get_archive_days()
+        cutoff_date = datetime.now() - timedelta(days=archive_days)
+        archived_count = get_deletion_log_archive(create=True).rotate(
+            storage, cutoff_date
+        )
+
+        if archived_count:
+            logger.info(
+                f"Archived {archived_count} deletion log entries older than {archive_days} days"
+            )
+        return archived_count
+
+    @staticmethod
+    def search_archive(
+        since: datetime | None = None,
+        until: datetime | None = None,
+        uid: str | None = None,
+        status: str | None = None,
+    ) -> Iterator[TDeletionLogEntry]:
+        archive = get_deletion_log_archive()
+        if archive is None:
+            return iter(())
+        return archive.search(since=since, until=until, uid=uid, status=status)
+
     @classmethod
     def run_scheduled_deletion(cls) -> int:
         """Run scheduled deletion for expired pending items. Called by cronjob."""
+        cls.rotate_deletion_log()
+
         portal = api.portal.get()
         container = portal.get(MARKED_FOR_DELETION_CONTAINER_ID)
 
-        if not container:
+        # Items marked for deletion in place don't need the container
+        if not container and not is_virtual_mode():
             logger.warning(
                 "MarkedDeletionContainer not found, cannot run scheduled deletion"
             )
@@ -222,27 +524,115 @@ class DeletionLog:
             f"Found {len(expired_entries)} expired pending deletions (retention period: {retention_days} days)"
         )
 
-        deleted_count = 0
+        deleted_count = len(cls._delete_expired_entries(container, expired_entries))
+        logger.info(f"Scheduled deletion completed: {deleted_count} items deleted")
+
+        return deleted_count
+
+    @classmethod
+    def run_scheduled_deletion_batch(
+        cls, run: ScheduledDeletionRun, batch_size: int
+    ) -> int:
+        """Delete the next batch_size expired pending items of the worker
+        of run after its cursor and move the cursor past them.
+
+        Entries of other workers are skipped over, see
+        ScheduledDeletionRun.claims(). Unlike run_scheduled_deletion() this
+        neither rotates the log nor commits, see the
+        @@gdpr-run-scheduled-deletion view. Returns the number of expired
+        entries of all workers left after the batch.
+        """
+        portal = api.portal.get()
+        container = portal.get(MARKED_FOR_DELETION_CONTAINER_ID)
+
+        # Items marked for deletion in place don't need the container
+        if not container and not is_virtual_mode():
+            logger.warning(
+                "MarkedDeletionContainer not found, cannot run scheduled deletion"
+            )
+            return 0
+
+        # The ids after the cursor are read in chunks until the batch of
+        # the worker is full, the records of other workers are released
+        # again after their UID is read
+        storage = get_deletion_log_storage()
+        batch_ids = []
+        cursor = run.cursor
+        while len(batch_ids) < batch_size:
+            entry_ids = cls.get_expired_pending_ids(
+                after=cursor, limit=batch_size * run.workers
+            )
+            if not entry_ids:
+                break
+            for entry_id in entry_ids:
+                cursor = entry_id
+                record = storage.get(entry_id)
+                if run.claims(record.get("uid")):
+                    batch_ids.append(entry_id)
+                    if len(batch_ids) == batch_size:
+                        break
+                else:
+                    record._p_deactivate()
+        if cursor == run.cursor:
+            return 0
+
+        if batch_ids:
+            deleted_uids = cls._delete_expired_entries(
+                container, cls._get_expired_records(batch_ids)
+            )
+            run.batches += 1
+            run.deleted += len(deleted_uids)
+            run.skipped += len(batch_ids) - len(deleted_uids)
+            logger.info(
+                f"Scheduled deletion batch {run.batches}: {len(deleted_uids)} of "
+                f"{len(batch_ids)} items deleted"
+            )
+        run.cursor = cursor
+        return cls.count_expired_pending_ids(after=cursor)
+
+    @classmethod
+    def _delete_expired_entries(
+        cls,
+        container: DexterityContent | None,
+        expired_entries: list[DeletionLogRecord],
+    ) -> list[str]:
+        """Delete the objects of the expired entries from the container or,
+        if marked for deletion in place, from where they are.
+
+        Every object is purged bottom-up with its subtree, see purge().
+        Returns the uids of the entries now marked as deleted.
+        """
+        brains = resolve_uids(entry["uid"] for entry in expired_entries)
+        container_path = (
+            "/".join(container.getPhysicalPath()) if container is not None else None
+        )
+
+        deleted_uids = []
         for entry in expired_entries:
             uid = entry["uid"]
-            obj = api.content.get(UID=uid)
+            brain = brains.get(uid)
 
-            if obj is None:
+            if brain is None:
                 logger.warning(f"Object with UID {uid} not found, marking as deleted")
-                cls.update_entry_status(uid, "deleted")
-                deleted_count += 1
+                deleted_uids.append(uid)
                 continue
 
-            obj_path = "/".join(obj.getPhysicalPath())
-            container_path = "/".join(container.getPhysicalPath())
+            obj = brain._unrestrictedGetObject()
+            in_container = container_path is not None and brain.getPath().startswith(
+                container_path
+            )
 
-            if not obj_path.startswith(container_path):
-                logger.warning(f"Object {uid} is not in deletion container, skipping")
+            if not in_container and not IMarkedForDeletion.providedBy(obj):
+                logger.warning(
+                    f"Object {uid} is neither in deletion container nor marked "
+                    "for deletion in place, skipping"
+                )
                 continue
 
+            # Rolls back the batches of the subtree purged before a failure
+            savepoint = transaction.savepoint(optimistic=True)
             try:
-                obj_id = obj.getId()
-                container.manage_delObjects([obj_id])
+                purge(obj)
 
                 logger.info(
                     f"Object permanently deleted:\n"
@@ -251,12 +641,11 @@ class DeletionLog:
                     f"  Original Path: {entry['original_path']}"
                 )
 
-                cls.update_entry_status(uid, "deleted")
-                deleted_count += 1
+                deleted_uids.append(uid)
 
             except Exception as e:
                 logger.error(f"Error deleting object {uid}: {e}")
+                savepoint.rollback()
 
-        logger.info(f"Scheduled deletion completed: {deleted_count} items deleted")
-
-        return deleted_count
+        cls.update_entries_status(deleted_uids, "deleted")
+        return deleted_uids
@@ -3,3 +3,11 @@ from zope.interface import Interface
 
 class IInteraktivGDPRLayer(Interface):
     """ Interface Layer for Interaktiv GDPR """
+
+
+class IMarkedForDeletion(Interface):
+    """Marker of content marked for deletion in the virtual mode.
+
+    The content and its subtree stay in place but are hidden, see
+    interaktiv.gdpr.virtual_deletion.
+    """
@@ -0,0 +1,450 @@
+import threading
+import uuid
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+
+import transaction
+from Acquisition import aq_parent
+from BTrees.OOBTree import OOBTree
+from persistent import Persistent
+from plone import api
+from plone.dexterity.content import DexterityContent
+from Products.CMFCore.indexing import getQueue
+from Testing.makerequest import makerequest
+from ZODB.POSException import ConflictError
+from zope.annotation.interfaces import IAnnotations
+from zope.component.hooks import setSite
+from zope.globalrequest import clearRequest, getRequest, setRequest
+
+from interaktiv.gdpr import logger
+from interaktiv.gdpr.config import MARKED_FOR_DELETION_REQUEST_PARAM_NAME
+from interaktiv.gdpr.deletion_log import DeletionLog
+from interaktiv.gdpr.move import get_container_key, get_moving_paths
+from interaktiv.gdpr.patches.manage_del_objects import (
+    _original_manage_delObjects,
+    get_marked_deletion_container,
+    is_feature_enabled,
+    should_move_to_container,
+)
+from interaktiv.gdpr.purge import DEFAULT_PURGE_BATCH_SIZE, purge_subtree_batch
+from interaktiv.gdpr.resolver import get_object_by_uid
+from interaktiv.gdpr.settings import get_gdpr_settings
+from interaktiv.gdpr.virtual_deletion import is_virtual_mode
+
+JOBS_ANNOTATION_KEY = "interaktiv.gdpr.jobs"
+JOB_ACTIONS = ("delete", "permanent_deletion")
+JOB_STATUSES = ("queued", "running", "done", "failed")
+# Finished jobs are removed when a new job is queued after this many days
+JOB_KEEP_DAYS = 7
+# Number of items a step of a job deletes or moves
+JOB_BATCH_SIZE = DEFAULT_PURGE_BATCH_SIZE
+# A running job without a committed step for this long was interrupted,
+# e.g. by a restart, and is started again when it is queued again
+JOB_STALE_AFTER = timedelta(minutes=15)
+# How often a step is tried again after a conflict with another transaction
+MAX_CONFLICT_RETRIES = 3
+
+
+class DeletionJob(Persistent):
+    """A deletion of a subtree run by a worker thread, see run_job().
+
+    total is the size of the subtree when the job was queued, progress the
+    number of its items processed so far. mark_for_deletion is the
+    mark_for_deletion request parameter the job was queued with.
+    """
+
+    # Jobs queued before the parameter was kept always marked for deletion
+    mark_for_deletion = True
+
+    def __init__(
+        self, action: str, obj: DexterityContent, user_id: str, total: int
+    ) -> None:
+        self.id = uuid.uuid4().hex
+        self.action = action
+        self.uid = obj.UID()
+        self.title = obj.title_or_id()
+        self.path = "/".join(obj.getPhysicalPath())
+        self.user_id = user_id
+        self.status = "queued"
+        self.progress = 0
+        self.total = total
+        self.created = _now()
+        self.updated = self.created
+        self.started = None
+        self.finished = None
+        self.error = None
+
+    @property
+    def active(self) -> bool:
+        return self.status in ("queued", "running")
+
+    @property
+    def interrupted(self) -> bool:
+        stale = (datetime.now(timezone.utc) - JOB_STALE_AFTER).isoformat()
+        return self.status == "running" and self.updated < stale
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "action": self.action,
+            "uid": self.uid,
+            "title": self.title,
+            "path": self.path,
+            "user_id": self.user_id,
+            "status": self.status,
+            "progress": self.progress,
+            "total": self.total,
+            "created": self.created,
+            "updated": self.updated,
+            "started": self.started,
+            "finished": self.finished,
+            "error": self.error,
+        }
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def get_jobs(create: bool = False) -> OOBTree | None:
+    """Return the jobs of the site by id."""
+    annotations = IAnnotations(api.portal.get())
+    jobs = annotations.get(JOBS_ANNOTATION_KEY)
+
+    if jobs is None and create:
+        jobs = annotations[JOBS_ANNOTATION_KEY] = OOBTree()
+
+    return jobs
+
+
+def get_job(job_id: str) -> DeletionJob | None:
+    jobs = get_jobs()
+    if jobs is None:
+        return None
+    return jobs.get(job_id)
+
+
+def get_subtree_size(obj: DexterityContent) -> int:
+    """Return the number of cataloged items of the subtree of obj."""
+    catalog = api.portal.get_tool("portal_catalog")
+    path = "/".join(obj.getPhysicalPath())
+    return len(catalog.unrestrictedSearchResults(path=path))
+
+
+def should_run_as_job(obj: DexterityContent) -> bool:
+    """Whether the subtree of obj is large enough for a background job."""
+    threshold = get_gdpr_settings().async_threshold
+    return threshold > 0 and get_subtree_size(obj) >= threshold
+
+
+def queue_job(action: str, obj: DexterityContent) -> DeletionJob:
+    """Queue a job for the subtree of obj.
+
+    The worker thread is started once the current transaction is
+    committed. A job of the same action for obj that is not finished yet
+    is returned instead of queueing another one, e.g. for a retried
+    request. Such a job is started again if it was interrupted.
+    """
+    if action not in JOB_ACTIONS:
+        raise ValueError(f"Unknown job action: {action}")
+
+    jobs = get_jobs(create=True)
+    uid = obj.UID()
+    for job in jobs.values():
+        if job.uid == uid and job.action == action and job.active:
+            if job.interrupted:
+                logger.warning(f"Job {job.id} was interrupted, starting it again")
+                job.status = "queued"
+            if job.status == "queued":
+                _start_after_commit_of_transaction(job)
+            return job
+
+    _remove_finished_jobs(jobs)
+
+    current_user = api.user.get_current()
+    job = DeletionJob(action, obj, current_user.getId(), get_subtree_size(obj))
+    job.mark_for_deletion = bool(should_move_to_container())
+    jobs[job.id] = job
+    _start_after_commit_of_transaction(job)
+
+    logger.info(f"Queued {action} job {job.id} for {job.path} ({job.total} items)")
+    return job
+
+
+def _remove_finished_jobs(jobs: OOBTree) -> None:
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=JOB_KEEP_DAYS)).isoformat()
+    for job_id in [
+        job_id
+        for job_id, job in jobs.items()
+        if not job.active and job.finished and job.finished < cutoff
+    ]:
+        del jobs[job_id]
+
+
+def _start_after_commit_of_transaction(job: DeletionJob) -> None:
+    portal = api.portal.get()
+    transaction.get().addAfterCommitHook(
+        _start_after_commit,
+        args=(portal._p_jar.db(), "/".join(portal.getPhysicalPath()), job.id),
+    )
+
+
+def _start_after_commit(status: bool, db, site_path: str, job_id: str) -> None:
+    if status:
+        start_job_worker(db, site_path, job_id)
+
+
+def start_job_worker(db, site_path: str, job_id: str) -> threading.Thread:
+    """Run the job in a thread with a ZODB connection of its own."""
+    thread = threading.Thread(
+        target=_work, args=(db, site_path, job_id), name=f"gdpr-job-{job_id}"
+    )
+    thread.daemon = True
+    thread.start()
+    return thread
+
+
+def _work(db, site_path: str, job_id: str) -> None:
+    connection = db.open()
+    try:
+        app = makerequest(connection.root()["Application"])
+        site = app.unrestrictedTraverse(site_path)
+        setSite(site)
+        setRequest(app.REQUEST)
+        run_job(job_id)
+    except Exception as e:
+        logger.exception(f"Job {job_id} could not be run: {e}")
+    finally:
+        transaction.abort()
+        setSite(None)
+        clearRequest()
+        connection.close()
+
+
+def _is_below(path: tuple[str, ...], root: tuple[str, ...]) -> bool:
+    return len(path) > len(root) and path[: len(root)] == root
+
+
+def _move_root(job: DeletionJob, obj: DexterityContent) -> DexterityContent | None:
+    """Move obj into the marked deletion container, but leave its subtree
+    cataloged at the old path, see _move_index_batch(). Searches leave the
+    subtree out until then, see get_moving_paths().
+
+    Returns obj at its new place, None if it was deleted directly instead.
+    """
+    container = get_marked_deletion_container()
+    key = get_container_key(obj)
+    old_path = obj.getPhysicalPath()
+
+    getRequest().set(MARKED_FOR_DELETION_REQUEST_PARAM_NAME, True)
+    aq_parent(obj).manage_delObjects([obj.getId()])
+    moved = container._getOb(key, None)
+    if moved is None:
+        return None
+
+    # The move queued the items of the subtree to be unindexed at the old
+    # and indexed at the new path, which is left to the following steps
+    new_path = moved.getPhysicalPath()
+    queue = getQueue()
+    queue.setState(
+        [
+            operation
+            for operation in queue.getState()
+            if not _is_below(operation[1].getPhysicalPath(), old_path)
+            and not _is_below(operation[1].getPhysicalPath(), new_path)
+        ]
+    )
+    get_moving_paths(api.portal.get(), create=True).insert(job.path)
+    return moved
+
+
+def _move_index_batch(job: DeletionJob, obj: DexterityContent | None) -> int:
+    """Catalog up to JOB_BATCH_SIZE items below obj, which are still
+    cataloged at the path they had before obj was moved, at their new path.
+    Without obj, e.g. if it was deleted since, they are only uncataloged.
+
+    Returns the number of moved catalog entries.
+    """
+    portal = api.portal.get()
+    catalog = api.portal.get_tool("portal_catalog")
+    new_path = None if obj is None else "/".join(obj.getPhysicalPath())
+
+    # The results change with every entry uncataloged, so the batch is
+    # collected first
+    old_paths = []
+    for brain in catalog.unrestrictedSearchResults(path=job.path):
+        old_path = brain.getPath()
+        # Content added at the old path since is cataloged correctly
+        item = portal.unrestrictedTraverse(old_path, None)
+        if item is not None and item.UID() == brain.UID:
+            continue
+        old_paths.append(old_path)
+        if len(old_paths) == JOB_BATCH_SIZE:
+            break
+
+    for old_path in old_paths:
+        catalog.uncatalog_object(old_path)
+        if new_path is None:
+            continue
+        item = portal.unrestrictedTraverse(new_path + old_path[len(job.path) :], None)
+        if item is not None:
+            item.indexObject()
+
+    if len(old_paths) < JOB_BATCH_SIZE:
+        moving_paths = get_moving_paths(portal)
+        if moving_paths is not None and job.path in moving_paths:
+            moving_paths.remove(job.path)
+    return len(old_paths)
+
+
+def _finish_move(job: DeletionJob) -> None:
+    # Catalogs the rest of a subtree moved by a failed job at its new path,
+    # so no stale entries are left behind at the old one. If this fails
+    # too, searches keep leaving them out.
+    moving_paths = get_moving_paths(api.portal.get())
+    if moving_paths is None or job.path not in moving_paths:
+        return
+
+    obj = get_object_by_uid(job.uid)
+    try:
+        while _move_index_batch(job, obj) == JOB_BATCH_SIZE:
+            transaction.commit()
+        transaction.commit()
+    except Exception as e:
+        transaction.abort()
+        logger.error(f"Job {job.id} left items cataloged at {job.path}: {e}")
+    else:
+        logger.info(f"Job {job.id} cataloged the moved items at their new path")
+
+
+def _delete(job: DeletionJob) -> bool:
+    """Delete like the content DELETE service, i.e. move the subtree to the
+    marked deletion container or mark it in place, if that is enabled.
+
+    A moved subtree is cataloged at its new path in batches after the
+    move, a subtree deleted directly is purged in batches first. Marking
+    in place is done in a single step, it only reindexes the item itself.
+    """
+    obj = get_object_by_uid(job.uid)
+    if obj is None:
+        raise ValueError(f"Object with UID {job.uid} not found")
+
+    container = get_marked_deletion_container()
+    if container is not None and _is_below(
+        obj.getPhysicalPath(), container.getPhysicalPath()
+    ):
+        moved = _move_index_batch(job, obj)
+        if moved < JOB_BATCH_SIZE:
+            job.progress = job.total
+            return True
+        job.progress = min(job.progress + moved, job.total)
+        return False
+
+    mark = job.mark_for_deletion and is_feature_enabled()
+    if mark and is_virtual_mode():
+        getRequest().set(MARKED_FOR_DELETION_REQUEST_PARAM_NAME, True)
+        aq_parent(obj).manage_delObjects([obj.getId()])
+        job.progress = job.total
+        return True
+
+    if mark and container is not None:
+        if _move_root(job, obj) is None:
+            job.progress = job.total
+            return True
+        job.progress += 1
+        return False
+
+    # Deleted directly, only the item itself is logged like by the DELETE
+    # service
+    deleted = purge_subtree_batch(obj, JOB_BATCH_SIZE, _original_manage_delObjects)
+    job.progress += deleted
+    if deleted == JOB_BATCH_SIZE:
+        return False
+
+    getRequest().set(MARKED_FOR_DELETION_REQUEST_PARAM_NAME, False)
+    aq_parent(obj).manage_delObjects([obj.getId()])
+    job.progress += 1
+    return True
+
+
+def _delete_permanently(job: DeletionJob) -> bool:
+    obj = get_object_by_uid(job.uid)
+    if obj is None:
+        raise ValueError(f"Object with UID {job.uid} not found")
+
+    # Bottom-up in batches, so every committed step stays small. The item
+    # itself and its log entry follow once its subtree is empty.
+    deleted = purge_subtree_batch(obj, JOB_BATCH_SIZE)
+    job.progress += deleted
+    if deleted == JOB_BATCH_SIZE:
+        return False
+
+    aq_parent(obj).manage_delObjects([obj.getId()])
+    DeletionLog.update_entries_status([job.uid], "deleted")
+    job.progress += 1
+    return True
+
+
+# Action -> step, called until it returns True. Every step is committed
+# on its own and must only depend on persistent state, so a step can be
+# tried again after a conflict.
+_JOB_STEPS: dict[str, Callable[[DeletionJob], bool]] = {
+    "delete": _delete,
+    "permanent_deletion": _delete_permanently,
+}
+
+
+def run_job(job_id: str) -> DeletionJob | None:
+    """Run a queued job as the user who queued it, committing every step."""
+    job = get_job(job_id)
+    if job is None or job.status != "queued":
+        return job
+
+    job.status = "running"
+    job.started = job.started or _now()
+    job.updated = _now()
+    try:
+        transaction.commit()
+    except ConflictError:
+        # Another worker started the job at the same time
+        transaction.abort()
+        return get_job(job_id)
+
+    step = _JOB_STEPS[job.action]
+    try:
+        user = api.user.get(userid=job.user_id)
+        if user is None:
+            raise ValueError(f"User {job.user_id} not found")
+        with api.env.adopt_user(user=user):
+            while not _run_step(step, job):
+                pass
+    except Exception as e:
+        transaction.abort()
+        logger.error(f"Job {job.id} failed: {e}")
+        if job.action == "delete":
+            _finish_move(job)
+        job.status = "failed"
+        job.error = str(e)
+        job.finished = _now()
+        transaction.commit()
+        return job
+
+    logger.info(f"Job {job.id} done: {job.action} of {job.path}")
+    return job
+
+
+def _run_step(step: Callable[[DeletionJob], bool], job: DeletionJob) -> bool:
+    for attempt in range(MAX_CONFLICT_RETRIES + 1):
+        try:
+            done = step(job)
+            job.updated = _now()
+            if done:
+                job.status = "done"
+                job.finished = _now()
+            transaction.commit()
+            return done
+        except ConflictError:
+            transaction.abort()
+            if attempt == MAX_CONFLICT_RETRIES:
+                raise
+            logger.info(f"Step of job {job.id} conflicted, trying again")
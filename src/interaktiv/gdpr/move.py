@@ -0,0 +1,107 @@
+from typing import Any
+
+from Acquisition import aq_base, aq_inner, aq_parent
+from BTrees.OOBTree import OOTreeSet
+from OFS.CopySupport import CopyError, sanity_check
+from OFS.event import ObjectWillBeMovedEvent
+from OFS.interfaces import IObjectManager
+from plone.dexterity.content import DexterityContent
+from Products.CMFCore.indexing import processQueue
+from zExceptions import ResourceLockedError
+from zope.annotation.interfaces import IAnnotations
+from zope.container.contained import notifyContainerModified
+from zope.event import notify
+from zope.lifecycleevent import ObjectMovedEvent
+
+MOVING_PATHS_ANNOTATION_KEY = "interaktiv.gdpr.moving_paths"
+
+
+def get_moving_paths(portal: Any, create: bool = False) -> OOTreeSet | None:
+    """Return the old paths of the subtrees moved by a deletion job whose
+    items are still cataloged there, see interaktiv.gdpr.jobs.
+
+    Catalog searches leave these items out until the job has cataloged
+    them at their new path.
+    """
+    annotations = IAnnotations(portal)
+    paths = annotations.get(MOVING_PATHS_ANNOTATION_KEY)
+
+    if paths is None and create:
+        paths = annotations[MOVING_PATHS_ANNOTATION_KEY] = OOTreeSet()
+
+    return paths
+
+
+def get_container_key(obj: DexterityContent) -> str:
+    """Return the id obj is stored under in the marked deletion container.
+
+    The UID is unique, so no id has to be probed for a free one like
+    copy_of_... and no item has to be renamed on withdrawal. The original
+    id is kept in the deletion log.
+    """
+    return obj.UID()
+
+
+def _verify_move(obj: DexterityContent, target: IObjectManager) -> None:
+    # The checks of a cut followed by a paste
+    if not obj.cb_isMoveable():
+        raise CopyError(f"Object {obj.getId()} cannot be moved")
+    if obj.wl_isLocked():
+        raise ResourceLockedError(f"Object {obj.getId()} is locked")
+    target._verifyObjectPaste(obj, validate_src=2)
+    if not sanity_check(target, obj):
+        raise CopyError("This object cannot be pasted into itself")
+
+
+def move_objects(
+    target: IObjectManager, objs: list[tuple[DexterityContent, str]]
+) -> list[DexterityContent]:
+    """Move objs into target, each under the id given with it.
+
+    Does what a cut and paste does, with the same checks and events, but
+    takes the new id instead of deriving a free one from the current id.
+    So the object does not need to be renamed after the move, which would
+    reindex it a second time. Returns the moved objects.
+    """
+    for obj, new_id in objs:
+        _verify_move(obj, target)
+        if target.hasObject(new_id):
+            raise CopyError(f"An object with id {new_id} already exists")
+
+    # Queued indexing of an object, e.g. one added in this transaction,
+    # would otherwise be done with the path of its new id below its old
+    # parent once the queue is processed
+    processQueue()
+
+    moved = []
+    for obj, new_id in objs:
+        orig_id = obj.getId()
+        orig_container = aq_parent(aq_inner(obj))
+        obj._notifyOfCopyTo(target, op=1)
+
+        notify(ObjectWillBeMovedEvent(obj, orig_container, orig_id, target, new_id))
+        # Explicit ownership is carried along to the new location
+        obj.manage_changeOwnershipType(explicit=1)
+
+        orig_container._delObject(orig_id, suppress_events=True)
+        obj = aq_base(obj)
+        obj._setId(new_id)
+        target._setObject(new_id, obj, set_owner=0, suppress_events=True)
+        obj = target._getOb(new_id)
+
+        notify(ObjectMovedEvent(obj, orig_container, orig_id, target, new_id))
+        notifyContainerModified(orig_container)
+        if aq_base(orig_container) is not aq_base(target):
+            notifyContainerModified(target)
+
+        obj._postCopy(target, op=1)
+        obj.manage_changeOwnershipType(explicit=0)
+        moved.append(obj)
+
+    return moved
+
+
+def move_object(
+    obj: DexterityContent, target: IObjectManager, new_id: str
+) -> DexterityContent:
+    return move_objects(target, [(obj, new_id)])[0]
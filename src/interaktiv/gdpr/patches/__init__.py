@@ -1,8 +1,9 @@
-from interaktiv.gdpr.patches import manage_del_objects
+from interaktiv.gdpr.patches import catalog_search, manage_del_objects
 
 
 def apply_patches():
     manage_del_objects.apply_patch()
+    catalog_search.apply_patch()
 
 
 apply_patches()
@@ -0,0 +1,80 @@
+from contextvars import ContextVar
+from typing import Any
+
+from Acquisition import aq_base
+from BTrees.IIBTree import difference
+from Products.CMFPlone.CatalogTool import CatalogTool
+from Products.ZCatalog.Catalog import Catalog
+from zope.interface.interfaces import ComponentLookupError
+
+from interaktiv.gdpr import logger
+from interaktiv.gdpr.virtual_deletion import get_hidden_rids, is_virtual_mode
+
+# Query parameter to include the content marked for deletion in place
+SHOW_MARKED_PARAM_NAME = "show_marked_for_deletion"
+
+_original_searchResults = CatalogTool.searchResults
+_original_search_index = Catalog._search_index
+
+# The catalog and the record ids left out of the search running in it
+_hidden_rids: ContextVar[tuple[Catalog, Any] | None] = ContextVar(
+    "interaktiv.gdpr.hidden_rids", default=None
+)
+
+
+def _is_virtual_mode() -> bool:
+    # The catalog is also searched before the registry exists, e.g. while
+    # a site is created
+    try:
+        return is_virtual_mode()
+    except ComponentLookupError:
+        return False
+
+
+def patched_search_index(
+    self: Catalog, cr: Any, index_id: str, query: Any, rs: Any
+) -> Any:
+    # Takes the hidden records out of the result of the first index
+    # searched, all further indexes only narrow it down
+    result = _original_search_index(self, cr, index_id, query, rs)
+    hidden = _hidden_rids.get()
+    if rs is None and result and hidden is not None and hidden[0] is aq_base(self):
+        result = difference(result, hidden[1])
+    return result
+
+
+def patched_searchResults(self: CatalogTool, query: Any = None, **kw: Any) -> Any:
+    """Leave out the content marked for deletion in place and its subtrees,
+    and the stale entries of a subtree a deletion job is moving.
+
+    Their record ids are taken out of the result set within the catalog
+    search, so the results stay lazy and sort_limit and batching apply as
+    usual. Content is only marked in place in the virtual mode, in the
+    container mode only a moving subtree is left out, see
+    interaktiv.gdpr.virtual_deletion.get_hidden_rids().
+    """
+    show_marked = kw.pop(SHOW_MARKED_PARAM_NAME, False)
+    if isinstance(query, dict) and SHOW_MARKED_PARAM_NAME in query:
+        query = dict(query)
+        show_marked = query.pop(SHOW_MARKED_PARAM_NAME)
+
+    hidden = get_hidden_rids(self, marked=not show_marked and _is_virtual_mode())
+    if not hidden:
+        return _original_searchResults(self, query, **kw)
+
+    token = _hidden_rids.set((aq_base(self._catalog), hidden))
+    try:
+        return _original_searchResults(self, query, **kw)
+    finally:
+        _hidden_rids.reset(token)
+
+
+def apply_patch() -> None:
+    CatalogTool.searchResults = patched_searchResults
+    Catalog._search_index = patched_search_index
+    logger.info(
+        f'Patching "{CatalogTool.__module__}.searchResults" with "{patched_searchResults.__module__}"'
+    )
+    logger.info(
+        f'Patching "{Catalog.__module__}._search_index" with "{patched_search_index.__module__}"'
+    )
@@ -1,5 +1,7 @@
 from typing import Any
 
+import transaction
+from OFS.CopySupport import CopyError
 from OFS.interfaces import IObjectManager
 from OFS.ObjectManager import ObjectManager
 from plone.dexterity.content import DexterityContent
@@ -13,18 +15,20 @@ from interaktiv.gdpr.config import (
     MARKED_FOR_DELETION_REQUEST_PARAM_NAME,
 )
 from interaktiv.gdpr.deletion_log import DeletionLog
-from interaktiv.gdpr.registry.deletion_log import IGDPRSettingsSchema
-from interaktiv.gdpr.utils import get_registry_setting
+from interaktiv.gdpr.move import get_container_key, move_objects
+from interaktiv.gdpr.settings import get_gdpr_settings
+from interaktiv.gdpr.virtual_deletion import (
+    is_marked_for_deletion,
+    is_virtual_mode,
+    mark_for_deletion,
+)
 
 _original_manage_delObjects = ObjectManager.manage_delObjects
 
 
 def is_feature_enabled() -> bool:
     try:
-        result = get_registry_setting(
-            "marked_deletion_enabled", IGDPRSettingsSchema, True
-        )
-        return result if result is not None else True
+        return get_gdpr_settings().marked_deletion_enabled
     except ComponentLookupError:
         return True
 
@@ -61,18 +65,75 @@ def _log_direct_deletion(container: IObjectManager, ids: str | list[str]) -> Non
     if isinstance(ids, str):
         ids = [ids]
 
+    objs = []
     for obj_id in ids:
         try:
-            if obj_id in container.objectIds():
-                obj = container[obj_id]
-                # Skip logging if object is in marked-for-deletion container
-                # (it already has a pending entry that will be updated separately)
-                if _is_in_deletion_container(obj):
-                    continue
-                DeletionLog.add_entry(obj, status="deleted")
+            obj = container._getOb(obj_id, None)
+            if obj is None:
+                continue
+            # Skip logging if object is in marked-for-deletion container
+            # or marked in place (it already has a pending entry that will
+            # be updated separately)
+            if _is_in_deletion_container(obj) or is_marked_for_deletion(obj):
+                continue
+            objs.append(obj)
         except Exception as e:
             logger.error(f"Error logging deletion for {obj_id}: {e}")
 
+    try:
+        DeletionLog.add_entries(objs, status="deleted")
+    except Exception as e:
+        logger.error(f"Error logging deletion for {', '.join(ids)}: {e}")
+
+
+def _move_by_uid(container: DexterityContent, objs: list[DexterityContent]) -> None:
+    DeletionLog.add_entries(objs, status="pending")
+
+    # Stored under their UID, the original id is kept in the log
+    move_objects(container, [(obj, get_container_key(obj)) for obj in objs])
+
+    for obj in objs:
+        logger.info(f"Moved object '{obj.title_or_id()}' to marked deletion container")
+
+
+def _move_to_container(
+    container: DexterityContent, objs: list[DexterityContent]
+) -> list[str]:
+    if not objs:
+        return []
+
+    # All objects are moved at once. If that fails, e.g. because a single
+    # object may not be pasted, the objects are moved one by one to find the
+    # failing ones.
+    savepoint = transaction.savepoint(optimistic=True)
+    try:
+        _move_by_uid(container, objs)
+        return [obj.title_or_id() for obj in objs]
+    except Exception as e:
+        logger.warning(f"Moving {len(objs)} objects at once failed: {e}")
+        savepoint.rollback()
+
+    moved_titles = []
+    for obj in objs:
+        savepoint = transaction.savepoint(optimistic=True)
+        try:
+            _move_by_uid(container, [obj])
+            moved_titles.append(obj.title_or_id())
+        except Exception as e:
+            logger.error(f"Error moving object {obj.getId()}: {e}")
+            savepoint.rollback()
+    return moved_titles
+
+
+def _mark_in_place(objs: list[DexterityContent]) -> list[str]:
+    if not objs:
+        return []
+
+    DeletionLog.add_entries(objs, status="pending")
+    for obj in objs:
+        mark_for_deletion(obj)
+    return [obj.title_or_id() for obj in objs]
+
 
 def patched_manage_delObjects(
     self: IObjectManager, ids: str | list[str] | None = None, REQUEST: Any = None
@@ -87,9 +148,10 @@ def patched_manage_delObjects(
         _log_direct_deletion(self, ids)
         return _original_manage_delObjects(self, ids, REQUEST)
 
-    container = get_marked_deletion_container()
+    virtual = is_virtual_mode()
+    container = None if virtual else get_marked_deletion_container()
 
-    if container is None:
+    if container is None and not virtual:
         logger.warning("MarkedDeletionContainer not found, using direct deletion")
         _log_direct_deletion(self, ids)
         return _original_manage_delObjects(self, ids, REQUEST)
@@ -98,29 +160,30 @@ def patched_manage_delObjects(
         ids = [ids]
 
     try:
-        moved_titles: list[str] = []
+        objs: list[DexterityContent] = []
 
         for obj_id in ids:
             try:
                 obj = self[obj_id]
-                obj_title = obj.title_or_id()
-
-                DeletionLog.add_entry(obj, status="pending")
-
-                cookie = self.manage_cutObjects([obj_id])
-                container.manage_pasteObjects(cookie)
-
-                moved_titles.append(obj_title)
-                logger.info(f"Moved object '{obj_title}' to marked deletion container")
+                if not virtual and not obj.cb_isMoveable():
+                    raise CopyError(f"Object {obj_id} cannot be moved")
+                objs.append(obj)
 
             except Exception as e:
                 logger.error(f"Error moving object {obj_id}: {e}")
                 continue
 
+        if virtual:
+            moved_titles = _mark_in_place(objs)
+            message = "Items marked for deletion"
+        else:
+            moved_titles = _move_to_container(container, objs)
+            message = "Items moved to deletion container"
+
         if REQUEST is not None:
             if moved_titles:
                 api.portal.show_message(
-                    message=f"Items moved to deletion container: {', '.join(moved_titles)}",
+                    message=f"{message}: {', '.join(moved_titles)}",
                     request=REQUEST,
                     type="info",
                 )
@@ -0,0 +1,82 @@
+from collections.abc import Callable, Iterator
+from itertools import groupby, islice
+from typing import Any
+
+import transaction
+from Acquisition import aq_base, aq_parent
+from OFS.interfaces import IObjectManager
+from plone.dexterity.content import DexterityContent
+
+from interaktiv.gdpr import logger
+
+# Number of items deleted between two savepoints or commits
+DEFAULT_PURGE_BATCH_SIZE = 500
+
+
+def _has_children(obj: DexterityContent) -> bool:
+    return hasattr(aq_base(obj), "objectIds") and len(obj) > 0
+
+
+def iter_subtree_bottom_up(root: DexterityContent) -> Iterator[DexterityContent]:
+    """Yield the items below root, every item after its children.
+
+    The children are walked from the last to the first one, because an
+    ordered folder removes its last item much cheaper than its first.
+    """
+    stack = [(root, reversed(list(root.objectIds())))]
+    while stack:
+        parent, child_ids = stack[-1]
+        for child_id in child_ids:
+            child = parent._getOb(child_id)
+            if _has_children(child):
+                stack.append((child, reversed(list(child.objectIds()))))
+                break
+            yield child
+        else:
+            stack.pop()
+            if stack:
+                yield parent
+
+
+def purge_subtree_batch(
+    root: DexterityContent,
+    batch_size: int = DEFAULT_PURGE_BATCH_SIZE,
+    delete_objects: Callable[[IObjectManager, list[str]], Any] | None = None,
+) -> int:
+    """Delete up to batch_size items below root, children before parents.
+
+    Every deleted item has no children left, so each deletion only
+    unindexes a single item. The items of a parent are deleted with
+    delete_objects(parent, ids), manage_delObjects() by default. Returns
+    the number of deleted items, the subtree is empty if that is less
+    than batch_size.
+    """
+    batch = list(islice(iter_subtree_bottom_up(root), batch_size))
+    for _path, items in groupby(batch, key=lambda item: item.getPhysicalPath()[:-1]):
+        items = list(items)
+        parent = aq_parent(items[0])
+        ids = [item.getId() for item in items]
+        if delete_objects is None:
+            parent.manage_delObjects(ids)
+        else:
+            delete_objects(parent, ids)
+    return len(batch)
+
+
+def purge(obj: DexterityContent, batch_size: int = DEFAULT_PURGE_BATCH_SIZE) -> int:
+    """Permanently delete obj with its subtree in batches of batch_size.
+
+    A savepoint after every batch writes the changes to a temporary file
+    and lets the pickle cache drop the deleted items, so the memory used
+    does not grow with the size of the subtree. obj itself is deleted once
+    its subtree is empty. Returns the number of deleted items.
+    """
+    deleted = 0
+    while (count := purge_subtree_batch(obj, batch_size)) == batch_size:
+        deleted += count
+        transaction.savepoint(optimistic=True)
+        logger.debug(f"Purged {deleted} items below {obj.getId()}")
+    deleted += count
+
+    aq_parent(obj).manage_delObjects([obj.getId()])
+    return deleted + 1
@@ -56,6 +56,8 @@ DELETION_LOG_JSON_SCHEMA = json.dumps(
 
 DELETION_LOG_DEFAULT: list[TDeletionLogEntry] = []
 
+MARKED_DELETION_MODES = ("container", "virtual")
+
 
 class IGDPRSettingsSchema(Interface):
     marked_deletion_enabled = schema.Bool(
@@ -66,6 +68,16 @@ class IGDPRSettingsSchema(Interface):
         required=True,
     )
 
+    marked_deletion_mode = schema.Choice(
+        title="Marked Deletion Mode",
+        description="container: content marked for deletion is moved to the "
+        "marked deletion container. virtual: it stays in place and is hidden "
+        "by a marker interface, which does not reindex its subtree.",
+        values=MARKED_DELETION_MODES,
+        default="container",
+        required=True,
+    )
+
     deletion_log_enabled = schema.Bool(
         title="Deletion Log Feature Enabled",
         description="When enabled, all deletion actions are logged and can be viewed in the control panel.",
@@ -89,6 +101,24 @@ class IGDPRSettingsSchema(Interface):
         min=1,
     )
 
+    archive_days = schema.Int(
+        title="Archive Days",
+        description="Number of days after which deleted and withdrawn entries "
+        "are moved from the deletion log into the compressed archive.",
+        default=365,
+        required=True,
+        min=1,
+    )
+
+    async_threshold = schema.Int(
+        title="Background Job Threshold",
+        description="Marking or permanently deleting a subtree with at least "
+        "this many items runs as a background job. 0 disables background jobs.",
+        default=0,
+        required=True,
+        min=0,
+    )
+
 
 class IDeletionLogSchema(Interface):
     deletion_log = JSONField(
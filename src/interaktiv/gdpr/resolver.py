@@ -0,0 +1,72 @@
+from collections.abc import Iterable
+
+from plone import api
+from plone.dexterity.content import DexterityContent
+from plone.uuid.interfaces import IUUID
+from Products.ZCatalog.interfaces import ICatalogBrain
+from zope.annotation.interfaces import IAnnotations
+from zope.globalrequest import getRequest
+from zope.lifecycleevent.interfaces import IObjectMovedEvent
+
+RESOLVER_ANNOTATION_KEY = "interaktiv.gdpr.uid_resolver"
+
+
+def _get_memo(create: bool = True) -> dict[str, ICatalogBrain | None] | None:
+    request = getRequest()
+    if request is None:
+        return {} if create else None
+    try:
+        annotations = IAnnotations(request)
+    except TypeError:
+        return {} if create else None
+    if create:
+        return annotations.setdefault(RESOLVER_ANNOTATION_KEY, {})
+    return annotations.get(RESOLVER_ANNOTATION_KEY)
+
+
+def resolve_uids(uids: Iterable[str]) -> dict[str, ICatalogBrain]:
+    """Return the catalog brains of the given UIDs.
+
+    All UIDs not resolved before in the current request are looked up with
+    a single unrestricted catalog query. UIDs without a catalog entry are
+    left out of the result. Objects are not woken up, use
+    get_object_by_uid or the brain for that.
+    """
+    memo = _get_memo()
+    uids = list(dict.fromkeys(uid for uid in uids if uid))
+
+    missing = [uid for uid in uids if uid not in memo]
+    if missing:
+        catalog = api.portal.get_tool("portal_catalog")
+        for uid in missing:
+            memo[uid] = None
+        for brain in catalog.unrestrictedSearchResults(UID=missing):
+            memo[brain.UID] = brain
+
+    return {uid: memo[uid] for uid in uids if memo[uid] is not None}
+
+
+def get_object_by_uid(uid: str) -> DexterityContent | None:
+    brain = resolve_uids([uid]).get(uid)
+    if brain is None:
+        return None
+    try:
+        return brain._unrestrictedGetObject()
+    except (AttributeError, KeyError):
+        return None
+
+
+def forget_uids(uids: Iterable[str]) -> None:
+    memo = _get_memo(create=False)
+    if not memo:
+        return
+    for uid in uids:
+        memo.pop(uid, None)
+
+
+def handle_object_moved(obj: DexterityContent, event: IObjectMovedEvent) -> None:
+    # Moved and removed objects have a new path or none at all, the brain
+    # resolved before is outdated
+    uid = IUUID(obj, None)
+    if uid is not None:
+        forget_uids([uid])
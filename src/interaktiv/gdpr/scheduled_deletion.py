@@ -0,0 +1,69 @@
+import zlib
+from datetime import datetime, timezone
+
+from persistent import Persistent
+from plone import api
+from zope.annotation.interfaces import IAnnotations
+
+SCHEDULED_DELETION_ANNOTATION_KEY = "interaktiv.gdpr.scheduled_deletion"
+
+
+class ScheduledDeletionRun(Persistent):
+    """State of a scheduled deletion spread over several transactions.
+
+    cursor is the id of the last expired entry processed. Entries deleted
+    by the run leave the pending status anyway, the cursor keeps entries
+    that could not be deleted from being tried again by every batch of
+    the same run. The state is removed once the run is complete, so the
+    next run starts over with all expired entries.
+
+    When several workers purge at once, each worker keeps a run of its
+    own, see get_worker().
+    """
+
+    def __init__(self, worker: int = 0, workers: int = 1) -> None:
+        self.worker = worker
+        self.workers = workers
+        self.cursor = 0
+        self.started = datetime.now(timezone.utc).isoformat()
+        self.batches = 0
+        self.deleted = 0
+        self.skipped = 0
+
+    def claims(self, uid: str | None) -> bool:
+        """Whether the entry of uid is purged by the worker of this run."""
+        return self.workers == 1 or get_worker(uid or "", self.workers) == self.worker
+
+
+def get_worker(uid: str, workers: int) -> int:
+    """Return the worker responsible for the object of uid.
+
+    The expired entries are split between the workers by a hash of their
+    UID that is the same in every process, so the workers never pick the
+    same object, even when it has several pending entries.
+    """
+    return zlib.crc32(uid.encode("utf-8")) % workers
+
+
+def _get_run_key(worker: int, workers: int) -> str:
+    if workers == 1:
+        return SCHEDULED_DELETION_ANNOTATION_KEY
+    return f"{SCHEDULED_DELETION_ANNOTATION_KEY}.{worker}-of-{workers}"
+
+
+def get_scheduled_deletion_run(
+    create: bool = False, worker: int = 0, workers: int = 1
+) -> ScheduledDeletionRun | None:
+    annotations = IAnnotations(api.portal.get())
+    key = _get_run_key(worker, workers)
+    run = annotations.get(key)
+
+    if run is None and create:
+        run = annotations[key] = ScheduledDeletionRun(worker, workers)
+
+    return run
+
+
+def finish_scheduled_deletion_run(worker: int = 0, workers: int = 1) -> None:
+    annotations = IAnnotations(api.portal.get())
+    annotations.pop(_get_run_key(worker, workers), None)
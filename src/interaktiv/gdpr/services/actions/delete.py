@@ -1,6 +1,8 @@
 from plone.restapi.services.content.delete import ContentDelete
 
 from interaktiv.gdpr.config import MARKED_FOR_DELETION_REQUEST_PARAM_NAME
+from interaktiv.gdpr.jobs import queue_job, should_run_as_job
+from interaktiv.gdpr.utils import create_job_response
 
 
 class GDPRContentDelete(ContentDelete):
@@ -8,6 +10,8 @@ class GDPRContentDelete(ContentDelete):
 
     Sets the mark_for_deletion parameter so the patched manage_delObjects
     moves content to the deletion container instead of permanently deleting it.
+    Subtrees of at least async_threshold items are deleted by a background
+    job, the response is a 202 with the job then.
     """
 
     def __init__(self, context, request):
@@ -15,5 +19,9 @@ class GDPRContentDelete(ContentDelete):
         self.request = request
 
     def reply(self):
+        # Also taken over by the job
         self.request.set(MARKED_FOR_DELETION_REQUEST_PARAM_NAME, True)
+        if should_run_as_job(self.context):
+            return create_job_response(self.request, queue_job("delete", self.context))
+
         return super().reply()
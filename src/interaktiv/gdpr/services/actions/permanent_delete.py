@@ -1,7 +1,7 @@
 from typing import Any
 
 import plone.protect.interfaces
-from plone import api
+import transaction
 from plone.dexterity.content import DexterityContent
 from plone.restapi.services import Service
 from zope.interface import alsoProvides, implementer
@@ -9,7 +9,14 @@ from zope.publisher.interfaces import IPublishTraverse
 
 from interaktiv.gdpr import _, logger
 from interaktiv.gdpr.deletion_log import DeletionLog
-from interaktiv.gdpr.utils import create_error_response, create_success_response
+from interaktiv.gdpr.jobs import queue_job, should_run_as_job
+from interaktiv.gdpr.purge import purge
+from interaktiv.gdpr.resolver import get_object_by_uid
+from interaktiv.gdpr.utils import (
+    create_error_response,
+    create_job_response,
+    create_success_response,
+)
 
 
 @implementer(IPublishTraverse)
@@ -45,7 +52,7 @@ class PermanentDeletion(Service):
                 ),
             )
 
-        obj = api.content.get(UID=self.uid)
+        obj = get_object_by_uid(self.uid)
         if not obj:
             return create_error_response(
                 self.request,
@@ -54,11 +61,18 @@ class PermanentDeletion(Service):
                 _("Object with UID ${uid} not found", mapping={"uid": self.uid}),
             )
 
+        if should_run_as_job(obj):
+            return create_job_response(
+                self.request, queue_job("permanent_deletion", obj)
+            )
+
         title = log_entry["title"]
 
+        # Rolls back the batches of the subtree purged before a failure
+        savepoint = transaction.savepoint(optimistic=True)
         try:
-            api.content.delete(obj=obj, check_linkintegrity=False)
-            DeletionLog.update_entry_status(self.uid, "deleted")
+            purge(obj)
+            DeletionLog.update_entries_status([self.uid], "deleted")
 
             logger.info(
                 f"Permanent deletion successful:\n"
@@ -77,6 +91,7 @@ class PermanentDeletion(Service):
 
         except Exception as e:
             logger.error(f"Error during permanent deletion: {e}")
+            savepoint.rollback()
             return create_error_response(
                 self.request,
                 500,
@@ -10,8 +10,36 @@ from zope.publisher.interfaces import IPublishTraverse
 from interaktiv.gdpr import _, logger
 from interaktiv.gdpr.config import MARKED_FOR_DELETION_CONTAINER_ID
 from interaktiv.gdpr.deletion_log import DeletionLog
+from interaktiv.gdpr.interfaces import IMarkedForDeletion
+from interaktiv.gdpr.move import move_object
 from interaktiv.gdpr.registry.deletion_log import TDeletionLogEntry
+from interaktiv.gdpr.resolver import get_object_by_uid
 from interaktiv.gdpr.utils import create_error_response, create_success_response
+from interaktiv.gdpr.virtual_deletion import unmark_for_deletion
+
+
+def split_original_path(original_path: str) -> tuple[str, str] | None:
+    """Split the original path of a log entry into the path of the parent,
+    without leading slash, and the id. Returns None for an invalid path."""
+    path_parts = original_path.strip("/").split("/")
+    if len(path_parts) < 2:
+        return None
+    return "/".join(path_parts[:-1]), path_parts[-1]
+
+
+def get_original_parent(original_parent_path: str) -> DexterityContent:
+    """Traverse to the parent container of an original path.
+
+    Raises KeyError or AttributeError if it does not exist (anymore).
+    """
+    portal = api.portal.get()
+    portal_id = portal.getId()
+
+    if original_parent_path == portal_id:
+        return portal
+    if original_parent_path.startswith(portal_id + "/"):
+        return portal.restrictedTraverse(original_parent_path[len(portal_id) + 1 :])
+    return portal.restrictedTraverse(original_parent_path)
 
 
 @implementer(IPublishTraverse)
@@ -66,7 +94,7 @@ class WithdrawDeletion(Service):
         return container, None
 
     def _get_object(self) -> tuple[DexterityContent | None, dict[str, Any] | None]:
-        obj = api.content.get(UID=self.uid)
+        obj = get_object_by_uid(self.uid)
         if not obj:
             error = create_error_response(
                 self.request,
@@ -80,9 +108,9 @@ class WithdrawDeletion(Service):
     def _parse_original_path(
         self, original_path: str
     ) -> tuple[tuple[str, str] | None, dict[str, Any] | None]:
-        path_parts = original_path.strip("/").split("/")
+        path_info = split_original_path(original_path)
 
-        if len(path_parts) < 2:
+        if path_info is None:
             error = create_error_response(
                 self.request,
                 400,
@@ -91,29 +119,13 @@ class WithdrawDeletion(Service):
             )
             return None, error
 
-        original_parent_path = "/".join(path_parts[:-1])
-        original_id = path_parts[-1]
-        return (original_parent_path, original_id), None
+        return path_info, None
 
     def _get_target_container(
         self, original_parent_path: str
     ) -> tuple[DexterityContent | None, dict[str, Any] | None]:
-        portal = api.portal.get()
-
         try:
-            if original_parent_path == portal.getId():
-                return portal, None
-
-            portal_id = portal.getId()
-            if original_parent_path.startswith(portal_id + "/"):
-                i = len(portal_id) + 1
-                relative_path = original_parent_path[i:]
-                return portal.restrictedTraverse(relative_path), None
-            elif original_parent_path == portal_id:
-                return portal, None
-            else:
-                return portal.restrictedTraverse(original_parent_path), None
-
+            return get_original_parent(original_parent_path), None
         except (KeyError, AttributeError):
             error = create_error_response(
                 self.request,
@@ -147,21 +159,16 @@ class WithdrawDeletion(Service):
     def _move_object(
         self,
         obj: DexterityContent,
-        container: DexterityContent,
         target_container: DexterityContent,
         original_id: str,
         log_entry: TDeletionLogEntry,
         original_parent_path: str,
     ) -> dict[str, Any]:
         try:
-            cookie = container.manage_cutObjects([obj.getId()])
-            target_container.manage_pasteObjects(cookie)
+            # Moved back under its original id, so no rename is needed
+            move_object(obj, target_container, original_id)
 
-            pasted_obj = target_container[obj.getId()]
-            if pasted_obj.getId() != original_id:
-                api.content.rename(obj=pasted_obj, new_id=original_id)
-
-            DeletionLog.update_entry_status(self.uid, "withdrawn")
+            DeletionLog.update_entries_status([self.uid], "withdrawn")
 
             logger.info(
                 f"Withdrawal successful:\n"
@@ -189,6 +196,32 @@ class WithdrawDeletion(Service):
                 _("Error restoring object: ${error}", mapping={"error": str(e)}),
             )
 
+    def _unmark_object(
+        self, obj: DexterityContent, log_entry: TDeletionLogEntry
+    ) -> dict[str, Any]:
+        """Withdraw the deletion of an object marked in place, which stays
+        where it is."""
+        unmark_for_deletion(obj)
+        DeletionLog.update_entries_status([self.uid], "withdrawn")
+
+        path = "/".join(obj.getPhysicalPath())
+        logger.info(
+            f"Withdrawal successful:\n"
+            f"  UID: {self.uid}\n"
+            f"  Title: {log_entry['title']}\n"
+            f"  Unmarked in place: {path}"
+        )
+
+        return create_success_response(
+            self.request,
+            _(
+                'Object "${title}" has been restored to its original location',
+                mapping={"title": log_entry["title"]},
+            ),
+            restored_path=path,
+            uid=self.uid,
+        )
+
     def reply(self) -> dict[str, Any]:
         if "IDisableCSRFProtection" in dir(plone.protect.interfaces):
             alsoProvides(self.request, plone.protect.interfaces.IDisableCSRFProtection)
@@ -200,11 +233,14 @@ class WithdrawDeletion(Service):
         if error:
             return error
 
-        container, error = self._get_deletion_container()
+        obj, error = self._get_object()
         if error:
             return error
 
-        obj, error = self._get_object()
+        if IMarkedForDeletion.providedBy(obj):
+            return self._unmark_object(obj, log_entry)
+
+        _container, error = self._get_deletion_container()
         if error:
             return error
 
@@ -226,7 +262,6 @@ class WithdrawDeletion(Service):
 
         return self._move_object(
             obj,
-            container,
             target_container,
             original_id,
             log_entry,
@@ -0,0 +1,257 @@
+import json
+from collections import Counter, defaultdict
+from typing import Any
+
+import plone.protect.interfaces
+import transaction
+from plone import api
+from plone.dexterity.content import DexterityContent
+from plone.restapi.services import Service
+from zope.i18n import translate
+from zope.interface import alsoProvides
+from zope.publisher.interfaces.browser import IBrowserRequest
+
+from interaktiv.gdpr import _, logger
+from interaktiv.gdpr.config import MARKED_FOR_DELETION_CONTAINER_ID
+from interaktiv.gdpr.deletion_log import DeletionLog
+from interaktiv.gdpr.interfaces import IMarkedForDeletion
+from interaktiv.gdpr.move import move_objects
+from interaktiv.gdpr.resolver import resolve_uids
+from interaktiv.gdpr.services.actions.withdraw import (
+    get_original_parent,
+    split_original_path,
+)
+from interaktiv.gdpr.utils import create_error_response, create_success_response
+from interaktiv.gdpr.virtual_deletion import unmark_for_deletion
+
+
+class BulkWithdrawDeletion(Service):
+    """Withdraw the deletion of several objects at once.
+
+    Expects a JSON body like {"uids": [...]} and returns a result per UID.
+    The objects are grouped by their original parent, every group is moved
+    back in one step and the log entries of all restored objects are
+    updated at once.
+    """
+
+    def __init__(self, context: DexterityContent, request: IBrowserRequest) -> None:
+        self.context = context
+        self.request = request
+        self.results: dict[str, dict[str, Any]] = {}
+
+    def _parse_uids(self) -> list[str] | None:
+        data = self.request.get("BODY", {})
+        try:
+            if isinstance(data, bytes):
+                data = json.loads(data)
+        except ValueError:
+            return None
+
+        uids = data.get("uids") if isinstance(data, dict) else None
+        if not isinstance(uids, list) or not uids:
+            return None
+        if not all(isinstance(uid, str) and uid for uid in uids):
+            return None
+        return list(dict.fromkeys(uids))
+
+    def _restored(self, uid: str, path: str) -> None:
+        self.results[uid] = {"uid": uid, "status": "restored", "restored_path": path}
+
+    def _failed(self, uid: str, error_type: str, message: str) -> None:
+        self.results[uid] = {
+            "uid": uid,
+            "status": "error",
+            "error": {
+                "type": error_type,
+                "message": translate(message, context=self.request),
+            },
+        }
+
+    def _get_objects(self, uids: list[str]) -> dict[str, DexterityContent]:
+        # All UIDs are looked up with one catalog query
+        brains = resolve_uids(uids)
+        objs = {}
+        for uid in uids:
+            obj = None
+            if uid in brains:
+                try:
+                    obj = brains[uid]._unrestrictedGetObject()
+                except (AttributeError, KeyError):
+                    pass
+            if obj is None:
+                self._failed(
+                    uid,
+                    "NotFound",
+                    _("Object with UID ${uid} not found", mapping={"uid": uid}),
+                )
+            else:
+                objs[uid] = obj
+        return objs
+
+    def _group_by_parent(
+        self, entries: dict[str, dict], objs: dict[str, DexterityContent]
+    ) -> dict[str, list[tuple[str, str]]]:
+        """Return (UID, original id) of the objects by original parent path."""
+        groups = defaultdict(list)
+        for uid in objs:
+            original_path = entries[uid].get("original_path", "")
+            path_info = split_original_path(original_path)
+            if path_info is None:
+                self._failed(
+                    uid,
+                    "BadRequest",
+                    _(
+                        "Invalid original path: ${path}",
+                        mapping={"path": original_path},
+                    ),
+                )
+                continue
+            original_parent_path, original_id = path_info
+            groups[original_parent_path].append((uid, original_id))
+        return groups
+
+    def _find_name_conflicts(
+        self, target: DexterityContent, items: list[tuple[str, str]]
+    ) -> set[str]:
+        """Return the original ids of a group that cannot be restored, as
+        they exist in the target or more than once in the group."""
+        counts = Counter(original_id for _uid, original_id in items)
+        existing = {
+            original_id for original_id in counts if target.hasObject(original_id)
+        }
+        duplicates = {original_id for original_id, count in counts.items() if count > 1}
+        return existing | duplicates
+
+    def _restore_group(
+        self,
+        original_parent_path: str,
+        items: list[tuple[str, str]],
+        objs: dict[str, DexterityContent],
+    ) -> list[str]:
+        try:
+            target = get_original_parent(original_parent_path)
+        except (KeyError, AttributeError):
+            for uid, _original_id in items:
+                self._failed(
+                    uid,
+                    "NotFound",
+                    _(
+                        "Original parent container not found: /${path}",
+                        mapping={"path": original_parent_path},
+                    ),
+                )
+            return []
+
+        conflicts = self._find_name_conflicts(target, items)
+        movable = []
+        for uid, original_id in items:
+            if original_id in conflicts:
+                self._failed(
+                    uid,
+                    "Conflict",
+                    _(
+                        'Name conflict: An object with id "${id}" already exists at /${path}',
+                        mapping={"id": original_id, "path": original_parent_path},
+                    ),
+                )
+            else:
+                movable.append((uid, original_id))
+
+        # The group is moved at once. If that fails, its objects are moved
+        # one by one to find the failing ones.
+        savepoint = transaction.savepoint(optimistic=True)
+        try:
+            return self._move(target, original_parent_path, movable, objs)
+        except Exception as e:
+            logger.warning(f"Restoring {len(movable)} objects at once failed: {e}")
+            savepoint.rollback()
+
+        restored = []
+        for item in movable:
+            savepoint = transaction.savepoint(optimistic=True)
+            try:
+                restored += self._move(target, original_parent_path, [item], objs)
+            except Exception as e:
+                logger.error(f"Error during withdrawal of {item[0]}: {e}")
+                savepoint.rollback()
+                self._failed(
+                    item[0],
+                    "InternalError",
+                    _("Error restoring object: ${error}", mapping={"error": str(e)}),
+                )
+        return restored
+
+    def _move(
+        self,
+        target: DexterityContent,
+        original_parent_path: str,
+        items: list[tuple[str, str]],
+        objs: dict[str, DexterityContent],
+    ) -> list[str]:
+        if not items:
+            return []
+        move_objects(target, [(objs[uid], original_id) for uid, original_id in items])
+        for uid, original_id in items:
+            self._restored(uid, f"/{original_parent_path}/{original_id}")
+        return [uid for uid, _original_id in items]
+
+    def reply(self) -> dict[str, Any]:
+        if "IDisableCSRFProtection" in dir(plone.protect.interfaces):
+            alsoProvides(self.request, plone.protect.interfaces.IDisableCSRFProtection)
+
+        uids = self._parse_uids()
+        if uids is None:
+            return create_error_response(
+                self.request,
+                400,
+                "BadRequest",
+                _("A non-empty list of UIDs is required"),
+            )
+
+        entries = DeletionLog.get_pending_entries_by_uids(uids)
+        for uid in uids:
+            if uid not in entries:
+                self._failed(
+                    uid,
+                    "NotFound",
+                    _(
+                        "No pending deletion log entry found for UID: ${uid}",
+                        mapping={"uid": uid},
+                    ),
+                )
+
+        objs = self._get_objects([uid for uid in uids if uid in entries])
+        restored = []
+
+        # Objects marked in place stay where they are
+        for uid, obj in list(objs.items()):
+            if IMarkedForDeletion.providedBy(obj):
+                unmark_for_deletion(obj)
+                self._restored(uid, "/".join(obj.getPhysicalPath()))
+                restored.append(uid)
+                del objs[uid]
+
+        if objs and MARKED_FOR_DELETION_CONTAINER_ID not in api.portal.get():
+            for uid in objs:
+                self._failed(
+                    uid, "InternalError", _("Marked deletion container not found")
+                )
+            objs = {}
+
+        for original_parent_path, items in self._group_by_parent(entries, objs).items():
+            restored += self._restore_group(original_parent_path, items, objs)
+
+        DeletionLog.update_entries_status(restored, "withdrawn")
+
+        logger.info(f"Bulk withdrawal: {len(restored)} of {len(uids)} objects restored")
+
+        return create_success_response(
+            self.request,
+            _(
+                "${restored} of ${total} objects have been restored",
+                mapping={"restored": len(restored), "total": len(uids)},
+            ),
+            restored=len(restored),
+            failed=len(uids) - len(restored),
+            results=[self.results[uid] for uid in uids],
+        )
@@ -0,0 +1,63 @@
+from typing import Any
+
+from plone import api
+from plone.dexterity.content import DexterityContent
+from plone.restapi.services import Service
+from zope.interface import implementer
+from zope.publisher.interfaces import IPublishTraverse
+from zope.publisher.interfaces.browser import IBrowserRequest
+
+from interaktiv.gdpr import _
+from interaktiv.gdpr.jobs import DeletionJob, get_job, get_jobs
+from interaktiv.gdpr.utils import create_error_response
+
+
+@implementer(IPublishTraverse)
+class JobsGet(Service):
+    """Report the progress of the background deletion jobs.
+
+    @gdpr-jobs/<id> returns a single job, @gdpr-jobs all jobs, newest
+    first. Users who may not view the controlpanel only see their own jobs.
+    """
+
+    def __init__(self, context: DexterityContent, request: IBrowserRequest) -> None:
+        self.context = context
+        self.request = request
+        self.job_id: str | None = None
+
+    def publishTraverse(self, request: IBrowserRequest, name: str) -> "JobsGet":
+        self.job_id = name
+        return self
+
+    def _may_view(self, job: DeletionJob) -> bool:
+        if api.user.has_permission(
+            "interaktiv.gdpr: View Controlpanel", obj=self.context
+        ):
+            return True
+        return job.user_id == api.user.get_current().getId()
+
+    def _serialize(self, job: DeletionJob) -> dict[str, Any]:
+        return {
+            "@id": f"{self.context.absolute_url()}/@gdpr-jobs/{job.id}",
+            **job.to_dict(),
+        }
+
+    def reply(self) -> dict[str, Any]:
+        if self.job_id is None:
+            jobs = [job for job in (get_jobs() or {}).values() if self._may_view(job)]
+            jobs.sort(key=lambda job: job.created, reverse=True)
+            return {
+                "items": [self._serialize(job) for job in jobs],
+                "items_total": len(jobs),
+            }
+
+        job = get_job(self.job_id)
+        if job is None or not self._may_view(job):
+            return create_error_response(
+                self.request,
+                404,
+                "NotFound",
+                _("Job ${id} not found", mapping={"id": self.job_id}),
+            )
+
+        return self._serialize(job)
@@ -0,0 +1,49 @@
+from itertools import islice
+from typing import Any
+
+from interaktiv.gdpr.archive import get_deletion_log_archive
+from interaktiv.gdpr.deletion_log import DeletionLog
+from interaktiv.gdpr.services.log.get import DeletionLogGet
+
+
+class DeletionLogArchiveGet(DeletionLogGet):
+    """List the archive segments and search the archived entries.
+
+    Matching entries are streamed from the segments until the requested
+    page is filled, so no total is returned.
+    """
+
+    def _get_segments(self) -> list[dict[str, Any]]:
+        archive = get_deletion_log_archive()
+        if archive is None:
+            return []
+
+        portal_url = self.context.absolute_url()
+        segments = []
+        for segment_id, segment in archive.segments.items():
+            info = segment.info()
+            info["id"] = segment_id
+            info["download_url"] = (
+                f"{portal_url}/@@gdpr-deletion-log-archive-download"
+                f"?segment={segment_id}"
+            )
+            segments.append(info)
+        return segments
+
+    def reply(self) -> dict[str, Any]:
+        start, size = self._get_pagination_params()
+
+        entries = DeletionLog.search_archive(
+            since=self._get_datetime_param("since"),
+            until=self._get_datetime_param("until"),
+            uid=self.request.get("uid") or None,
+            status=self.request.get("status") or None,
+        )
+        items = list(islice(entries, start, start + size))
+
+        return {
+            "segments": self._get_segments(),
+            "items": items,
+            "start": start,
+            "size": len(items),
+        }
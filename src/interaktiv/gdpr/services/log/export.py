@@ -0,0 +1,63 @@
+import csv
+import io
+import json
+import tempfile
+from datetime import date
+from typing import IO
+
+from interaktiv.gdpr.deletion_log import DeletionLog
+from interaktiv.gdpr.services.log.get import DeletionLogGet
+from interaktiv.gdpr.storage import RECORD_FIELDS
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+class DeletionLogExportGet(DeletionLogGet):
+    """Export all entries matching the filters of @gdpr-deletion-log as
+    NDJSON (default) or CSV file.
+
+    The entries are written one by one into a temporary file on disk,
+    which is sent as response body after the transaction has ended. Neither
+    the log nor the export is held in memory at once.
+    """
+
+    def _get_format(self) -> str:
+        export_format = self.request.get("format", "ndjson")
+        return export_format if export_format in EXPORT_FORMATS else "ndjson"
+
+    def _write_entries(self, export_format: str, stream: IO[str]) -> None:
+        entries = DeletionLog.iter_search_deletion_log(**self._get_query_params())
+        if export_format == "csv":
+            writer = csv.DictWriter(stream, fieldnames=RECORD_FIELDS)
+            writer.writeheader()
+            writer.writerows(entries)
+        else:
+            for entry in entries:
+                stream.write(json.dumps(entry))
+                stream.write("\n")
+
+    def render(self) -> IO[bytes]:
+        self.check_permission()
+        # The file is the response body, it is not serialized as JSON
+        return self.reply()
+
+    def reply(self) -> IO[bytes]:
+        export_format = self._get_format()
+
+        stream = io.TextIOWrapper(
+            tempfile.TemporaryFile(), encoding="utf-8", newline=""
+        )
+        self._write_entries(export_format, stream)
+        body = stream.detach()
+        body.seek(0)
+
+        filename = f"deletion-log-{date.today():%Y%m%d}.{export_format}"
+        response = self.request.response
+        response.setHeader(
+            "Content-Type", f"{EXPORT_FORMATS[export_format]}; charset=utf-8"
+        )
+        response.setHeader("Content-Disposition", f'attachment; filename="{filename}"')
+        return body
@@ -1,16 +1,23 @@
+from datetime import date, datetime, timedelta
+from itertools import islice
 from typing import Any
 
-from plone import api
 from plone.dexterity.content import DexterityContent
 from plone.restapi.services import Service
 from zope.publisher.interfaces.browser import IBrowserRequest
 
 from interaktiv.gdpr.deletion_log import DeletionLog
 from interaktiv.gdpr.registry.deletion_log import TDeletionLogEntry
+from interaktiv.gdpr.resolver import resolve_uids
+from interaktiv.gdpr.storage import SORTABLE_FIELDS
+from interaktiv.gdpr.utils import is_not_modified
 
 DEFAULT_PAGE_SIZE = 50
 MAX_PAGE_SIZE = 500
 
+# Query parameters filtering on one or several values of an entry field
+FILTER_PARAMS = ("status", "portal_type", "user_id")
+
 
 class DeletionLogGet(Service):
 
@@ -33,26 +40,99 @@ class DeletionLogGet(Service):
 
         return start, size
 
+    def _get_days_param(self) -> int | None:
+        try:
+            days = int(self.request.get("days", ""))
+        except (ValueError, TypeError):
+            return None
+        return days if days > 0 else None
+
+    def _get_datetime_param(self, name: str) -> datetime | None:
+        try:
+            return datetime.fromisoformat(self.request.get(name, ""))
+        except (ValueError, TypeError):
+            return None
+
+    def _get_list_param(self, name: str) -> list[str] | None:
+        value = self.request.form.get(name)
+        if not value:
+            return None
+        values = value if isinstance(value, list) else [value]
+        return [str(value) for value in values if value] or None
+
+    def _get_query_params(self) -> dict[str, Any]:
+        query: dict[str, Any] = {}
+        for name in FILTER_PARAMS:
+            values = self._get_list_param(name)
+            if values is not None:
+                query[name] = values
+
+        since = self._get_datetime_param("since")
+        days = self._get_days_param()
+        if since is None and days is not None:
+            since = datetime.now() - timedelta(days=days)
+        if since is not None:
+            query["since"] = since
+        until = self._get_datetime_param("until")
+        if until is not None:
+            query["until"] = until
+
+        for name in ("path", "title"):
+            value = self.request.get(name)
+            if value and isinstance(value, str):
+                query[name] = value
+
+        sort_on = self.request.get("sort_on")
+        if sort_on in SORTABLE_FIELDS:
+            query["sort_on"] = sort_on
+        if self.request.get("sort_order") in ("descending", "reverse"):
+            query["reverse"] = True
+
+        return query
+
     # noinspection PyMethodMayBeStatic
-    def _enrich_entry(self, entry: TDeletionLogEntry) -> dict[str, Any]:
-        enriched_entry: dict[str, Any] = dict(entry)
+    def _enrich_entries(self, entries: list[TDeletionLogEntry]) -> list[dict[str, Any]]:
+        # The current location of all pending entries of the page is read
+        # from the catalog with one query, without waking the objects
+        brains = resolve_uids(
+            entry["uid"] for entry in entries if entry["status"] == "pending"
+        )
 
-        if entry["status"] == "pending":
-            obj = api.content.get(UID=entry["uid"])
-            if obj:
-                enriched_entry["current_path"] = "/".join(obj.getPhysicalPath())
-                enriched_entry["current_url"] = obj.absolute_url()
+        enriched_entries = []
+        for entry in entries:
+            enriched_entry: dict[str, Any] = dict(entry)
 
-        return enriched_entry
+            brain = brains.get(entry["uid"]) if entry["status"] == "pending" else None
+            if brain is not None:
+                enriched_entry["current_path"] = brain.getPath()
+                enriched_entry["current_url"] = brain.getURL()
+
+            enriched_entries.append(enriched_entry)
+        return enriched_entries
 
     def reply(self) -> dict[str, Any]:
-        log = DeletionLog.get_deletion_log()
-        total = len(log)
+        counter, modified = DeletionLog.get_deletion_log_version()
+        etag = f"{counter}-{int(modified)}"
+        if self._get_days_param() is not None:
+            # The window of the last days moves on with the date
+            etag += f"-{date.today().isoformat()}"
+        if is_not_modified(self.request, etag, modified):
+            return self.reply_no_content(status=304)
 
         start, size = self._get_pagination_params()
-        _end = start + size
-        paginated_log = log[start:_end]
-        enriched_log = [self._enrich_entry(entry) for entry in paginated_log]
+        query = self._get_query_params()
+
+        if query:
+            # Answered from the indexes, only the records of the page are read
+            total, paginated_log = DeletionLog.search_deletion_log(
+                start=start, size=size, **query
+            )
+        else:
+            total = DeletionLog.get_deletion_log_length()
+            paginated_log = list(
+                islice(DeletionLog.iter_deletion_log(start=start), size)
+            )
+        enriched_log = self._enrich_entries(paginated_log)
 
         return {
             "items": enriched_log,
@@ -1,8 +1,8 @@
-from plone import api
 from plone.restapi.services import Service
 
 from interaktiv.gdpr.deletion_log import DeletionLog
-from interaktiv.gdpr.registry.deletion_log import IGDPRSettingsSchema
+from interaktiv.gdpr.settings import get_gdpr_settings, get_settings_version
+from interaktiv.gdpr.utils import is_not_modified
 
 
 class GDPRSettingsGet(Service):
@@ -11,20 +11,23 @@ class GDPRSettingsGet(Service):
         self.request = request
 
     def reply(self):
-        try:
-            enabled = api.portal.get_registry_record(
-                name="marked_deletion_enabled", interface=IGDPRSettingsSchema
-            )
-        except (KeyError, api.exc.InvalidParameterError):
-            enabled = True
+        # Read from the status counter, the log itself is not loaded
+        pending_count = DeletionLog.count_entries_by_status("pending")
+        _counter, modified = DeletionLog.get_deletion_log_version()
+        # The settings and the pending count of the log are returned
+        etag = f"{pending_count}-{get_settings_version(self.context)}"
+        if is_not_modified(self.request, etag, modified):
+            return self.reply_no_content(status=304)
 
-        # Count pending deletions
-        pending_count = len(DeletionLog.get_entries_by_status("pending"))
+        settings = get_gdpr_settings()
 
         return {
-            "marked_deletion_enabled": enabled,
-            "deletion_log_enabled": DeletionLog.is_deletion_log_enabled(),
+            "marked_deletion_enabled": settings.marked_deletion_enabled,
+            "marked_deletion_mode": settings.marked_deletion_mode,
+            "deletion_log_enabled": settings.deletion_log_enabled,
             "pending_deletions_count": pending_count,
-            "retention_days": DeletionLog.get_retention_days(),
-            "display_days": DeletionLog.get_display_days(),
+            "retention_days": settings.retention_days,
+            "display_days": settings.display_days,
+            "archive_days": settings.archive_days,
+            "async_threshold": settings.async_threshold,
         }
@@ -10,16 +10,22 @@ from zope.publisher.interfaces.browser import IBrowserRequest
 
 from interaktiv.gdpr import create_marked_deletion_container, logger
 from interaktiv.gdpr.deletion_log import DeletionLog
-from interaktiv.gdpr.registry.deletion_log import IGDPRSettingsSchema
+from interaktiv.gdpr.registry.deletion_log import (
+    MARKED_DELETION_MODES,
+    IGDPRSettingsSchema,
+)
 
 
 class GDPRSettingsSet(Service):
 
     VALID_SETTINGS = [
         "marked_deletion_enabled",
+        "marked_deletion_mode",
         "deletion_log_enabled",
         "retention_days",
         "display_days",
+        "archive_days",
+        "async_threshold",
     ]
 
     def __init__(self, context: DexterityContent, request: IBrowserRequest) -> None:
@@ -39,7 +45,9 @@ class GDPRSettingsSet(Service):
                 "error": {
                     "type": "BadRequest",
                     "message": "At least one setting is required: "
-                    "marked_deletion_enabled, deletion_log_enabled, retention_days, or display_days",
+                    "marked_deletion_enabled, marked_deletion_mode, "
+                    "deletion_log_enabled, retention_days, "
+                    "display_days, archive_days, or async_threshold",
                 }
             }
         return None
@@ -53,15 +61,15 @@ class GDPRSettingsSet(Service):
         new_value = bool(data["marked_deletion_enabled"])
 
         if not new_value:
-            pending_entries = DeletionLog.get_entries_by_status("pending")
-            if pending_entries:
+            pending_count = DeletionLog.count_entries_by_status("pending")
+            if pending_count:
                 self.request.response.setStatus(409)
                 return {
                     "error": {
                         "type": "Conflict",
                         "message": "Es sind noch ausstehende Löschungen aktiv. "
                         "Lösen Sie diese auf, um das Feature zu deaktivieren.",
-                        "pending_count": len(pending_entries),
+                        "pending_count": pending_count,
                     }
                 }
 
@@ -80,6 +88,34 @@ class GDPRSettingsSet(Service):
         result["marked_deletion_enabled"] = new_value
         return None
 
+    def _handle_marked_deletion_mode(
+        self, data: dict[str, Any], result: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        if "marked_deletion_mode" not in data:
+            return None
+
+        new_value = data["marked_deletion_mode"]
+        if new_value not in MARKED_DELETION_MODES:
+            self.request.response.setStatus(400)
+            return {
+                "error": {
+                    "type": "BadRequest",
+                    "message": "marked_deletion_mode must be one of: "
+                    f"{', '.join(MARKED_DELETION_MODES)}",
+                }
+            }
+
+        # Pending items of the other mode are still withdrawn and deleted
+        # as marked, so the mode can be changed at any time
+        api.portal.set_registry_record(
+            name="marked_deletion_mode",
+            interface=IGDPRSettingsSchema,
+            value=new_value,
+        )
+        logger.info(f"GDPR marked deletion mode set to {new_value}")
+        result["marked_deletion_mode"] = new_value
+        return None
+
     def _handle_deletion_log_enabled(
         self, data: dict[str, Any], result: dict[str, Any]
     ) -> None:
@@ -154,6 +190,61 @@ class GDPRSettingsSet(Service):
         result["display_days"] = display_days
         return None
 
+    def _handle_archive_days(
+        self, data: dict[str, Any], result: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        if "archive_days" not in data:
+            return None
+
+        try:
+            archive_days = int(data["archive_days"])
+            if archive_days < 1:
+                raise ValueError("Must be at least 1")
+
+        except (ValueError, TypeError):
+            self.request.response.setStatus(400)
+            return {
+                "error": {
+                    "type": "BadRequest",
+                    "message": "archive_days must be a positive integer (minimum 1)",
+                }
+            }
+
+        api.portal.set_registry_record(
+            name="archive_days", interface=IGDPRSettingsSchema, value=archive_days
+        )
+        logger.info(f"GDPR archive_days set to {archive_days}")
+        result["archive_days"] = archive_days
+        return None
+
+    def _handle_async_threshold(
+        self, data: dict[str, Any], result: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        if "async_threshold" not in data:
+            return None
+
+        try:
+            async_threshold = int(data["async_threshold"])
+            if async_threshold < 0:
+                raise ValueError("Must be at least 0")
+
+        except (ValueError, TypeError):
+            self.request.response.setStatus(400)
+            return {
+                "error": {
+                    "type": "BadRequest",
+                    "message": "async_threshold must be a non-negative integer "
+                    "(0 disables background jobs)",
+                }
+            }
+
+        api.portal.set_registry_record(
+            name="async_threshold", interface=IGDPRSettingsSchema, value=async_threshold
+        )
+        logger.info(f"GDPR async_threshold set to {async_threshold}")
+        result["async_threshold"] = async_threshold
+        return None
+
     def reply(self) -> dict[str, Any]:
         if "IDisableCSRFProtection" in dir(plone.protect.interfaces):
             alsoProvides(self.request, plone.protect.interfaces.IDisableCSRFProtection)
@@ -168,6 +259,9 @@ class GDPRSettingsSet(Service):
         if error := self._handle_marked_deletion_enabled(data, result):
             return error
 
+        if error := self._handle_marked_deletion_mode(data, result):
+            return error
+
         self._handle_deletion_log_enabled(data, result)
 
         if error := self._handle_retention_days(data, result):
@@ -176,4 +270,10 @@ class GDPRSettingsSet(Service):
         if error := self._handle_display_days(data, result):
             return error
 
+        if error := self._handle_archive_days(data, result):
+            return error
+
+        if error := self._handle_async_threshold(data, result):
+            return error
+
         return result
@@ -0,0 +1,101 @@
+import random
+from dataclasses import dataclass, fields
+
+from BTrees.Length import Length
+from plone import api
+from plone.registry.interfaces import IRecordEvent
+from zope.annotation.interfaces import IAnnotations
+
+from interaktiv.gdpr.registry.deletion_log import IGDPRSettingsSchema
+from interaktiv.gdpr.utils import get_registry_setting
+
+SETTINGS_VERSION_ANNOTATION_KEY = "interaktiv.gdpr.settings_version"
+
+
+@dataclass(frozen=True)
+class GDPRSettings:
+    """Snapshot of the IGDPRSettingsSchema records.
+
+    The defaults are used for records that don't exist, e.g. before the
+    profile or one of its upgrade steps is applied.
+    """
+
+    marked_deletion_enabled: bool = True
+    marked_deletion_mode: str = "container"
+    deletion_log_enabled: bool = False
+    retention_days: int = 30
+    display_days: int = 90
+    archive_days: int = 365
+    async_threshold: int = 0
+
+    @classmethod
+    def from_registry(cls) -> "GDPRSettings":
+        values = {}
+        for field in fields(cls):
+            value = get_registry_setting(field.name, IGDPRSettingsSchema)
+            if value is not None:
+                values[field.name] = value
+        return cls(**values)
+
+
+# Site path -> (settings version, snapshot)
+_settings_cache: dict[str, tuple[int, GDPRSettings]] = {}
+
+
+def _get_site_key(portal) -> str:
+    return "/".join(portal.getPhysicalPath())
+
+
+def get_settings_version(portal) -> int:
+    counter = IAnnotations(portal).get(SETTINGS_VERSION_ANNOTATION_KEY)
+    return counter() if counter is not None else 0
+
+
+def get_gdpr_settings() -> GDPRSettings:
+    """Return the GDPR settings of the current site.
+
+    The snapshot is cached per site and process. Every change of a
+    settings record changes the persistent version of the site, so a
+    snapshot cached before a change on another ZEO client is detected by
+    comparing versions and read again.
+    """
+    try:
+        portal = api.portal.get()
+    except api.exc.CannotGetPortalError:
+        return GDPRSettings()
+
+    site_key = _get_site_key(portal)
+    version = get_settings_version(portal)
+    cached = _settings_cache.get(site_key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    settings = GDPRSettings.from_registry()
+    _settings_cache[site_key] = (version, settings)
+    return settings
+
+
+def invalidate_gdpr_settings() -> None:
+    portal = api.portal.get()
+    _settings_cache.pop(_get_site_key(portal), None)
+
+    annotations = IAnnotations(portal)
+    counter = annotations.get(SETTINGS_VERSION_ANNOTATION_KEY)
+    if counter is None:
+        counter = annotations[SETTINGS_VERSION_ANNOTATION_KEY] = Length()
+    # A random step instead of 1, so a version bumped by an aborted
+    # transaction is not reused by the next committed change. Length
+    # resolves conflicting changes by adding both steps.
+    counter.change(random.randint(1, 2**31))
+
+
+def handle_settings_record_changed(event: IRecordEvent) -> None:
+    # Records are also added and removed by the upgrade steps of the
+    # profile, a snapshot cached before would keep their defaults
+    name = getattr(event.record, "__name__", None) or ""
+    if not name.startswith(f"{IGDPRSettingsSchema.__identifier__}."):
+        return
+    try:
+        invalidate_gdpr_settings()
+    except api.exc.CannotGetPortalError:
+        pass
@@ -0,0 +1,848 @@
+import random
+import sys
+import time
+from collections.abc import Iterable, Iterator
+from datetime import datetime, timedelta, timezone
+from itertools import chain, islice
+from typing import Any
+
+from BTrees.IOBTree import IOBTree
+from BTrees.Length import Length
+from BTrees.LLBTree import LLSet, LLTreeSet, intersection, multiunion
+from BTrees.LOBTree import LOBTree
+from BTrees.OOBTree import OOBTree
+from persistent import Persistent
+from plone import api
+from zope.annotation.interfaces import IAnnotations
+
+from interaktiv.gdpr.config import DELETION_LOG_STATUSES
+from interaktiv.gdpr.registry.deletion_log import TDeletionLogEntry
+
+DELETION_LOG_ANNOTATION_KEY = "interaktiv.gdpr.deletion_log"
+
+# Entry fields with a secondary index of value -> entry ids
+INDEXED_FIELDS = ("uid", "status", "portal_type", "user_id", "original_path")
+# Indexed fields with few distinct values. Their values always map to a set
+# of entry ids, so concurrent appends only add to the existing sets.
+SET_INDEXED_FIELDS = ("status", "portal_type", "user_id")
+# Indexed fields the results of DeletionLogStorage.query() can be sorted on,
+# besides the time the entries were logged
+SORTABLE_FIELDS = ("status", "portal_type", "user_id", "original_path")
+
+# Entry ids carry their partition key (YYYYMM) above this bit
+PARTITION_SHIFT = 43
+# Number of random low bits in an entry id
+ID_RANDOM_BITS = 21
+
+# Entries without a parseable datetime are in partition 0, all ids of
+# dated entries are at least this
+MIN_DATED_ENTRY_ID = 1 << PARTITION_SHIFT
+
+# Kept as the smallest key of every index set, see _new_index_set()
+INDEX_SENTINEL = -1
+
+# Order of the fields in the persisted state of a DeletionLogRecord
+RECORD_FIELDS = (
+    "uid",
+    "datetime",
+    "title",
+    "portal_type",
+    "original_path",
+    "user_id",
+    "subobject_count",
+    "review_state",
+    "status",
+    "status_changed",
+    "status_changed_by",
+)
+_RECORD_FIELD_INDEXES = {name: index for index, name in enumerate(RECORD_FIELDS)}
+# Fields stored as integer microseconds since EPOCH, in UTC
+TIMESTAMP_FIELDS = ("datetime", "status_changed")
+# Fields with few distinct values, sharing one string object in memory
+INTERNED_FIELDS = ("portal_type", "user_id", "review_state", "status_changed_by")
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class DeletionLogRecord(Persistent):
+    """A single deletion log entry, stored as its own persistent object.
+
+    Updating an entry only rewrites this record, never the whole log. The
+    fields are kept in a tuple in the order of RECORD_FIELDS: the status
+    as its index in DELETION_LOG_STATUSES, datetimes as integer UTC
+    microseconds since the epoch and fields with few distinct values as
+    interned strings. to_dict() returns the TDeletionLogEntry shape, with
+    datetimes as ISO strings in UTC.
+    """
+
+    __slots__ = ("_values",)
+
+    def __init__(self, entry: TDeletionLogEntry) -> None:
+        self._values = tuple(
+            _encode_field(name, entry.get(name)) for name in RECORD_FIELDS
+        )
+
+    def __getstate__(self) -> tuple:
+        return self._values
+
+    def __setstate__(self, state: tuple) -> None:
+        self._values = state
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        index = _RECORD_FIELD_INDEXES.get(key)
+        if index is None:
+            return default
+        value = self._values[index]
+        if value is None:
+            return default
+        return _decode_field(key, value)
+
+    def get_timestamp(self, key: str = "datetime") -> int | None:
+        """Return a datetime field as microseconds since the epoch."""
+        value = self._values[_RECORD_FIELD_INDEXES[key]]
+        return value if isinstance(value, int) else None
+
+    def update(self, **changes: Any) -> None:
+        values = list(self._values)
+        for name, value in changes.items():
+            values[_RECORD_FIELD_INDEXES[name]] = _encode_field(name, value)
+        self._values = tuple(values)
+
+    def to_dict(self) -> TDeletionLogEntry:
+        return {
+            name: _decode_field(name, value)
+            for name, value in zip(RECORD_FIELDS, self._values, strict=True)
+            if value is not None
+        }
+
+
+class DeletionLogPartition(Persistent):
+    """All deletion log entries logged within one calendar month."""
+
+    def __init__(self) -> None:
+        self.entries = LOBTree()
+        self.length = Length()
+
+    def __len__(self) -> int:
+        return self.length()
+
+
+class DeletionLogVersion(Persistent):
+    """Version of the deletion log, changed by every write.
+
+    Holds a counter and the time of the last change in seconds since the
+    epoch. Like a BTrees Length, concurrent changes are merged: the
+    counter by adding up both increments, the time by taking the later.
+    """
+
+    def __init__(self) -> None:
+        self.counter = 0
+        self.modified = 0.0
+
+    def bump(self) -> None:
+        self.counter += 1
+        self.modified = time.time()
+
+    def _p_resolveConflict(self, old: dict, committed: dict, new: dict) -> dict:
+        return {
+            "counter": committed["counter"] + new["counter"] - old["counter"],
+            "modified": max(committed["modified"], new["modified"]),
+        }
+
+
+def _parse_datetime(value: datetime | str | None) -> datetime | None:
+    """Return a datetime or ISO string as datetime in UTC.
+
+    Naive values are taken as local time of the server, which is how
+    entries were logged before their times were kept in UTC.
+    """
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    return value.astimezone(timezone.utc)
+
+
+def datetime_to_timestamp(value: datetime | str | None) -> int | None:
+    """Return a datetime or ISO string as UTC microseconds since the epoch."""
+    value = _parse_datetime(value)
+    if value is None:
+        return None
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+def timestamp_to_datetime(timestamp: int) -> datetime:
+    return EPOCH + timedelta(microseconds=timestamp)
+
+
+def _encode_field(name: str, value: Any) -> Any:
+    if value is None:
+        return None
+    if name in TIMESTAMP_FIELDS:
+        timestamp = datetime_to_timestamp(value)
+        # Unparseable values are kept as they are
+        return value if timestamp is None else timestamp
+    if name == "status" and value in DELETION_LOG_STATUSES:
+        return DELETION_LOG_STATUSES.index(value)
+    if name in INTERNED_FIELDS and isinstance(value, str):
+        return sys.intern(value)
+    return value
+
+
+def _decode_field(name: str, value: Any) -> Any:
+    if name in TIMESTAMP_FIELDS and isinstance(value, int):
+        return timestamp_to_datetime(value).isoformat()
+    if name == "status" and isinstance(value, int):
+        return DELETION_LOG_STATUSES[value]
+    return value
+
+
+def get_partition_key(value: datetime | str | None) -> int:
+    """Return the partition key (YYYYMM) for a datetime or ISO string.
+
+    Entries without a parseable datetime end up in partition 0.
+    """
+    value = _parse_datetime(value)
+    if value is None:
+        return 0
+    return value.year * 100 + value.month
+
+
+def _next_partition_key(partition_key: int) -> int:
+    year, month = divmod(partition_key, 100)
+    if month == 12:
+        return (year + 1) * 100 + 1
+    return partition_key + 1
+
+
+def get_entry_partition_key(entry_id: int) -> int:
+    return entry_id >> PARTITION_SHIFT
+
+
+def get_min_entry_id(partition_key: int, logged: datetime | None) -> int:
+    """Return the smallest id of an entry logged in the second of logged,
+    a datetime in UTC."""
+    offset = 0
+    if logged is not None:
+        offset = (
+            ((logged.day - 1) * 24 + logged.hour) * 60 + logged.minute
+        ) * 60 + logged.second
+    return (partition_key << PARTITION_SHIFT) | (offset << ID_RANDOM_BITS)
+
+
+def _get_entry_id_range(
+    since: datetime | None, until: datetime | None
+) -> tuple[int, int | None]:
+    # Entry ids are ordered by the time the entries were logged, so a time
+    # window is a range of ids. Both ends are inclusive.
+    since = _parse_datetime(since)
+    until = _parse_datetime(until)
+    min_id = 0
+    if since is not None:
+        min_id = get_min_entry_id(get_partition_key(since), since)
+    max_id = None
+    if until is not None:
+        max_id = get_min_entry_id(get_partition_key(until), until) | (
+            (1 << ID_RANDOM_BITS) - 1
+        )
+    return min_id, max_id
+
+
+def _reverse_items(tree: Any, min_key: int | None = None) -> Iterator[tuple[int, Any]]:
+    # BTrees can only iterate forwards, so walk the keys backwards with
+    # maxKey() instead of materializing the whole key list.
+    if not tree:
+        return
+    key = tree.maxKey()
+    while min_key is None or key >= min_key:
+        yield key, tree[key]
+        try:
+            key = tree.maxKey(key - 1)
+        except ValueError:
+            return
+
+
+def _reverse_keys(ids: Any, min_id: int, max_id: int | None) -> Iterator[int]:
+    # Like _reverse_items() for the keys from max_id down to min_id
+    try:
+        entry_id = ids.maxKey() if max_id is None else ids.maxKey(max_id)
+    except ValueError:
+        return
+    while entry_id >= min_id:
+        yield entry_id
+        try:
+            entry_id = ids.maxKey(entry_id - 1)
+        except ValueError:
+            return
+
+
+class DeletionLogStorage(Persistent):
+    """Persistent storage of the deletion log.
+
+    Entries are partitioned by the month they were logged in. Each
+    partition keeps its entries in a LOBTree keyed by an entry id that
+    encodes the partition key in its upper bits, so ids sort by time and
+    appending an entry only touches the last bucket of the current month.
+    Queries for a time window only load the partitions overlapping it;
+    older partitions stay ghosts. The fields in INDEXED_FIELDS are
+    additionally indexed as value -> entry id, or LLTreeSet of entry ids
+    for values of several entries. The number of entries per status is
+    kept in a Length per status, see count_status().
+    """
+
+    def __init__(self) -> None:
+        self._partitions = IOBTree()
+        self._length = Length()
+        self._indexes = OOBTree()
+        self._init_indexes()
+        self._status_counts = OOBTree()
+        self._init_status_counts()
+        self.version = DeletionLogVersion()
+
+    def __len__(self) -> int:
+        return self._length()
+
+    def _get_partition(
+        self, partition_key: int, create: bool = False
+    ) -> DeletionLogPartition | None:
+        partition = self._partitions.get(partition_key)
+        if partition is None and create:
+            partition = self._partitions[partition_key] = DeletionLogPartition()
+        return partition
+
+    @staticmethod
+    def _new_id(
+        partition_key: int, logged: datetime | None, partition: DeletionLogPartition
+    ) -> int:
+        # Below the partition key, an id holds the second within the month
+        # followed by random bits. Ids stay ordered by time, while two
+        # transactions appending concurrently pick different keys, so the
+        # bucket conflict resolution of the BTree can merge both inserts.
+        entry_id = get_min_entry_id(partition_key, logged) | random.getrandbits(
+            ID_RANDOM_BITS
+        )
+
+        # Entries appended through this connection within the same second
+        # keep the order they were appended in.
+        last_id = getattr(partition, "_v_last_id", None)
+        if (
+            last_id is not None
+            and entry_id >> ID_RANDOM_BITS == last_id >> ID_RANDOM_BITS
+        ):
+            entry_id = max(entry_id, last_id + 1)
+
+        while entry_id in partition.entries:
+            entry_id += 1
+        partition._v_last_id = entry_id
+        return entry_id
+
+    @staticmethod
+    def _new_index_set() -> LLTreeSet:
+        # BTrees refuse to resolve a conflict in which a transaction removes
+        # the first key of a bucket or empties it. The sentinel stays the
+        # first key of the set, so concurrent status changes of the oldest
+        # entries, e.g. by the scheduled deletion, can still be merged.
+        return LLTreeSet([INDEX_SENTINEL])
+
+    def _index(self, name: str, value: Any, entry_id: int) -> None:
+        # Like the ZCatalog indexes, a value of a single entry maps to its
+        # id and only values of several entries get a set. Most uids and
+        # paths are logged once, which saves a persistent object per entry.
+        index = self._indexes[name]
+        entry_ids = index.get(value)
+        if entry_ids is None and name in SET_INDEXED_FIELDS:
+            index[value] = self._new_index_set()
+            index[value].add(entry_id)
+        elif entry_ids is None:
+            index[value] = entry_id
+        elif isinstance(entry_ids, int):
+            if entry_ids != entry_id:
+                index[value] = self._new_index_set()
+                index[value].update((entry_ids, entry_id))
+        else:
+            entry_ids.add(entry_id)
+
+    def _unindex(
+        self, name: str, value: Any, entry_id: int, prune: bool = False
+    ) -> None:
+        index = self._indexes[name]
+        entry_ids = index.get(value)
+        if entry_ids is None:
+            return
+        if isinstance(entry_ids, int):
+            if entry_ids == entry_id:
+                del index[value]
+            return
+        if entry_id in entry_ids:
+            entry_ids.remove(entry_id)
+        # Empty sets are only pruned when entries are removed. Dropping and
+        # re-adding the key on status changes would turn concurrent
+        # transitions into unresolvable conflicts on the index itself. The
+        # pre-created status sets are never pruned, see _init_indexes().
+        if prune and len(entry_ids) == 1 and not self._is_precreated(name, value):
+            del index[value]
+
+    @staticmethod
+    def _is_precreated(name: str, value: Any) -> bool:
+        return name == "status" and value in DELETION_LOG_STATUSES
+
+    def append(self, entry: TDeletionLogEntry) -> int:
+        logged = _parse_datetime(entry.get("datetime"))
+        partition_key = get_partition_key(logged)
+        partition = self._get_partition(partition_key, create=True)
+        entry_id = self._new_id(partition_key, logged, partition)
+
+        # Create the next month's partition ahead of time, so concurrent
+        # appends at the turn of the month don't race to create it.
+        if partition_key:
+            self._get_partition(_next_partition_key(partition_key), create=True)
+
+        record = DeletionLogRecord(entry)
+        partition.entries[entry_id] = record
+        partition.length.change(1)
+        self._length.change(1)
+
+        for name in INDEXED_FIELDS:
+            self._index(name, record.get(name), entry_id)
+        self._change_status_count(record.get("status"), 1)
+        self.version.bump()
+        return entry_id
+
+    def get(self, entry_id: int) -> DeletionLogRecord | None:
+        partition = self._get_partition(get_entry_partition_key(entry_id))
+        if partition is None:
+            return None
+        return partition.entries.get(entry_id)
+
+    def update(self, entry_id: int, **changes: Any) -> DeletionLogRecord | None:
+        record = self.get(entry_id)
+        if record is None:
+            return None
+
+        for name in INDEXED_FIELDS:
+            if name in changes and changes[name] != record.get(name):
+                self._unindex(name, record.get(name), entry_id)
+                self._index(name, changes[name], entry_id)
+
+        if "status" in changes and changes["status"] != record.get("status"):
+            self._change_status_count(record.get("status"), -1)
+            self._change_status_count(changes["status"], 1)
+
+        record.update(**changes)
+        self.version.bump()
+        return record
+
+    def remove(self, entry_id: int) -> DeletionLogRecord | None:
+        record = self.get(entry_id)
+        if record is None:
+            return None
+
+        for name in INDEXED_FIELDS:
+            self._unindex(name, record.get(name), entry_id, prune=True)
+        self._change_status_count(record.get("status"), -1)
+
+        partition = self._get_partition(get_entry_partition_key(entry_id))
+        del partition.entries[entry_id]
+        partition.length.change(-1)
+        self._length.change(-1)
+        self.version.bump()
+        return record
+
+    def get_ids(self, name: str, value: Any) -> Iterable[int]:
+        """Return the ids of all entries whose indexed field equals value."""
+        entry_ids = self._indexes[name].get(value)
+        if entry_ids is None:
+            return ()
+        if isinstance(entry_ids, int):
+            return (entry_ids,)
+        return entry_ids.keys(min=0)
+
+    def get_first_id(self, name: str, value: Any, min_id: int = 0) -> int | None:
+        """Return the smallest id, i.e. the oldest entry, of the entries
+        whose indexed field equals value, not below min_id."""
+        entry_ids = self._indexes[name].get(value)
+        if entry_ids is None:
+            return None
+        if isinstance(entry_ids, int):
+            return entry_ids if entry_ids >= min_id else None
+        try:
+            return entry_ids.minKey(max(min_id, 0))
+        except ValueError:
+            return None
+
+    def count_status(self, status: str) -> int:
+        """Return the number of entries with the given status.
+
+        Reads the counter of the status instead of its index.
+        """
+        count = self._status_counts.get(status)
+        return count() if count is not None else 0
+
+    def _change_status_count(self, status: str | None, delta: int) -> None:
+        count = self._status_counts.get(status)
+        if count is None:
+            count = self._status_counts[status] = Length()
+        count.change(delta)
+
+    def has_id(self, name: str, value: Any, entry_id: int) -> bool:
+        entry_ids = self._indexes[name].get(value)
+        if isinstance(entry_ids, int):
+            return entry_ids == entry_id
+        return entry_ids is not None and entry_id in entry_ids
+
+    def _get_id_set(self, name: str, values: Iterable[Any]) -> LLSet | LLTreeSet:
+        index = self._indexes[name]
+        id_sets = [index.get(value, LLSet()) for value in values]
+        # The set of a single value is used as it is instead of copied
+        if len(id_sets) == 1 and not isinstance(id_sets[0], int):
+            return id_sets[0]
+        return multiunion(id_sets)
+
+    def _get_path_id_set(self, path: str) -> LLSet:
+        # The index is ordered by path, so the paths below path are one
+        # range of keys starting at path itself
+        path = path.rstrip("/")
+        index = self._indexes["original_path"]
+        entry_ids = []
+        for value, ids in index.items(min=path):
+            if value != path and not value.startswith(path + "/"):
+                if not value.startswith(path):
+                    break
+                continue
+            entry_ids.append(ids)
+        return multiunion(entry_ids)
+
+    def _select(
+        self,
+        status: str | Iterable[str] | None,
+        portal_type: str | Iterable[str] | None,
+        user_id: str | Iterable[str] | None,
+        since: datetime | None,
+        until: datetime | None,
+        path: str | None,
+        min_id: int,
+    ) -> tuple[Any, int, int | None]:
+        # Returns the set of the ids matching the indexed criteria, None
+        # for all entries, and the range of ids within it. The ids are
+        # read from it lazily, so no more ids are read than needed and they
+        # can be counted without being listed.
+        id_sets = []
+        for name, values in (
+            ("status", status),
+            ("portal_type", portal_type),
+            ("user_id", user_id),
+        ):
+            if values is None:
+                continue
+            if isinstance(values, str):
+                values = [values]
+            id_sets.append(self._get_id_set(name, values))
+        if path:
+            id_sets.append(self._get_path_id_set(path))
+
+        since_id, max_id = _get_entry_id_range(since, until)
+        min_id = max(min_id, since_id)
+        if not id_sets:
+            return None, min_id, max_id
+
+        # The smallest set first keeps the intersections cheap
+        id_sets.sort(key=len)
+        result = id_sets[0]
+        for entry_ids in id_sets[1:]:
+            result = intersection(result, entry_ids)
+        return result, min_id, max_id
+
+    def _iter_range(
+        self, ids: Any, min_id: int, max_id: int | None, reverse: bool
+    ) -> Iterator[int]:
+        if reverse:
+            return _reverse_keys(ids, min_id, max_id)
+        return iter(ids.keys(min=min_id, max=max_id))
+
+    def _iter_ids(
+        self, id_set: Any, min_id: int, max_id: int | None, reverse: bool
+    ) -> Iterator[int]:
+        # In time order, newest first with reverse
+        if id_set is not None:
+            return self._iter_range(id_set, min_id, max_id, reverse)
+
+        max_key = get_entry_partition_key(max_id) if max_id is not None else None
+        partitions = [
+            partition
+            for _partition_key, partition in self._partitions.items(
+                min=get_entry_partition_key(min_id), max=max_key
+            )
+        ]
+        if reverse:
+            partitions.reverse()
+        return chain.from_iterable(
+            self._iter_range(partition.entries, min_id, max_id, reverse)
+            for partition in partitions
+        )
+
+    def _iter_sorted_ids(
+        self,
+        sort_on: str,
+        id_set: Any,
+        min_id: int,
+        max_id: int | None,
+        reverse: bool,
+    ) -> Iterator[int]:
+        # Walks the index in value order, entries with the same value stay
+        # in time order. Only the values up to the last id read are visited.
+        values = self._indexes[sort_on].values()
+        if reverse:
+            values = reversed(list(values))
+        for ids in values:
+            if isinstance(ids, int):
+                if (
+                    ids >= min_id
+                    and (max_id is None or ids <= max_id)
+                    and (id_set is None or ids in id_set)
+                ):
+                    yield ids
+                continue
+            if id_set is not None:
+                ids = intersection(ids, id_set)
+            yield from self._iter_range(ids, min_id, max_id, reverse)
+
+    def query(
+        self,
+        status: str | Iterable[str] | None = None,
+        portal_type: str | Iterable[str] | None = None,
+        user_id: str | Iterable[str] | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        path: str | None = None,
+        title: str | None = None,
+        sort_on: str | None = None,
+        reverse: bool = False,
+        min_id: int = 0,
+        limit: int | None = None,
+    ) -> list[int]:
+        """Return the ids of the entries matching all given criteria.
+
+        status, portal_type and user_id take a value or a list of values.
+        They are answered from their indexes, path from the original_path
+        index, matching the entries logged at or below path. since and
+        until (both inclusive) restrict the time the entries were logged,
+        which is a range of entry ids, min_id restricts the ids directly.
+        Only title, matched as case insensitive substring, reads the
+        records of the remaining entries.
+
+        The ids are in time order, or ordered by the indexed field sort_on.
+        At most limit ids are returned, only these are read from the
+        indexes, in either direction.
+        """
+        if sort_on is not None and sort_on not in SORTABLE_FIELDS:
+            raise ValueError(f"Cannot sort on {sort_on!r}")
+
+        id_set, min_id, max_id = self._select(
+            status, portal_type, user_id, since, until, path, min_id
+        )
+        if sort_on is None:
+            entry_ids = self._iter_ids(id_set, min_id, max_id, reverse)
+        else:
+            entry_ids = self._iter_sorted_ids(sort_on, id_set, min_id, max_id, reverse)
+
+        if title:
+            title = title.lower()
+            entry_ids = (
+                entry_id
+                for entry_id in entry_ids
+                if title in str(self.get(entry_id).get("title", "")).lower()
+            )
+
+        return list(islice(entry_ids, limit))
+
+    def count(
+        self,
+        status: str | Iterable[str] | None = None,
+        portal_type: str | Iterable[str] | None = None,
+        user_id: str | Iterable[str] | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        path: str | None = None,
+        min_id: int = 0,
+    ) -> int:
+        """Return the number of entries query() finds for the given
+        criteria, without building the list of their ids.
+
+        A single status without further criteria is read from its counter,
+        see count_status().
+        """
+        if isinstance(status, str) and not (
+            portal_type or user_id or since or until or path or min_id
+        ):
+            return self.count_status(status)
+
+        id_set, min_id, max_id = self._select(
+            status, portal_type, user_id, since, until, path, min_id
+        )
+        if id_set is not None:
+            return len(id_set.keys(min=min_id, max=max_id))
+
+        max_key = get_entry_partition_key(max_id) if max_id is not None else None
+        return sum(
+            len(partition.entries.keys(min=min_id, max=max_id))
+            for _partition_key, partition in self._partitions.items(
+                min=get_entry_partition_key(min_id), max=max_key
+            )
+        )
+
+    def partition_keys(self) -> list[int]:
+        return list(self._partitions.keys())
+
+    def items_of_partition(
+        self, partition_key: int
+    ) -> Iterator[tuple[int, DeletionLogRecord]]:
+        partition = self._get_partition(partition_key)
+        if partition is None:
+            return iter(())
+        return iter(partition.entries.items())
+
+    def remove_empty_partitions(self, before: int) -> None:
+        """Drop the empty partitions with a key lower than before."""
+        for partition_key in list(self._partitions.keys(max=before, excludemax=True)):
+            if not len(self._partitions[partition_key]):
+                del self._partitions[partition_key]
+
+    def _init_indexes(self) -> None:
+        for name in INDEXED_FIELDS:
+            self._indexes[name] = OOBTree()
+        # Pre-create the status sets so the first transitions into a status
+        # don't race to create them.
+        for status in DELETION_LOG_STATUSES:
+            self._indexes["status"][status] = self._new_index_set()
+
+    def _init_status_counts(self) -> None:
+        # Like the status sets, the counters of the known statuses exist
+        # from the start. A Length merges concurrent changes.
+        self._status_counts.clear()
+        for status in DELETION_LOG_STATUSES:
+            self._status_counts[status] = Length()
+
+    def rebuild_indexes(self) -> None:
+        self._init_indexes()
+
+        for entry_id, record in self.items():
+            for name in INDEXED_FIELDS:
+                self._index(name, record.get(name), entry_id)
+        self.repair_status_counts()
+
+    def repair_status_counts(self) -> dict[str, int]:
+        """Recompute the counters of all statuses from the status index.
+
+        Returns the statuses whose counter was wrong, mapped to the
+        difference that was corrected.
+        """
+        corrected: dict[str, int] = {}
+        counts = {
+            status: len(self.get_ids("status", status))
+            for status in self._indexes["status"].keys()
+        }
+        for status in set(counts) | set(self._status_counts.keys()):
+            expected = counts.get(status, 0)
+            difference = expected - self.count_status(status)
+            if difference:
+                corrected[status] = difference
+                self._change_status_count(status, difference)
+        return corrected
+
+    def verify_indexes(self) -> list[str]:
+        """Compare the indexes with the stored entries.
+
+        Returns a list of human readable problems, empty if consistent.
+        """
+        problems: list[str] = []
+        for name in INDEXED_FIELDS:
+            expected: dict[Any, set[int]] = {}
+            for entry_id, record in self.items():
+                expected.setdefault(record.get(name), set()).add(entry_id)
+
+            index = self._indexes[name]
+            for value in set(expected) | set(index.keys()):
+                indexed_ids = set(self.get_ids(name, value))
+                if indexed_ids != expected.get(value, set()):
+                    problems.append(
+                        f"Index '{name}' is inconsistent for value {value!r}"
+                    )
+
+        counts: dict[Any, int] = {}
+        for record in self.values():
+            counts[record.get("status")] = counts.get(record.get("status"), 0) + 1
+        for status in set(counts) | set(self._status_counts.keys()):
+            if self.count_status(status) != counts.get(status, 0):
+                problems.append(f"Counter of status {status!r} is inconsistent")
+        return problems
+
+    def items(
+        self,
+        start: int = 0,
+        since: datetime | None = None,
+        reverse: bool = False,
+    ) -> Iterator[tuple[int, DeletionLogRecord]]:
+        """Iterate over the entries in id (i.e. time) order.
+
+        start skips that many entries, using the partition lengths to skip
+        whole partitions without loading them. since restricts the
+        iteration to the partitions overlapping [since, now]; entries of
+        the first of these partitions may still be older than since.
+        """
+        min_key = get_partition_key(since) if since is not None else None
+
+        if reverse:
+            partitions = _reverse_items(self._partitions, min_key=min_key)
+        else:
+            partitions = self._partitions.items(min=min_key)
+
+        for _partition_key, partition in partitions:
+            partition_length = len(partition)
+            if start >= partition_length:
+                start -= partition_length
+                continue
+
+            if reverse:
+                entries = _reverse_items(partition.entries)
+            else:
+                entries = partition.entries.items()
+
+            yield from islice(entries, start, None)
+            start = 0
+
+    def values(
+        self,
+        start: int = 0,
+        since: datetime | None = None,
+        reverse: bool = False,
+    ) -> Iterator[DeletionLogRecord]:
+        for _entry_id, record in self.items(start=start, since=since, reverse=reverse):
+            yield record
+
+    def clear(self) -> None:
+        self._partitions.clear()
+        self._length.set(0)
+        self._init_indexes()
+        self._init_status_counts()
+        self.version.bump()
+
+
+def get_deletion_log_storage(create: bool = False) -> DeletionLogStorage | None:
+    portal = api.portal.get()
+    annotations = IAnnotations(portal)
+    storage = annotations.get(DELETION_LOG_ANNOTATION_KEY)
+
+    if storage is None and create:
+        storage = DeletionLogStorage()
+        annotations[DELETION_LOG_ANNOTATION_KEY] = storage
+
+    return storage
@@ -0,0 +1,244 @@
+import gzip
+import json
+from datetime import datetime, timedelta
+from unittest import mock
+
+from interaktiv.gdpr import archive
+from interaktiv.gdpr.archive import (
+    DeletionLogArchive,
+    DeletionLogArchiveSegment,
+    get_deletion_log_archive,
+)
+from interaktiv.gdpr.deletion_log import DeletionLog
+from interaktiv.gdpr.storage import DeletionLogRecord, DeletionLogStorage
+from interaktiv.gdpr.testing import (
+    INTERAKTIV_GDPR_INTEGRATION_TESTING,
+    InteraktivGDPRTestCase,
+)
+
+
+def _entry(uid: str, logged: datetime, status: str = "deleted") -> dict:
+    return {
+        "uid": uid,
+        "datetime": logged.isoformat(),
+        "title": f"Title {uid}",
+        "portal_type": "Document",
+        "original_path": f"/plone/{uid}",
+        "user_id": "admin",
+        "status": status,
+        "status_changed": logged.isoformat(),
+        "status_changed_by": "admin",
+    }
+
+
+class TestDeletionLogArchiveSegment(InteraktivGDPRTestCase):
+    layer = INTERAKTIV_GDPR_INTEGRATION_TESTING
+
+    def setUp(self):
+        super().setUp()
+        self.original_entries_per_member = archive.ENTRIES_PER_MEMBER
+        archive.ENTRIES_PER_MEMBER = 10
+        start = datetime(2023, 1, 1)
+        self.records = [
+            DeletionLogRecord(_entry(f"uid-{i}", start + timedelta(hours=i)))
+            for i in range(35)
+        ]
+
+    def tearDown(self):
+        archive.ENTRIES_PER_MEMBER = self.original_entries_per_member
+        super().tearDown()
+
+    def test_init__writes_gzip_json_lines(self):
+        # do it
+        segment = DeletionLogArchiveSegment(self.records)
+
+        # postcondition
+        with segment.open() as blob_file:
+            lines = gzip.decompress(blob_file.read()).splitlines()
+        self.assertEqual(len(lines), 35)
+        self.assertEqual(json.loads(lines[0]), self.records[0].to_dict())
+        self.assertEqual(segment.count, 35)
+
+    def test_init__builds_sparse_index(self):
+        # do it
+        segment = DeletionLogArchiveSegment(self.records)
+
+        # postcondition
+        self.assertEqual(len(segment.sparse_index), 4)
+        self.assertEqual(segment.sparse_index[0][1], 0)
+        self.assertEqual(
+            [timestamp for timestamp, _offset in segment.sparse_index],
+            [self.records[i].get_timestamp() for i in (0, 10, 20, 30)],
+        )
+
+    def test_iter_entries__time_window(self):
+        # setup
+        segment = DeletionLogArchiveSegment(self.records)
+
+        # do it
+        result = list(
+            segment.iter_entries(
+                since=self.records[12].get_timestamp(),
+                until=self.records[21].get_timestamp(),
+            )
+        )
+
+        # postcondition
+        self.assertEqual(
+            [entry["uid"] for entry in result], [f"uid-{i}" for i in range(12, 22)]
+        )
+
+
+class TestDeletionLogArchive(InteraktivGDPRTestCase):
+    layer = INTERAKTIV_GDPR_INTEGRATION_TESTING
+
+    def setUp(self):
+        super().setUp()
+        self.storage = DeletionLogStorage()
+        self.archive = DeletionLogArchive()
+        self.now = datetime.now()
+
+    def test_rotate__moves_old_entries(self):
+        # setup
+        self.storage.append(_entry("uid-old", self.now - timedelta(days=400)))
+        self.storage.append(_entry("uid-new", self.now - timedelta(days=10)))
+
+        # do it
+        result = self.archive.rotate(self.storage, self.now - timedelta(days=365))
+
+        # postcondition
+        self.assertEqual(result, 1)
+        self.assertEqual(
+            [record["uid"] for record in self.storage.values()], ["uid-new"]
+        )
+        self.assertEqual(len(self.archive), 1)
+        self.assertEqual([entry["uid"] for entry in self.archive.search()], ["uid-old"])
+        self.assertEqual(self.storage.verify_indexes(), [])
+
+    def test_rotate__keeps_precreated_status_sets(self):
+        # setup
+        self.storage.append(_entry("uid-old", self.now - timedelta(days=400)))
+
+        # do it
+        self.archive.rotate(self.storage, self.now - timedelta(days=365))
+
+        # postcondition
+        self.assertIn("deleted", self.storage._indexes["status"])
+        self.assertEqual(list(self.storage.get_ids("status", "deleted")), [])
+        self.assertEqual(self.storage.verify_indexes(), [])
+
+    def test_rotate__writes_bounded_segments_per_partition(self):
+        # setup
+        for i in range(5):
+            self.storage.append(
+                _entry(f"uid-{i}", datetime(2020, 1, 1) + timedelta(days=i))
+            )
+        for i in range(2):
+            self.storage.append(
+                _entry(f"uid-feb-{i}", datetime(2020, 2, 1) + timedelta(days=i))
+            )
+
+        # do it
+        with mock.patch.object(archive, "MAX_SEGMENT_ENTRIES", 2):
+            result = self.archive.rotate(self.storage, self.now)
+
+        # postcondition
+        self.assertEqual(result, 7)
+        self.assertEqual(
+            [segment.count for segment in self.archive.segments.values()],
+            [2, 2, 1, 2],
+        )
+        self.assertEqual(len(self.storage), 0)
+
+    def test_rotate__keeps_pending_entries(self):
+        # setup
+        self.storage.append(
+            _entry("uid-pending", self.now - timedelta(days=400), status="pending")
+        )
+
+        # do it
+        result = self.archive.rotate(self.storage, self.now - timedelta(days=365))
+
+        # postcondition
+        self.assertEqual(result, 0)
+        self.assertEqual(len(self.storage), 1)
+        self.assertEqual(len(self.archive.segments), 0)
+
+    def test_rotate__keeps_recently_changed_entries(self):
+        # setup
+        entry = _entry("uid-old", self.now - timedelta(days=400))
+        entry["status_changed"] = self.now.isoformat()
+        self.storage.append(entry)
+
+        # do it
+        result = self.archive.rotate(self.storage, self.now - timedelta(days=365))
+
+        # postcondition
+        self.assertEqual(result, 0)
+        self.assertEqual(len(self.storage), 1)
+
+    def test_rotate__removes_empty_partitions(self):
+        # setup
+        logged = self.now - timedelta(days=400)
+        self.storage.append(_entry("uid-old", logged))
+
+        # do it
+        self.archive.rotate(self.storage, self.now - timedelta(days=365))
+
+        # postcondition
+        self.assertNotIn(
+            logged.year * 100 + logged.month, self.storage.partition_keys()
+        )
+
+    def test_search__filters(self):
+        # setup
+        start = datetime(2023, 1, 1)
+        self.archive.add_segment(
+            [
+                DeletionLogRecord(_entry("uid-1", start)),
+                DeletionLogRecord(
+                    _entry("uid-2", start + timedelta(days=1), status="withdrawn")
+                ),
+            ]
+        )
+        self.archive.add_segment(
+            [DeletionLogRecord(_entry("uid-3", start + timedelta(days=40)))]
+        )
+
+        # do it
+        by_status = list(self.archive.search(status="withdrawn"))
+        by_uid = list(self.archive.search(uid="uid-3"))
+        by_time = list(self.archive.search(since=start + timedelta(days=30)))
+
+        # postcondition
+        self.assertEqual([entry["uid"] for entry in by_status], ["uid-2"])
+        self.assertEqual([entry["uid"] for entry in by_uid], ["uid-3"])
+        self.assertEqual([entry["uid"] for entry in by_time], ["uid-3"])
+
+
+class TestRotateDeletionLog(InteraktivGDPRTestCase):
+    layer = INTERAKTIV_GDPR_INTEGRATION_TESTING
+
+    def test_rotate_deletion_log(self):
+        # setup
+        now = datetime.now()
+        DeletionLog.set_deletion_log(
+            [
+                _entry("uid-old", now - timedelta(days=400)),
+                _entry("uid-new", now - timedelta(days=10)),
+            ]
+        )
+
+        # do it
+        result = DeletionLog.rotate_deletion_log()
+
+        # postcondition
+        self.assertEqual(result, 1)
+        self.assertEqual(
+            [entry["uid"] for entry in DeletionLog.get_deletion_log()], ["uid-new"]
+        )
+        self.assertEqual(len(get_deletion_log_archive()), 1)
+        self.assertEqual(
+            [entry["uid"] for entry in DeletionLog.search_archive(uid="uid-old")],
+            ["uid-old"],
+        )
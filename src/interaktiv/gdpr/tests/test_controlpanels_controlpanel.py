@@ -116,42 +116,12 @@ class TestControlpanelView(InteraktivGDPRTestCase):
         self.assertIsInstance(result, int)
         self.assertGreater(result, 0)
 
-    def test_get_pending_entries__empty(self):
-        # setup
-        DeletionLog.set_deletion_log([])
-
-        # do it
-        result = self.view.get_pending_entries()
-
-        # postcondition
-        self.assertEqual(result, [])
-
-    def test_get_pending_entries__with_entries(self):
-        # setup
-        document = api.content.create(
-            container=self.portal, type="Document", id="test-doc", title="Test Document"
-        )
-        DeletionLog.add_entry(document, status="pending")
-
-        # do it
-        result = self.view.get_pending_entries()
-
-        # postcondition
-        self.assertGreater(len(result), 0)
-        self.assertEqual(result[0]["status"], "pending")
-
-    def test_get_deletion_log_for_display(self):
-        # setup
-        document = api.content.create(
-            container=self.portal, type="Document", id="test-doc", title="Test Document"
-        )
-        DeletionLog.add_entry(document, status="pending")
-
+    def test_get_archive_days(self):
         # do it
-        result = self.view.get_deletion_log_for_display()
+        result = self.view.get_archive_days()
 
         # postcondition
-        self.assertIsInstance(result, list)
+        self.assertEqual(result, 365)
 
     def test_get_pending_count(self):
         # setup
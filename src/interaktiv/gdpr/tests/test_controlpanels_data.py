@@ -0,0 +1,130 @@
+import json
+from datetime import datetime, timedelta
+from unittest import mock
+
+from interaktiv.gdpr.controlpanels.data import ControlpanelDataView
+from interaktiv.gdpr.deletion_log import DeletionLog
+from interaktiv.gdpr.storage import get_deletion_log_storage
+from interaktiv.gdpr.testing import (
+    INTERAKTIV_GDPR_INTEGRATION_TESTING,
+    InteraktivGDPRTestCase,
+)
+
+
+class TestControlpanelDataView(InteraktivGDPRTestCase):
+    layer = INTERAKTIV_GDPR_INTEGRATION_TESTING
+
+    def setUp(self):
+        super().setUp()
+        now = datetime.now()
+        DeletionLog.set_deletion_log(
+            [
+                {
+                    "uid": f"uid-{i}",
+                    "datetime": (now - timedelta(days=days)).isoformat(),
+                    "title": f"Entry {i}",
+                    "portal_type": portal_type,
+                    "original_path": path,
+                    "user_id": user_id,
+                    "status": status,
+                }
+                for i, (days, portal_type, path, user_id, status) in enumerate(
+                    [
+                        (400, "Document", "/plone/news/a", "alice", "deleted"),
+                        (5, "News Item", "/plone/news/b", "bob", "pending"),
+                        (4, "Document", "/plone/docs/c", "carol", "pending"),
+                        (3, "Document", "/plone/news/d", "alice", "withdrawn"),
+                        (2, "Event", "/plone/news/e", "dave", "pending"),
+                    ]
+                )
+            ]
+        )
+
+    def _call(self, **params) -> dict:
+        self.request.form.update(params)
+        return json.loads(ControlpanelDataView(self.portal, self.request)())
+
+    def test_call__pending_table(self):
+        # do it
+        result = self._call(draw="3", start="0", length="10")
+
+        # postcondition
+        self.assertEqual(result["draw"], 3)
+        self.assertEqual(result["recordsTotal"], 3)
+        self.assertEqual(result["recordsFiltered"], 3)
+        self.assertEqual(
+            [row[0] for row in result["data"]], ["Entry 1", "Entry 2", "Entry 4"]
+        )
+        self.assertIn("showWithdrawModal(&quot;uid-1&quot;", result["data"][0][8])
+
+    def test_call__pending_table_sorted_and_paged(self):
+        # do it
+        result = self._call(
+            start="1", length="1", **{"order[0][column]": "3", "order[0][dir]": "desc"}
+        )
+
+        # postcondition
+        self.assertEqual(result["recordsFiltered"], 3)
+        self.assertEqual([row[0] for row in result["data"]], ["Entry 2"])
+
+    def test_call__pending_table_reads_only_page(self):
+        # setup
+        storage = get_deletion_log_storage()
+
+        # do it
+        with mock.patch.object(storage, "query", wraps=storage.query) as query:
+            result = self._call(start="1", length="1")
+
+        # postcondition
+        self.assertEqual(result["recordsTotal"], 3)
+        self.assertEqual([row[0] for row in result["data"]], ["Entry 2"])
+        self.assertEqual(query.call_count, 1)
+        self.assertEqual(query.call_args.kwargs["limit"], 2)
+
+    def test_call__log_table_limited_to_display_days(self):
+        # do it
+        result = self._call(
+            table="log", **{"order[0][column]": "4", "order[0][dir]": "desc"}
+        )
+
+        # postcondition
+        self.assertEqual(result["recordsTotal"], 4)
+        self.assertEqual(
+            [row[0] for row in result["data"]],
+            ["Entry 4", "Entry 3", "Entry 2", "Entry 1"],
+        )
+        self.assertIn('class="status-withdrawn"', result["data"][1][8])
+
+    def test_call__search_by_title_and_path(self):
+        # do it
+        by_title = self._call(table="log", **{"search[value]": "entry 3"})
+        self.request.form.clear()
+        by_path = self._call(table="log", **{"search[value]": "/plone/news"})
+
+        # postcondition
+        self.assertEqual(by_title["recordsTotal"], 4)
+        self.assertEqual(by_title["recordsFiltered"], 1)
+        self.assertEqual(by_path["recordsFiltered"], 3)
+
+    def test_call__escapes_cells(self):
+        # setup
+        DeletionLog.set_deletion_log(
+            [
+                {
+                    "uid": "uid-x",
+                    "datetime": datetime.now().isoformat(),
+                    "title": "<script>alert(1)</script>",
+                    "portal_type": "Document",
+                    "original_path": "/plone/x",
+                    "user_id": "admin",
+                    "status": "pending",
+                }
+            ]
+        )
+
+        # do it
+        result = self._call()
+
+        # postcondition
+        self.assertEqual(result["data"][0][0], "&lt;script&gt;alert(1)&lt;/script&gt;")
+        self.assertNotIn("<script>", result["data"][0][8])
@@ -1,13 +1,22 @@
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from unittest import mock
 
 import plone.api as api
 from freezegun import freeze_time
 
 from interaktiv.gdpr.deletion_log import DeletionLog
+from interaktiv.gdpr.purge import purge_subtree_batch
+from interaktiv.gdpr.registry.deletion_log import (
+    IDeletionLogSchema,
+    IGDPRSettingsSchema,
+)
+from interaktiv.gdpr.scheduled_deletion import ScheduledDeletionRun
+from interaktiv.gdpr.storage import get_deletion_log_storage
 from interaktiv.gdpr.testing import (
     INTERAKTIV_GDPR_INTEGRATION_TESTING,
     InteraktivGDPRTestCase,
 )
+from interaktiv.gdpr.virtual_deletion import mark_for_deletion
 
 
 class TestDeletionLog(InteraktivGDPRTestCase):
@@ -30,7 +39,7 @@ class TestDeletionLog(InteraktivGDPRTestCase):
         test_log = [
             {
                 "uid": "test-uid",
-                "datetime": datetime.now().isoformat(),
+                "datetime": datetime.now(timezone.utc).isoformat(),
                 "title": "Test Document",
                 "portal_type": "Document",
                 "original_path": "/plone/test-doc",
@@ -91,6 +100,36 @@ class TestDeletionLog(InteraktivGDPRTestCase):
         self.assertEqual(len(result), 1)
         self.assertEqual(result[0]["uid"], "recent-uid")
 
+    def test_get_deletion_log_for_display__keeps_entries_without_datetime(self):
+        # setup
+        undated_entry = {
+            "uid": "undated-uid",
+            "datetime": "not a date",
+            "title": "Undated Entry",
+            "portal_type": "Document",
+            "original_path": "/plone/undated",
+            "user_id": "admin",
+            "status": "deleted",
+        }
+        recent_entry = {
+            "uid": "recent-uid",
+            "datetime": datetime.now().isoformat(),
+            "title": "Recent Entry",
+            "portal_type": "Document",
+            "original_path": "/plone/recent",
+            "user_id": "admin",
+            "status": "pending",
+        }
+        DeletionLog.set_deletion_log([recent_entry, undated_entry])
+
+        # do it
+        result = DeletionLog.get_deletion_log_for_display()
+
+        # postcondition
+        self.assertEqual(
+            [entry["uid"] for entry in result], ["undated-uid", "recent-uid"]
+        )
+
     def test_add_entry__creates_entry(self):
         # setup
         document = api.content.create(
@@ -107,6 +146,22 @@ class TestDeletionLog(InteraktivGDPRTestCase):
         self.assertEqual(result["portal_type"], "Document")
         self.assertEqual(result["status"], "pending")
 
+    def test_add_entry__does_not_write_registry(self):
+        # setup
+        document = api.content.create(
+            container=self.portal, type="Document", id="test-doc", title="Test Document"
+        )
+
+        # do it
+        DeletionLog.add_entry(document, status="pending")
+
+        # postcondition
+        registry_log = api.portal.get_registry_record(
+            name="deletion_log", interface=IDeletionLogSchema
+        )
+        self.assertEqual(registry_log, [])
+        self.assertEqual(len(DeletionLog.get_deletion_log()), 1)
+
     def test_update_entry_status(self):
         # setup
         document = api.content.create(
@@ -129,6 +184,45 @@ class TestDeletionLog(InteraktivGDPRTestCase):
         # postcondition
         self.assertIsNone(result)
 
+    def test_update_entries_status(self):
+        # setup
+        documents = [
+            api.content.create(
+                container=self.portal, type="Document", id=f"doc-{i}", title=f"Doc {i}"
+            )
+            for i in range(3)
+        ]
+        for document in documents:
+            DeletionLog.add_entry(document, status="pending")
+        uids = [document.UID() for document in documents[:2]]
+
+        # do it
+        result = DeletionLog.update_entries_status(
+            [*uids, uids[0], "non-existent-uid"], "deleted"
+        )
+
+        # postcondition
+        self.assertEqual([entry["uid"] for entry in result], uids)
+        self.assertTrue(all(entry["status"] == "deleted" for entry in result))
+        pending = DeletionLog.get_entries_by_status("pending")
+        self.assertEqual([entry["uid"] for entry in pending], [documents[2].UID()])
+
+    def test_update_entries_status__log_disabled(self):
+        # setup
+        document = api.content.create(
+            container=self.portal, type="Document", id="test-doc", title="Test Document"
+        )
+        DeletionLog.add_entry(document, status="pending")
+        api.portal.set_registry_record(
+            name="deletion_log_enabled", value=False, interface=IGDPRSettingsSchema
+        )
+
+        # do it
+        result = DeletionLog.update_entries_status([document.UID()], "deleted")
+
+        # postcondition
+        self.assertEqual(result, [])
+
     def test_get_entry_by_uid__found(self):
         # setup
         document = api.content.create(
@@ -180,6 +274,26 @@ class TestDeletionLog(InteraktivGDPRTestCase):
         # postcondition
         self.assertIsNone(result)
 
+    def test_get_pending_entries_by_uids(self):
+        # setup
+        pending = api.content.create(
+            container=self.portal, type="Document", id="pending-doc"
+        )
+        deleted = api.content.create(
+            container=self.portal, type="Document", id="deleted-doc"
+        )
+        DeletionLog.add_entry(pending, status="pending")
+        DeletionLog.add_entry(deleted, status="deleted")
+
+        # do it
+        result = DeletionLog.get_pending_entries_by_uids(
+            [pending.UID(), deleted.UID(), "missing", pending.UID()]
+        )
+
+        # postcondition
+        self.assertEqual(list(result), [pending.UID()])
+        self.assertEqual(result[pending.UID()]["status"], "pending")
+
     def test_get_entries_by_status(self):
         # setup
         doc1 = api.content.create(
@@ -204,6 +318,39 @@ class TestDeletionLog(InteraktivGDPRTestCase):
         self.assertEqual(len(result), 1)
         self.assertEqual(result[0]["title"], "Test Document 1")
 
+    def test_count_entries_by_status(self):
+        # setup
+        documents = [
+            api.content.create(
+                container=self.portal, type="Document", id=f"doc-{i}", title=f"Doc {i}"
+            )
+            for i in range(3)
+        ]
+        DeletionLog.add_entries(documents[:2], status="pending")
+        DeletionLog.add_entry(documents[2], status="deleted")
+
+        # do it
+        result = DeletionLog.count_entries_by_status("pending")
+
+        # postcondition
+        self.assertEqual(result, 2)
+        self.assertEqual(DeletionLog.count_entries_by_status("withdrawn"), 0)
+
+    def test_repair_status_counts(self):
+        # setup
+        document = api.content.create(
+            container=self.portal, type="Document", id="test-doc", title="Test Document"
+        )
+        DeletionLog.add_entry(document, status="pending")
+        get_deletion_log_storage()._status_counts["pending"].set(0)
+
+        # do it
+        result = DeletionLog.repair_status_counts()
+
+        # postcondition
+        self.assertEqual(result, {"pending": 1})
+        self.assertEqual(DeletionLog.count_entries_by_status("pending"), 1)
+
     def test_get_pending_objects(self):
         # setup
         document = api.content.create(
@@ -238,6 +385,69 @@ class TestDeletionLog(InteraktivGDPRTestCase):
         entry = DeletionLog.get_entry_by_uid(doc_uid)
         self.assertEqual(entry["status"], "deleted")
 
+    def test_run_scheduled_deletion__purges_subtree(self):
+        # setup
+        with freeze_time("2000-01-01 12:00:00"):
+            document = api.content.create(
+                container=self.container, type="Document", id="test-doc"
+            )
+            for i in range(3):
+                api.content.create(container=document, type="Document", id=f"c-{i}")
+            DeletionLog.add_entry(document, status="pending")
+        catalog = api.portal.get_tool("portal_catalog")
+        path = "/".join(document.getPhysicalPath())
+
+        # do it
+        DeletionLog.run_scheduled_deletion()
+
+        # postcondition
+        self.assertNotIn("test-doc", self.container.objectIds())
+        self.assertEqual(len(catalog(path=path)), 0)
+        self.assertEqual(DeletionLog.count_entries_by_status("deleted"), 1)
+
+    def test_run_scheduled_deletion__failed_purge_is_rolled_back(self):
+        # setup
+        with freeze_time("2000-01-01 12:00:00"):
+            document = api.content.create(
+                container=self.container, type="Document", id="test-doc"
+            )
+            api.content.create(container=document, type="Document", id="child")
+            DeletionLog.add_entry(document, status="pending")
+
+        def purge(obj):
+            purge_subtree_batch(obj)
+            raise ValueError("Cannot delete")
+
+        # do it
+        with mock.patch("interaktiv.gdpr.deletion_log.purge", purge):
+            DeletionLog.run_scheduled_deletion()
+
+        # postcondition
+        self.assertIn("child", self.container["test-doc"].objectIds())
+        self.assertEqual(
+            DeletionLog.get_entry_by_uid(document.UID())["status"], "pending"
+        )
+
+    def test_run_scheduled_deletion__deletes_marked_in_place(self):
+        # setup
+        with freeze_time("2000-01-01 12:00:00"):
+            document = api.content.create(
+                container=self.portal, type="Document", id="test-doc"
+            )
+            api.content.create(container=document, type="Document", id="child")
+            DeletionLog.add_entry(document, status="pending")
+            mark_for_deletion(document)
+
+        # do it
+        DeletionLog.run_scheduled_deletion()
+
+        # postcondition
+        self.assertNotIn("test-doc", self.portal.objectIds())
+        self.assertEqual(
+            DeletionLog.get_entry_by_uid(document.UID())["status"], "deleted"
+        )
+        self.assertEqual(DeletionLog.get_deletion_log_length(), 1)
+
     def test_run_scheduled_deletion__skips_objects_outside_container(self):
         # setup
         document = api.content.create(
@@ -256,3 +466,133 @@ class TestDeletionLog(InteraktivGDPRTestCase):
         self.assertIn("test-doc", self.portal.objectIds())
         entry = DeletionLog.get_entry_by_uid(doc_uid)
         self.assertEqual(entry["status"], "pending")
+
+    def test_run_scheduled_deletion_batch__moves_cursor_past_skipped(self):
+        # setup
+        with freeze_time("2000-01-01 12:00:00"):
+            outside = api.content.create(
+                container=self.portal, type="Document", id="outside"
+            )
+            inside = api.content.create(
+                container=self.container, type="Document", id="inside"
+            )
+            DeletionLog.add_entries([outside, inside], status="pending")
+        run = ScheduledDeletionRun()
+
+        # do it
+        first = DeletionLog.run_scheduled_deletion_batch(run, batch_size=1)
+        second = DeletionLog.run_scheduled_deletion_batch(run, batch_size=1)
+
+        # postcondition
+        self.assertEqual((first, second), (1, 0))
+        self.assertEqual((run.batches, run.deleted, run.skipped), (2, 1, 1))
+        self.assertEqual(DeletionLog.get_expired_pending_ids(after=run.cursor), [])
+        self.assertEqual(
+            DeletionLog.get_entry_by_uid(outside.UID())["status"], "pending"
+        )
+        self.assertEqual(
+            DeletionLog.get_entry_by_uid(inside.UID())["status"], "deleted"
+        )
+
+    def test_get_expired_pending_ids(self):
+        # setup
+        with freeze_time("2000-01-01 12:00:00"):
+            expired = api.content.create(
+                container=self.container, type="Document", id="expired"
+            )
+            DeletionLog.add_entry(expired, status="pending")
+        document = api.content.create(
+            container=self.container, type="Document", id="recent"
+        )
+        DeletionLog.add_entry(document, status="pending")
+
+        # do it
+        result = DeletionLog.get_expired_pending_entries()
+
+        # postcondition
+        self.assertEqual([entry["uid"] for entry in result], [expired.UID()])
+        self.assertEqual(len(DeletionLog.get_expired_pending_ids()), 1)
+
+    def test_get_expired_pending_ids__after_and_limit(self):
+        # setup
+        with freeze_time("2000-01-01 12:00:00"):
+            documents = [
+                api.content.create(
+                    container=self.container, type="Document", id=f"doc-{i}"
+                )
+                for i in range(4)
+            ]
+            DeletionLog.add_entries(documents, status="pending")
+        entry_ids = DeletionLog.get_expired_pending_ids()
+
+        # do it
+        result = DeletionLog.get_expired_pending_ids(after=entry_ids[0], limit=2)
+
+        # postcondition
+        self.assertEqual(len(entry_ids), 4)
+        self.assertEqual(result, entry_ids[1:3])
+        self.assertEqual(DeletionLog.get_expired_pending_ids(after=entry_ids[-1]), [])
+
+    def test_get_next_expiry(self):
+        # setup
+        with freeze_time("2000-01-01 12:00:00"):
+            first = api.content.create(
+                container=self.container, type="Document", id="first"
+            )
+            DeletionLog.add_entry(first, status="pending")
+        with freeze_time("2000-02-01 12:00:00"):
+            second = api.content.create(
+                container=self.container, type="Document", id="second"
+            )
+            DeletionLog.add_entry(second, status="pending")
+        DeletionLog.update_entry_status(first.UID(), "withdrawn")
+
+        # do it
+        result = DeletionLog.get_next_expiry()
+
+        # postcondition
+        self.assertEqual(result, datetime(2000, 3, 2, 12, 0, tzinfo=timezone.utc))
+
+    def test_get_next_expiry__follows_retention_days(self):
+        # setup
+        with freeze_time("2000-01-01 12:00:00"):
+            document = api.content.create(
+                container=self.container, type="Document", id="test-doc"
+            )
+            DeletionLog.add_entry(document, status="pending")
+
+        # do it
+        api.portal.set_registry_record(
+            name="retention_days", value=10, interface=IGDPRSettingsSchema
+        )
+
+        # postcondition
+        self.assertEqual(
+            DeletionLog.get_next_expiry(),
+            datetime(2000, 1, 11, 12, 0, tzinfo=timezone.utc),
+        )
+
+    def test_get_next_expiry__no_pending_entries(self):
+        # do it
+        result = DeletionLog.get_next_expiry()
+
+        # postcondition
+        self.assertIsNone(result)
+
+    def test_get_pending_entry_by_uid__returns_latest_pending(self):
+        # setup
+        document = api.content.create(
+            container=self.portal, type="Document", id="test-doc", title="Test Document"
+        )
+        doc_uid = document.UID()
+        DeletionLog.add_entry(document, status="pending")
+        DeletionLog.update_entry_status(doc_uid, "withdrawn")
+        DeletionLog.add_entry(document, status="pending")
+
+        # do it
+        result = DeletionLog.get_pending_entry_by_uid(doc_uid)
+
+        # postcondition
+        self.assertEqual(result["status"], "pending")
+        self.assertEqual(len(DeletionLog.get_entries_by_status("withdrawn")), 1)
+        self.assertEqual(len(DeletionLog.get_entries_by_status("pending")), 1)
@@ -0,0 +1,402 @@
+import threading
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import plone.api as api
+import transaction
+from plone.app.testing import TEST_USER_ID
+from ZODB.POSException import ConflictError
+
+from interaktiv.gdpr.config import (
+    MARKED_FOR_DELETION_CONTAINER_ID,
+    MARKED_FOR_DELETION_REQUEST_PARAM_NAME,
+)
+from interaktiv.gdpr.deletion_log import DeletionLog
+from interaktiv.gdpr.interfaces import IMarkedForDeletion
+from interaktiv.gdpr.jobs import (
+    _move_index_batch,
+    get_job,
+    get_jobs,
+    get_subtree_size,
+    queue_job,
+    run_job,
+    should_run_as_job,
+)
+from interaktiv.gdpr.move import get_moving_paths
+from interaktiv.gdpr.registry.deletion_log import IGDPRSettingsSchema
+from interaktiv.gdpr.testing import (
+    INTERAKTIV_GDPR_FUNCTIONAL_TESTING,
+    INTERAKTIV_GDPR_INTEGRATION_TESTING,
+    InteraktivGDPRTestCase,
+)
+
+
+def _create_tree(container, size: int):
+    folder = api.content.create(container=container, type="Document", id="tree")
+    for i in range(size - 1):
+        api.content.create(container=folder, type="Document", id=f"doc-{i}")
+    return folder
+
+
+def _queue_delete_job(request, obj, mark_for_deletion: bool = True):
+    # Like the DELETE service, which sets the request parameter
+    request.set(MARKED_FOR_DELETION_REQUEST_PARAM_NAME, mark_for_deletion)
+    job = queue_job("delete", obj)
+    request.set(MARKED_FOR_DELETION_REQUEST_PARAM_NAME, False)
+    return job
+
+
+class TestJobs(InteraktivGDPRTestCase):
+    layer = INTERAKTIV_GDPR_INTEGRATION_TESTING
+
+    def setUp(self):
+        super().setUp()
+        api.portal.set_registry_record(
+            name="marked_deletion_enabled", interface=IGDPRSettingsSchema, value=True
+        )
+        self.folder = _create_tree(self.portal, 5)
+
+        # Integration tests must not commit
+        patcher = mock.patch("interaktiv.gdpr.jobs.transaction")
+        self.transaction = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _search(self, path: str):
+        catalog = api.portal.get_tool("portal_catalog")
+        return catalog.unrestrictedSearchResults(path=path)
+
+    def test_get_subtree_size(self):
+        # postcondition
+        self.assertEqual(get_subtree_size(self.folder), 5)
+        self.assertEqual(get_subtree_size(self.folder["doc-0"]), 1)
+
+    def test_should_run_as_job(self):
+        # precondition
+        self.assertFalse(should_run_as_job(self.folder))
+
+        # do it
+        api.portal.set_registry_record(
+            name="async_threshold", interface=IGDPRSettingsSchema, value=5
+        )
+
+        # postcondition
+        self.assertTrue(should_run_as_job(self.folder))
+        self.assertFalse(should_run_as_job(self.folder["doc-0"]))
+
+    def test_queue_job(self):
+        # do it
+        job = queue_job("delete", self.folder)
+
+        # postcondition
+        self.assertIs(get_job(job.id), job)
+        self.assertEqual(job.status, "queued")
+        self.assertEqual(job.total, 5)
+        self.assertEqual(job.uid, self.folder.UID())
+        self.assertEqual(job.user_id, TEST_USER_ID)
+        self.transaction.get().addAfterCommitHook.assert_called_once()
+        self.assertIn("tree", self.portal.objectIds())
+
+    def test_queue_job__returns_active_job(self):
+        # setup
+        job = queue_job("delete", self.folder)
+
+        # do it
+        result = queue_job("delete", self.folder)
+
+        # postcondition
+        self.assertIs(result, job)
+        self.assertEqual(len(get_jobs()), 1)
+
+    def test_queue_job__restarts_interrupted_job(self):
+        # setup
+        job = queue_job("delete", self.folder)
+        job.status = "running"
+        job.updated = (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat()
+
+        # precondition
+        self.assertTrue(job.interrupted)
+
+        # do it
+        result = queue_job("delete", self.folder)
+
+        # postcondition
+        self.assertIs(result, job)
+        self.assertEqual(job.status, "queued")
+        self.assertEqual(self.transaction.get().addAfterCommitHook.call_count, 2)
+
+    def test_queue_job__does_not_restart_running_job(self):
+        # setup
+        job = queue_job("delete", self.folder)
+        job.status = "running"
+        job.updated = datetime.now(timezone.utc).isoformat()
+
+        # do it
+        result = queue_job("delete", self.folder)
+
+        # postcondition
+        self.assertIs(result, job)
+        self.assertEqual(job.status, "running")
+        self.transaction.get().addAfterCommitHook.assert_called_once()
+
+    def test_queue_job__removes_old_finished_jobs(self):
+        # setup
+        old = queue_job("delete", self.folder)
+        old.status = "done"
+        old.finished = (datetime.now(timezone.utc) - timedelta(days=8)).isoformat()
+        recent = queue_job("permanent_deletion", self.folder)
+        recent.status = "failed"
+        recent.finished = datetime.now(timezone.utc).isoformat()
+
+        # do it
+        job = queue_job("delete", self.folder)
+
+        # postcondition
+        self.assertEqual(set(get_jobs().keys()), {recent.id, job.id})
+
+    def test_queue_job__unknown_action(self):
+        # do it / postcondition
+        with self.assertRaises(ValueError):
+            queue_job("purge", self.folder)
+
+    def test_run_job__marks_for_deletion(self):
+        # setup
+        job = _queue_delete_job(self.request, self.folder)
+
+        # do it
+        run_job(job.id)
+
+        # postcondition
+        self.assertEqual(job.status, "done")
+        self.assertEqual(job.progress, 5)
+        self.assertIsNotNone(job.finished)
+        self.assertNotIn("tree", self.portal.objectIds())
+        self.assertIn(job.uid, self.container.objectIds())
+        self.assertEqual(DeletionLog.get_pending_entry_by_uid(job.uid)["uid"], job.uid)
+        # One commit for the start of the job, one per step
+        self.assertEqual(self.transaction.commit.call_count, 3)
+        self.assertEqual(len(self._search("/plone/tree")), 0)
+        moved = self._search(f"/plone/{self.container.getId()}/{job.uid}")
+        self.assertEqual(len(moved), 5)
+
+    def test_run_job__moves_in_steps(self):
+        # setup
+        job = _queue_delete_job(self.request, self.folder)
+        steps = []
+
+        def commit():
+            steps.append(
+                (
+                    job.progress,
+                    len(self._search("/plone/tree")),
+                    len(api.portal.get_tool("portal_catalog")(path="/plone/tree")),
+                )
+            )
+
+        self.transaction.commit.side_effect = commit
+
+        # do it
+        with mock.patch("interaktiv.gdpr.jobs.JOB_BATCH_SIZE", 2):
+            run_job(job.id)
+
+        # postcondition
+        self.assertEqual(job.status, "done")
+        self.assertIn(job.uid, self.container.objectIds())
+        # The start, the move of the root, then the catalog entries of its
+        # subtree in batches. Searches leave out the stale entries.
+        self.assertEqual(
+            steps,
+            [(0, 5, 5), (1, 4, 0), (3, 2, 0), (5, 0, 0), (5, 0, 0)],
+        )
+        self.assertNotIn("/plone/tree", get_moving_paths(self.portal))
+        moved = self._search(f"/plone/{self.container.getId()}/{job.uid}")
+        self.assertEqual(len(moved), 5)
+        self.assertEqual(
+            {brain.getObject().UID() for brain in moved},
+            {brain.UID for brain in moved},
+        )
+
+    def test_run_job__failed_move__catalogs_subtree_at_new_path(self):
+        # setup
+        job = _queue_delete_job(self.request, self.folder)
+        calls = []
+
+        def move_index_batch(job, obj):
+            calls.append(obj)
+            if len(calls) == 1:
+                raise ValueError("Step failed")
+            return _move_index_batch(job, obj)
+
+        # do it
+        with mock.patch("interaktiv.gdpr.jobs.JOB_BATCH_SIZE", 2):
+            with mock.patch(
+                "interaktiv.gdpr.jobs._move_index_batch", side_effect=move_index_batch
+            ):
+                run_job(job.id)
+
+        # postcondition
+        self.assertEqual(job.status, "failed")
+        self.assertEqual(job.error, "Step failed")
+        self.assertEqual(len(self._search("/plone/tree")), 0)
+        moved = self._search(f"/plone/{self.container.getId()}/{job.uid}")
+        self.assertEqual(len(moved), 5)
+        self.assertNotIn("/plone/tree", get_moving_paths(self.portal))
+
+    def test_run_job__marks_in_place(self):
+        # setup
+        api.portal.set_registry_record(
+            name="marked_deletion_mode", interface=IGDPRSettingsSchema, value="virtual"
+        )
+        job = _queue_delete_job(self.request, self.folder)
+
+        # do it
+        run_job(job.id)
+
+        # postcondition
+        self.assertEqual(job.status, "done")
+        self.assertEqual(job.progress, 5)
+        self.assertTrue(IMarkedForDeletion.providedBy(self.folder))
+        self.assertEqual(self.transaction.commit.call_count, 2)
+
+    def test_run_job__deletes_directly_without_request_parameter(self):
+        # setup
+        job = _queue_delete_job(self.request, self.folder, mark_for_deletion=False)
+
+        # do it
+        with mock.patch("interaktiv.gdpr.jobs.JOB_BATCH_SIZE", 2):
+            run_job(job.id)
+
+        # postcondition
+        self.assertEqual(job.status, "done")
+        self.assertEqual(job.progress, 5)
+        self.assertNotIn("tree", self.portal.objectIds())
+        self.assertEqual(list(self.container.objectIds()), [])
+        # Only the item itself is logged
+        self.assertEqual(DeletionLog.get_entry_by_uid(job.uid)["status"], "deleted")
+        self.assertEqual(DeletionLog.get_deletion_log_length(), 1)
+        self.assertEqual(self.transaction.commit.call_count, 4)
+
+    def test_run_job__deletes_permanently(self):
+        # setup
+        DeletionLog.add_entry(self.folder, status="pending")
+        job = queue_job("permanent_deletion", self.folder)
+
+        # do it
+        run_job(job.id)
+
+        # postcondition
+        self.assertEqual(job.status, "done")
+        self.assertNotIn("tree", self.portal.objectIds())
+        self.assertEqual(DeletionLog.get_entry_by_uid(job.uid)["status"], "deleted")
+
+    def test_run_job__deletes_permanently_in_steps(self):
+        # setup
+        DeletionLog.add_entry(self.folder, status="pending")
+        job = queue_job("permanent_deletion", self.folder)
+        statuses = []
+
+        def commit():
+            entry = DeletionLog.get_entry_by_uid(job.uid)
+            statuses.append((job.progress, entry["status"]))
+
+        self.transaction.commit.side_effect = commit
+
+        # do it
+        with mock.patch("interaktiv.gdpr.jobs.JOB_BATCH_SIZE", 2):
+            run_job(job.id)
+
+        # postcondition
+        self.assertEqual(job.status, "done")
+        self.assertEqual(job.progress, 5)
+        self.assertNotIn("tree", self.portal.objectIds())
+        # The start, two full batches, then the last item with the root
+        self.assertEqual(
+            statuses,
+            [(0, "pending"), (2, "pending"), (4, "pending"), (5, "deleted")],
+        )
+
+    def test_run_job__runs_as_user_who_queued_it(self):
+        # setup
+        job = _queue_delete_job(self.request, self.folder)
+
+        # do it
+        with api.env.adopt_roles(["Anonymous"]):
+            run_job(job.id)
+
+        # postcondition
+        self.assertEqual(job.status, "done")
+        self.assertIn(job.uid, self.container.objectIds())
+
+    def test_run_job__user_gone__fails(self):
+        # setup
+        job = _queue_delete_job(self.request, self.folder)
+        job.user_id = "removed-user"
+
+        # do it
+        run_job(job.id)
+
+        # postcondition
+        self.assertEqual(job.status, "failed")
+        self.assertIn("tree", self.portal.objectIds())
+
+    def test_run_job__object_gone__fails(self):
+        # setup
+        job = queue_job("permanent_deletion", self.folder)
+        api.content.delete(obj=self.folder)
+
+        # do it
+        run_job(job.id)
+
+        # postcondition
+        self.assertEqual(job.status, "failed")
+        self.assertIn("not found", job.error)
+        self.transaction.abort.assert_called_once()
+
+    def test_run_job__retries_conflicts(self):
+        # setup
+        job = _queue_delete_job(self.request, self.folder)
+        self.transaction.commit.side_effect = [None, ConflictError(), None, None]
+
+        # do it
+        run_job(job.id)
+
+        # postcondition
+        self.assertEqual(job.status, "done")
+        self.assertEqual(self.transaction.abort.call_count, 1)
+
+    def test_run_job__only_runs_queued_jobs(self):
+        # setup
+        job = queue_job("delete", self.folder)
+        job.status = "running"
+
+        # do it
+        run_job(job.id)
+
+        # postcondition
+        self.assertIn("tree", self.portal.objectIds())
+        self.transaction.commit.assert_not_called()
+
+
+class TestJobWorker(InteraktivGDPRTestCase):
+    layer = INTERAKTIV_GDPR_FUNCTIONAL_TESTING
+
+    def test_start_job_worker__runs_job_in_own_connection(self):
+        # setup
+        api.portal.set_registry_record(
+            name="marked_deletion_enabled", interface=IGDPRSettingsSchema, value=True
+        )
+        folder = _create_tree(self.portal, 3)
+        job_id = _queue_delete_job(self.request, folder).id
+
+        # do it
+        # The worker thread is started by the commit
+        transaction.commit()
+        for thread in threading.enumerate():
+            if thread.name == f"gdpr-job-{job_id}":
+                thread.join(30)
+
+        # postcondition
+        self.portal._p_jar.sync()
+        job = get_job(job_id)
+        self.assertEqual(job.status, "done")
+        self.assertNotIn("tree", self.portal.objectIds())
+        self.assertIn(job.uid, self.portal[MARKED_FOR_DELETION_CONTAINER_ID])
@@ -0,0 +1,88 @@
+import plone.api as api
+from OFS.CopySupport import CopyError
+from zope.component import getGlobalSiteManager
+from zope.lifecycleevent.interfaces import IObjectMovedEvent
+
+from interaktiv.gdpr.move import get_container_key, move_object, move_objects
+from interaktiv.gdpr.testing import (
+    INTERAKTIV_GDPR_INTEGRATION_TESTING,
+    InteraktivGDPRTestCase,
+)
+
+
+class TestMove(InteraktivGDPRTestCase):
+    layer = INTERAKTIV_GDPR_INTEGRATION_TESTING
+
+    def test_get_container_key(self):
+        # setup
+        document = api.content.create(
+            container=self.portal, type="Document", id="test-doc"
+        )
+
+        # postcondition
+        self.assertEqual(get_container_key(document), document.UID())
+
+    def test_move_object__moves_under_new_id(self):
+        # setup
+        document = api.content.create(
+            container=self.portal, type="Document", id="test-doc"
+        )
+        uid = document.UID()
+        catalog = api.portal.get_tool("portal_catalog")
+        events = []
+        gsm = getGlobalSiteManager()
+        handler = lambda obj, event: events.append(event)  # noqa: E731
+        gsm.registerHandler(handler, (None, IObjectMovedEvent))
+        self.addCleanup(gsm.unregisterHandler, handler, (None, IObjectMovedEvent))
+
+        # do it
+        moved = move_object(document, self.container, uid)
+
+        # postcondition
+        self.assertNotIn("test-doc", self.portal.objectIds())
+        self.assertIs(moved.aq_base, self.container[uid].aq_base)
+        self.assertEqual(moved.getId(), uid)
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0].oldName, "test-doc")
+        self.assertEqual(events[0].newName, uid)
+        brain = catalog.unrestrictedSearchResults(UID=uid)[0]
+        self.assertEqual(brain.getPath(), "/".join(moved.getPhysicalPath()))
+
+    def test_move_objects__same_ids(self):
+        # setup
+        folder = api.content.create(container=self.portal, type="Document", id="f")
+        documents = [
+            api.content.create(container=parent, type="Document", id="document")
+            for parent in (self.portal, folder)
+        ]
+
+        # do it
+        move_objects(
+            self.container, [(document, document.UID()) for document in documents]
+        )
+
+        # postcondition
+        self.assertEqual(
+            set(self.container.objectIds()),
+            {document.UID() for document in documents},
+        )
+
+    def test_move_objects__id_taken__moves_nothing(self):
+        # setup
+        api.content.create(container=self.container, type="Document", id="taken")
+        first = api.content.create(container=self.portal, type="Document", id="first")
+        second = api.content.create(container=self.portal, type="Document", id="second")
+
+        # do it / postcondition
+        with self.assertRaises(CopyError):
+            move_objects(self.container, [(first, "free"), (second, "taken")])
+        self.assertIn("first", self.portal.objectIds())
+        self.assertIn("second", self.portal.objectIds())
+
+    def test_move_object__into_itself__fails(self):
+        # setup
+        folder = api.content.create(container=self.portal, type="Document", id="f")
+
+        # do it / postcondition
+        with self.assertRaises(CopyError):
+            move_object(folder, folder, "f")
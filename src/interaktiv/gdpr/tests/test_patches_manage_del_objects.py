@@ -6,6 +6,7 @@ from interaktiv.gdpr.config import (
 )
 from interaktiv.gdpr.deletion_log import DeletionLog
 from interaktiv.gdpr.patches.manage_del_objects import (
+    _move_to_container,
     get_marked_deletion_container,
     is_feature_enabled,
     patched_manage_delObjects,
@@ -129,14 +130,16 @@ class TestPatchedManageDelObjects(InteraktivGDPRTestCase):
 
         # precondition
         self.assertIn("test-doc", self.portal.objectIds())
-        self.assertNotIn("test-doc", self.container.objectIds())
+        self.assertNotIn(doc_uid, self.container.objectIds())
 
         # do it
         patched_manage_delObjects(self.portal, ids=["test-doc"])
 
         # postcondition
         self.assertNotIn("test-doc", self.portal.objectIds())
-        self.assertIn("test-doc", self.container.objectIds())
+        # Stored under its UID, the original id is kept in the log
+        self.assertIn(doc_uid, self.container.objectIds())
+        self.assertEqual(self.container[doc_uid].getId(), doc_uid)
         # Entry should be logged as pending
         entry = DeletionLog.get_entry_by_uid(doc_uid)
         self.assertIsNotNone(entry)
@@ -167,7 +170,7 @@ class TestPatchedManageDelObjects(InteraktivGDPRTestCase):
         api.portal.set_registry_record(
             name="marked_deletion_enabled", value=True, interface=IGDPRSettingsSchema
         )
-        api.content.create(
+        document = api.content.create(
             container=self.portal, type="Document", id="test-doc", title="Test Document"
         )
         self.request.set(MARKED_FOR_DELETION_REQUEST_PARAM_NAME, True)
@@ -180,20 +183,20 @@ class TestPatchedManageDelObjects(InteraktivGDPRTestCase):
 
         # postcondition
         self.assertNotIn("test-doc", self.portal.objectIds())
-        self.assertIn("test-doc", self.container.objectIds())
+        self.assertIn(document.UID(), self.container.objectIds())
 
     def test_patched_manage_delObjects__multiple_objects(self):
         # setup
         api.portal.set_registry_record(
             name="marked_deletion_enabled", value=True, interface=IGDPRSettingsSchema
         )
-        api.content.create(
+        first = api.content.create(
             container=self.portal,
             type="Document",
             id="test-doc-1",
             title="Test Document 1",
         )
-        api.content.create(
+        second = api.content.create(
             container=self.portal,
             type="Document",
             id="test-doc-2",
@@ -211,5 +214,90 @@ class TestPatchedManageDelObjects(InteraktivGDPRTestCase):
         # postcondition
         self.assertNotIn("test-doc-1", self.portal.objectIds())
         self.assertNotIn("test-doc-2", self.portal.objectIds())
-        self.assertIn("test-doc-1", self.container.objectIds())
-        self.assertIn("test-doc-2", self.container.objectIds())
+        self.assertIn(first.UID(), self.container.objectIds())
+        self.assertIn(second.UID(), self.container.objectIds())
+
+    def test_patched_manage_delObjects__multiple_objects__skips_missing_id(self):
+        # setup
+        api.portal.set_registry_record(
+            name="marked_deletion_enabled", value=True, interface=IGDPRSettingsSchema
+        )
+        documents = [
+            api.content.create(
+                container=self.portal,
+                type="Document",
+                id=f"test-doc-{i}",
+                title=f"Test Document {i}",
+            )
+            for i in (1, 2)
+        ]
+        self.request.set(MARKED_FOR_DELETION_REQUEST_PARAM_NAME, True)
+
+        # do it
+        result = patched_manage_delObjects(
+            self.portal, ids=["test-doc-1", "missing", "test-doc-2"]
+        )
+
+        # postcondition
+        self.assertEqual(result, ["Test Document 1", "Test Document 2"])
+        self.assertEqual(
+            set(self.container.objectIds()),
+            {document.UID() for document in documents},
+        )
+        pending = DeletionLog.get_entries_by_status("pending")
+        self.assertEqual(
+            [entry["uid"] for entry in pending],
+            [document.UID() for document in documents],
+        )
+        self.assertEqual(pending[0]["original_path"], "/plone/test-doc-1")
+
+    def test_patched_manage_delObjects__multiple_objects__deletes_directly(self):
+        # setup
+        documents = [
+            api.content.create(
+                container=self.portal,
+                type="Document",
+                id=f"test-doc-{i}",
+                title=f"Test Document {i}",
+            )
+            for i in (1, 2)
+        ]
+
+        # do it
+        patched_manage_delObjects(self.portal, ids=["test-doc-1", "test-doc-2"])
+
+        # postcondition
+        deleted = DeletionLog.get_entries_by_status("deleted")
+        self.assertEqual(
+            [entry["uid"] for entry in deleted],
+            [document.UID() for document in documents],
+        )
+
+
+class TestMoveToContainer(InteraktivGDPRTestCase):
+    layer = INTERAKTIV_GDPR_INTEGRATION_TESTING
+
+    def setUp(self):
+        super().setUp()
+        DeletionLog.set_deletion_log([])
+        self.container = self.portal[MARKED_FOR_DELETION_CONTAINER_ID]
+
+    def test_move_to_container__moves_one_by_one_after_failure(self):
+        # setup
+        document = api.content.create(
+            container=self.portal, type="Document", id="test-doc", title="Test Document"
+        )
+        other = api.content.create(
+            container=self.portal, type="Document", id="other-doc", title="Other"
+        )
+        # No longer contained in the portal, so cutting it from there fails
+        self.portal._delObject("other-doc")
+
+        # do it
+        result = _move_to_container(self.container, [document, other])
+
+        # postcondition
+        self.assertEqual(result, ["Test Document"])
+        self.assertEqual(list(self.container.objectIds()), [document.UID()])
+        pending = DeletionLog.get_entries_by_status("pending")
+        self.assertEqual([entry["uid"] for entry in pending], [document.UID()])
@@ -0,0 +1,83 @@
+from unittest import mock
+
+import plone.api as api
+
+from interaktiv.gdpr.purge import iter_subtree_bottom_up, purge, purge_subtree_batch
+from interaktiv.gdpr.testing import (
+    INTERAKTIV_GDPR_INTEGRATION_TESTING,
+    InteraktivGDPRTestCase,
+)
+
+
+class TestPurge(InteraktivGDPRTestCase):
+    layer = INTERAKTIV_GDPR_INTEGRATION_TESTING
+
+    def setUp(self):
+        super().setUp()
+        # tree
+        # ├── a
+        # │   ├── a-1
+        # │   └── a-2
+        # └── b
+        self.tree = api.content.create(
+            container=self.container, type="Document", id="tree"
+        )
+        a = api.content.create(container=self.tree, type="Document", id="a")
+        api.content.create(container=a, type="Document", id="a-1")
+        api.content.create(container=a, type="Document", id="a-2")
+        api.content.create(container=self.tree, type="Document", id="b")
+        self.catalog = api.portal.get_tool("portal_catalog")
+        self.tree_path = "/".join(self.tree.getPhysicalPath())
+
+    def test_iter_subtree_bottom_up(self):
+        # do it
+        result = [obj.getId() for obj in iter_subtree_bottom_up(self.tree)]
+
+        # postcondition
+        self.assertEqual(result, ["b", "a-2", "a-1", "a"])
+
+    def test_iter_subtree_bottom_up__no_children(self):
+        # postcondition
+        self.assertEqual(list(iter_subtree_bottom_up(self.tree["b"])), [])
+
+    def test_purge_subtree_batch(self):
+        # do it
+        result = purge_subtree_batch(self.tree, 2)
+
+        # postcondition
+        self.assertEqual(result, 2)
+        self.assertEqual(self.tree.objectIds(), ["a"])
+        self.assertEqual(self.tree["a"].objectIds(), ["a-1"])
+        self.assertEqual(len(self.catalog(path=self.tree_path)), 3)
+
+    def test_purge_subtree_batch__empties_subtree(self):
+        # setup
+        purge_subtree_batch(self.tree, 3)
+
+        # do it
+        result = purge_subtree_batch(self.tree, 3)
+
+        # postcondition
+        self.assertEqual(result, 1)
+        self.assertEqual(self.tree.objectIds(), [])
+        self.assertEqual(purge_subtree_batch(self.tree, 3), 0)
+
+    def test_purge(self):
+        # do it
+        with mock.patch("interaktiv.gdpr.purge.transaction.savepoint") as savepoint:
+            result = purge(self.tree, batch_size=2)
+
+        # postcondition
+        self.assertEqual(result, 5)
+        self.assertNotIn("tree", self.container.objectIds())
+        self.assertEqual(len(self.catalog(path=self.tree_path)), 0)
+        # One savepoint after every full batch
+        self.assertEqual(savepoint.call_count, 2)
+
+    def test_purge__item_without_children(self):
+        # do it
+        result = purge(self.tree["b"])
+
+        # postcondition
+        self.assertEqual(result, 1)
+        self.assertEqual(self.tree.objectIds(), ["a"])
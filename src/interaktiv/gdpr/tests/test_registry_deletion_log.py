@@ -94,6 +94,24 @@ class TestIGDPRSettingsSchema(InteraktivGDPRTestCase):
         self.assertEqual(field.default, 90)
         self.assertEqual(field.min, 1)
 
+    def test_archive_days_field(self):
+        # postcondition
+        field = IGDPRSettingsSchema["archive_days"]
+        self.assertEqual(field.default, 365)
+        self.assertEqual(field.min, 1)
+
+    def test_marked_deletion_mode_field(self):
+        # postcondition
+        field = IGDPRSettingsSchema["marked_deletion_mode"]
+        self.assertEqual(field.default, "container")
+        self.assertEqual(set(field.vocabulary.by_value), {"container", "virtual"})
+
+    def test_async_threshold_field(self):
+        # postcondition
+        field = IGDPRSettingsSchema["async_threshold"]
+        self.assertEqual(field.default, 0)
+        self.assertEqual(field.min, 0)
+
 
 class TestIDeletionLogSchema(InteraktivGDPRTestCase):
     layer = INTERAKTIV_GDPR_INTEGRATION_TESTING
@@ -0,0 +1,94 @@
+from plone import api
+from zope.annotation.interfaces import IAnnotations
+
+from interaktiv.gdpr.resolver import (
+    RESOLVER_ANNOTATION_KEY,
+    forget_uids,
+    get_object_by_uid,
+    resolve_uids,
+)
+from interaktiv.gdpr.testing import (
+    INTERAKTIV_GDPR_INTEGRATION_TESTING,
+    InteraktivGDPRTestCase,
+)
+
+
+class TestResolveUids(InteraktivGDPRTestCase):
+    layer = INTERAKTIV_GDPR_INTEGRATION_TESTING
+
+    def setUp(self):
+        super().setUp()
+        self.documents = [
+            api.content.create(
+                container=self.portal, type="Document", id=f"doc-{i}", title=f"Doc {i}"
+            )
+            for i in range(3)
+        ]
+        self.uids = [document.UID() for document in self.documents]
+        IAnnotations(self.request).pop(RESOLVER_ANNOTATION_KEY, None)
+
+    def test_resolve_uids(self):
+        # do it
+        result = resolve_uids([*self.uids, "missing-uid"])
+
+        # postcondition
+        self.assertEqual(list(result), self.uids)
+        self.assertEqual(result[self.uids[1]].getPath(), "/plone/doc-1")
+        memo = IAnnotations(self.request)[RESOLVER_ANNOTATION_KEY]
+        self.assertIsNone(memo["missing-uid"])
+
+    def test_resolve_uids__memoized_for_request(self):
+        # setup
+        first = resolve_uids(self.uids)
+
+        # do it
+        result = resolve_uids(self.uids[:1])
+
+        # postcondition
+        # A new query would have returned new brains
+        self.assertIs(result[self.uids[0]], first[self.uids[0]])
+
+    def test_resolve_uids__moved_object_resolved_again(self):
+        # setup
+        resolve_uids(self.uids)
+
+        # do it
+        api.content.rename(obj=self.documents[0], new_id="renamed")
+
+        # postcondition
+        result = resolve_uids(self.uids[:1])
+        self.assertEqual(result[self.uids[0]].getPath(), "/plone/renamed")
+
+    def test_forget_uids(self):
+        # setup
+        resolve_uids(self.uids)
+
+        # do it
+        forget_uids(self.uids[:2])
+
+        # postcondition
+        memo = IAnnotations(self.request)[RESOLVER_ANNOTATION_KEY]
+        self.assertEqual(list(memo), self.uids[2:])
+
+
+class TestGetObjectByUid(InteraktivGDPRTestCase):
+    layer = INTERAKTIV_GDPR_INTEGRATION_TESTING
+
+    def test_get_object_by_uid(self):
+        # setup
+        document = api.content.create(
+            container=self.portal, type="Document", id="test-doc", title="Test Document"
+        )
+
+        # do it
+        result = get_object_by_uid(document.UID())
+
+        # postcondition
+        self.assertEqual(result, document)
+
+    def test_get_object_by_uid__not_found(self):
+        # do it
+        result = get_object_by_uid("missing-uid")
+
+        # postcondition
+        self.assertIsNone(result)
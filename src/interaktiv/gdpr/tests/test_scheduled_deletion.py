@@ -0,0 +1,201 @@
+import shutil
+import tempfile
+
+import transaction
+from BTrees.OOBTree import OOBTree
+from ZODB import DB
+from ZODB.FileStorage import FileStorage
+from ZODB.POSException import ConflictError
+
+from interaktiv.gdpr.scheduled_deletion import (
+    SCHEDULED_DELETION_ANNOTATION_KEY,
+    ScheduledDeletionRun,
+    finish_scheduled_deletion_run,
+    get_scheduled_deletion_run,
+    get_worker,
+)
+from interaktiv.gdpr.storage import DeletionLogStorage
+from interaktiv.gdpr.testing import (
+    INTERAKTIV_GDPR_INTEGRATION_TESTING,
+    InteraktivGDPRTestCase,
+)
+
+
+def _entry(uid: str) -> dict:
+    return {
+        "uid": uid,
+        "datetime": "2024-01-15T10:00:00+00:00",
+        "title": f"Title {uid}",
+        "portal_type": "Document",
+        "original_path": f"/plone/{uid}",
+        "user_id": "admin",
+        "status": "pending",
+    }
+
+
+class TestGetWorker(InteraktivGDPRTestCase):
+    layer = INTERAKTIV_GDPR_INTEGRATION_TESTING
+
+    def test_get_worker__stable_and_spread(self):
+        # setup
+        uids = [f"{i:032x}" for i in range(400)]
+
+        # do it
+        result = [get_worker(uid, 4) for uid in uids]
+
+        # postcondition
+        self.assertEqual(result, [get_worker(uid, 4) for uid in uids])
+        for worker in range(4):
+            self.assertGreater(result.count(worker), 50)
+
+    def test_claims(self):
+        # setup
+        uid = "a" * 32
+        runs = [ScheduledDeletionRun(worker, 3) for worker in range(3)]
+
+        # do it
+        result = [run.claims(uid) for run in runs]
+
+        # postcondition
+        self.assertEqual(result.count(True), 1)
+        self.assertTrue(result[get_worker(uid, 3)])
+        self.assertTrue(ScheduledDeletionRun().claims(uid))
+
+
+class TestGetScheduledDeletionRun(InteraktivGDPRTestCase):
+    layer = INTERAKTIV_GDPR_INTEGRATION_TESTING
+
+    def test_get_scheduled_deletion_run__one_per_worker(self):
+        # do it
+        single = get_scheduled_deletion_run(create=True)
+        first = get_scheduled_deletion_run(create=True, worker=0, workers=2)
+        second = get_scheduled_deletion_run(create=True, worker=1, workers=2)
+
+        # postcondition
+        self.assertEqual(len({id(single), id(first), id(second)}), 3)
+        self.assertEqual((second.worker, second.workers), (1, 2))
+        self.assertIs(get_scheduled_deletion_run(), single)
+
+    def test_finish_scheduled_deletion_run(self):
+        # setup
+        get_scheduled_deletion_run(create=True)
+        get_scheduled_deletion_run(create=True, worker=1, workers=2)
+
+        # do it
+        finish_scheduled_deletion_run(worker=1, workers=2)
+
+        # postcondition
+        self.assertIsNone(get_scheduled_deletion_run(worker=1, workers=2))
+        self.assertIsNotNone(get_scheduled_deletion_run())
+
+
+class TestParallelPurge(InteraktivGDPRTestCase):
+    layer = INTERAKTIV_GDPR_INTEGRATION_TESTING
+
+    def setUp(self):
+        super().setUp()
+        self.tempdir = tempfile.mkdtemp()
+        self.db = DB(FileStorage(f"{self.tempdir}/Data.fs"))
+
+        transaction_manager = transaction.TransactionManager()
+        connection = self.db.open(transaction_manager=transaction_manager)
+        storage = DeletionLogStorage()
+        for i in range(40):
+            storage.append(_entry(f"{i:032x}"))
+        connection.root()["deletion_log"] = storage
+        # Stands in for the site annotations holding the runs
+        connection.root()["annotations"] = OOBTree()
+        transaction_manager.commit()
+        connection.close()
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tempdir)
+        super().tearDown()
+
+    def test_workers__disjoint_without_conflicts(self):
+        # setup
+        workers = 4
+        connections = []
+        for _i in range(workers):
+            transaction_manager = transaction.TransactionManager()
+            connection = self.db.open(transaction_manager=transaction_manager)
+            connections.append((transaction_manager, connection))
+        claimed = []
+        conflicts = 0
+
+        # do it
+        # All workers read the same state before any of them commits, like
+        # purges started at once on several ZEO clients.
+        for worker, (transaction_manager, connection) in enumerate(connections):
+            root = connection.root()
+            storage = root["deletion_log"]
+            run = ScheduledDeletionRun(worker, workers)
+            root["annotations"][
+                f"{SCHEDULED_DELETION_ANNOTATION_KEY}.{worker}-of-{workers}"
+            ] = run
+            entry_ids = list(storage.get_ids("status", "pending"))
+            for entry_id in entry_ids:
+                record = storage.get(entry_id)
+                if run.claims(record.get("uid")):
+                    storage.update(entry_id, status="deleted")
+                    claimed.append(entry_id)
+                    run.deleted += 1
+            run.cursor = entry_ids[-1]
+
+        for transaction_manager, connection in connections:
+            try:
+                transaction_manager.commit()
+            except ConflictError:
+                conflicts += 1
+                transaction_manager.abort()
+            connection.close()
+
+        # postcondition
+        self.assertEqual(conflicts, 0)
+        self.assertEqual(len(claimed), 40)
+        self.assertEqual(len(set(claimed)), 40)
+        connection = self.db.open()
+        storage = connection.root()["deletion_log"]
+        self.assertEqual(storage.count_status("deleted"), 40)
+        self.assertEqual(storage.count_status("pending"), 0)
+        self.assertEqual(storage.verify_indexes(), [])
+        runs = connection.root()["annotations"]
+        self.assertEqual(len(runs), workers)
+        self.assertEqual(sum(run.deleted for run in runs.values()), 40)
+        connection.close()
+
+    def test_workers__same_object_in_one_worker(self):
+        # setup
+        uid = "f" * 32
+        transaction_manager = transaction.TransactionManager()
+        connection = self.db.open(transaction_manager=transaction_manager)
+        storage = connection.root()["deletion_log"]
+        duplicate_ids = {storage.append(_entry(uid)) for _i in range(2)}
+        transaction_manager.commit()
+        connection.close()
+        workers = 4
+        connections = []
+        for _i in range(workers):
+            transaction_manager = transaction.TransactionManager()
+            connection = self.db.open(transaction_manager=transaction_manager)
+            connections.append((transaction_manager, connection))
+        claimed = {}
+
+        # do it
+        for worker, (_transaction_manager, connection) in enumerate(connections):
+            storage = connection.root()["deletion_log"]
+            run = ScheduledDeletionRun(worker, workers)
+            for entry_id in storage.get_ids("status", "pending"):
+                if run.claims(storage.get(entry_id).get("uid")):
+                    claimed.setdefault(entry_id, []).append(worker)
+
+        for transaction_manager, connection in connections:
+            transaction_manager.abort()
+            connection.close()
+
+        # postcondition
+        self.assertEqual(len(claimed), 42)
+        self.assertTrue(all(len(owner) == 1 for owner in claimed.values()))
+        owners = {worker for entry_id in duplicate_ids for worker in claimed[entry_id]}
+        self.assertEqual(owners, {get_worker(uid, workers)})
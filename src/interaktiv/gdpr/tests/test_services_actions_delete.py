@@ -1,5 +1,7 @@
 import plone.api as api
 
+from interaktiv.gdpr.jobs import get_job
+from interaktiv.gdpr.registry.deletion_log import IGDPRSettingsSchema
 from interaktiv.gdpr.services.actions.delete import GDPRContentDelete
 from interaktiv.gdpr.testing import (
     INTERAKTIV_GDPR_INTEGRATION_TESTING,
@@ -33,3 +35,28 @@ class TestGDPRContentDelete(InteraktivGDPRTestCase):
 
         # postcondition
         self.assertTrue(self.request.get("mark_for_deletion"))
+
+    def test_reply__large_subtree__queues_job(self):
+        # setup
+        document = api.content.create(
+            container=self.portal, type="Document", id="test-document"
+        )
+        api.content.create(container=document, type="Document", id="child")
+        api.portal.set_registry_record(
+            name="async_threshold", interface=IGDPRSettingsSchema, value=2
+        )
+        service = GDPRContentDelete(document, self.request)
+
+        # do it
+        result = service.reply()
+
+        # postcondition
+        self.assertEqual(self.request.response.getStatus(), 202)
+        job = get_job(result["job"]["id"])
+        self.assertEqual(job.action, "delete")
+        self.assertEqual(job.total, 2)
+        self.assertTrue(job.mark_for_deletion)
+        self.assertEqual(
+            self.request.response.getHeader("Location"), result["job"]["@id"]
+        )
+        self.assertIn("test-document", self.portal.objectIds())
@@ -1,6 +1,11 @@
+from unittest import mock
+
 import plone.api as api
 
 from interaktiv.gdpr.deletion_log import DeletionLog
+from interaktiv.gdpr.jobs import get_job
+from interaktiv.gdpr.purge import purge_subtree_batch
+from interaktiv.gdpr.registry.deletion_log import IGDPRSettingsSchema
 from interaktiv.gdpr.services.actions.permanent_delete import PermanentDeletion
 from interaktiv.gdpr.testing import (
     INTERAKTIV_GDPR_INTEGRATION_TESTING,
@@ -49,6 +54,29 @@ class TestPermanentDeletion(InteraktivGDPRTestCase):
         self.assertEqual(self.request.response.getStatus(), 404)
         self.assertEqual(result["error"]["type"], "NotFound")
 
+    def test_reply__large_subtree__queues_job(self):
+        # setup
+        document = api.content.create(
+            container=self.container, type="Document", id="test-doc"
+        )
+        DeletionLog.add_entry(document, status="pending")
+        api.portal.set_registry_record(
+            name="async_threshold", interface=IGDPRSettingsSchema, value=1
+        )
+        service = PermanentDeletion(self.portal, self.request)
+        service.uid = document.UID()
+
+        # do it
+        result = service.reply()
+
+        # postcondition
+        self.assertEqual(self.request.response.getStatus(), 202)
+        self.assertEqual(get_job(result["job"]["id"]).action, "permanent_deletion")
+        self.assertIn("test-doc", self.container.objectIds())
+        self.assertEqual(
+            DeletionLog.get_entry_by_uid(document.UID())["status"], "pending"
+        )
+
     def test_reply__deletes_object_permanently(self):
         # setup
         document = api.content.create(
@@ -77,3 +105,37 @@ class TestPermanentDeletion(InteraktivGDPRTestCase):
         # Check log entry status updated
         entry = DeletionLog.get_entry_by_uid(doc_uid)
         self.assertEqual(entry["status"], "deleted")
+
+    def test_reply__purge_fails__rolls_back(self):
+        # setup
+        folder = api.content.create(
+            container=self.container, type="Document", id="test-folder"
+        )
+        for i in range(4):
+            api.content.create(container=folder, type="Document", id=f"doc-{i}")
+        DeletionLog.add_entry(folder, status="pending")
+
+        def purge(obj):
+            # Fails after a first batch is deleted
+            purge_subtree_batch(obj, 2)
+            raise RuntimeError("Purge failed")
+
+        service = PermanentDeletion(self.portal, self.request)
+        service.uid = folder.UID()
+
+        # do it
+        with mock.patch(
+            "interaktiv.gdpr.services.actions.permanent_delete.purge", purge
+        ):
+            result = service.reply()
+
+        # postcondition
+        self.assertEqual(self.request.response.getStatus(), 500)
+        self.assertEqual(result["error"]["type"], "InternalError")
+        self.assertEqual(
+            sorted(self.container["test-folder"].objectIds()),
+            ["doc-0", "doc-1", "doc-2", "doc-3"],
+        )
+        self.assertEqual(
+            DeletionLog.get_entry_by_uid(folder.UID())["status"], "pending"
+        )
@@ -1,11 +1,15 @@
 import plone.api as api
 
+from interaktiv.gdpr.config import MARKED_FOR_DELETION_REQUEST_PARAM_NAME
 from interaktiv.gdpr.deletion_log import DeletionLog
+from interaktiv.gdpr.interfaces import IMarkedForDeletion
+from interaktiv.gdpr.registry.deletion_log import IGDPRSettingsSchema
 from interaktiv.gdpr.services.actions.withdraw import WithdrawDeletion
 from interaktiv.gdpr.testing import (
     INTERAKTIV_GDPR_INTEGRATION_TESTING,
     InteraktivGDPRTestCase,
 )
+from interaktiv.gdpr.virtual_deletion import mark_for_deletion
 
 
 class TestWithdrawDeletion(InteraktivGDPRTestCase):
@@ -82,3 +86,57 @@ class TestWithdrawDeletion(InteraktivGDPRTestCase):
         # Check log entry status updated
         entry = DeletionLog.get_entry_by_uid(doc_uid)
         self.assertEqual(entry["status"], "withdrawn")
+
+    def test_reply__same_id_deleted_twice__restores_original_id(self):
+        # setup
+        api.portal.set_registry_record(
+            name="marked_deletion_enabled", value=True, interface=IGDPRSettingsSchema
+        )
+        folder = api.content.create(
+            container=self.portal, type="Document", id="folder", title="Folder"
+        )
+        first = api.content.create(
+            container=self.portal, type="Document", id="document", title="First"
+        )
+        second = api.content.create(
+            container=folder, type="Document", id="document", title="Second"
+        )
+        uids = [first.UID(), second.UID()]
+        self.request.set(MARKED_FOR_DELETION_REQUEST_PARAM_NAME, True)
+        self.portal.manage_delObjects(["document"])
+        folder.manage_delObjects(["document"])
+        service = WithdrawDeletion(self.portal, self.request)
+        service.uid = uids[1]
+
+        # precondition
+        self.assertEqual(set(self.container.objectIds()), set(uids))
+
+        # do it
+        result = service.reply()
+
+        # postcondition
+        self.assertEqual(result["restored_path"], "/plone/folder/document")
+        self.assertEqual(folder["document"].UID(), uids[1])
+        self.assertEqual(list(self.container.objectIds()), [uids[0]])
+
+    def test_reply__marked_in_place__unmarks_object(self):
+        # setup
+        document = api.content.create(
+            container=self.portal, type="Document", id="test-doc", title="Test Document"
+        )
+        DeletionLog.add_entry(document, status="pending")
+        mark_for_deletion(document)
+        service = WithdrawDeletion(self.portal, self.request)
+        service.uid = document.UID()
+
+        # do it
+        result = service.reply()
+
+        # postcondition
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(result["restored_path"], "/plone/test-doc")
+        self.assertFalse(IMarkedForDeletion.providedBy(document))
+        self.assertIn("test-doc", self.portal.objectIds())
+        self.assertEqual(
+            DeletionLog.get_entry_by_uid(document.UID())["status"], "withdrawn"
+        )
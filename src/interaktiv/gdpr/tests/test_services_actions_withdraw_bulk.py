@@ -0,0 +1,161 @@
+import json
+from unittest import mock
+
+import plone.api as api
+
+from interaktiv.gdpr.config import MARKED_FOR_DELETION_REQUEST_PARAM_NAME
+from interaktiv.gdpr.deletion_log import DeletionLog
+from interaktiv.gdpr.move import move_objects
+from interaktiv.gdpr.registry.deletion_log import IGDPRSettingsSchema
+from interaktiv.gdpr.services.actions.withdraw_bulk import BulkWithdrawDeletion
+from interaktiv.gdpr.testing import (
+    INTERAKTIV_GDPR_INTEGRATION_TESTING,
+    InteraktivGDPRTestCase,
+)
+from interaktiv.gdpr.virtual_deletion import mark_for_deletion
+
+
+class TestBulkWithdrawDeletion(InteraktivGDPRTestCase):
+    layer = INTERAKTIV_GDPR_INTEGRATION_TESTING
+
+    def setUp(self):
+        super().setUp()
+        api.portal.set_registry_record(
+            name="marked_deletion_enabled", value=True, interface=IGDPRSettingsSchema
+        )
+        self.folder = api.content.create(
+            container=self.portal, type="Document", id="folder", title="Folder"
+        )
+
+    def _delete(self, parent, *ids):
+        uids = [parent[obj_id].UID() for obj_id in ids]
+        self.request.set(MARKED_FOR_DELETION_REQUEST_PARAM_NAME, True)
+        parent.manage_delObjects(list(ids))
+        self.request.set(MARKED_FOR_DELETION_REQUEST_PARAM_NAME, False)
+        return uids
+
+    def _call(self, body) -> dict:
+        self.request["BODY"] = json.dumps(body).encode()
+        return BulkWithdrawDeletion(self.portal, self.request).reply()
+
+    def test_reply__restores_objects_by_parent(self):
+        # setup
+        for i in range(3):
+            api.content.create(container=self.folder, type="Document", id=f"doc-{i}")
+        api.content.create(container=self.portal, type="Document", id="doc-0")
+        uids = self._delete(self.folder, "doc-0", "doc-1", "doc-2")
+        uids += self._delete(self.portal, "doc-0")
+
+        # do it
+        with mock.patch(
+            "interaktiv.gdpr.services.actions.withdraw_bulk.move_objects",
+            wraps=move_objects,
+        ) as wrapped_move_objects:
+            result = self._call({"uids": uids})
+
+        # postcondition
+        self.assertEqual(self.request.response.getStatus(), 200)
+        self.assertEqual(result["restored"], 4)
+        self.assertEqual(result["failed"], 0)
+        self.assertEqual(
+            [item["restored_path"] for item in result["results"]],
+            [
+                "/plone/folder/doc-0",
+                "/plone/folder/doc-1",
+                "/plone/folder/doc-2",
+                "/plone/doc-0",
+            ],
+        )
+        # One move per original parent
+        self.assertEqual(wrapped_move_objects.call_count, 2)
+        self.assertEqual(list(self.container.objectIds()), [])
+        self.assertEqual(self.folder["doc-1"].UID(), uids[1])
+        self.assertEqual(DeletionLog.count_entries_by_status("withdrawn"), 4)
+
+    def test_reply__updates_log_once(self):
+        # setup
+        for i in range(2):
+            api.content.create(container=self.folder, type="Document", id=f"doc-{i}")
+        uids = self._delete(self.folder, "doc-0", "doc-1")
+
+        # do it
+        with mock.patch.object(
+            DeletionLog,
+            "update_entries_status",
+            wraps=DeletionLog.update_entries_status,
+        ) as update_entries_status:
+            self._call({"uids": uids})
+
+        # postcondition
+        update_entries_status.assert_called_once_with(uids, "withdrawn")
+
+    def test_reply__name_conflicts(self):
+        # setup
+        for i in range(2):
+            api.content.create(container=self.folder, type="Document", id=f"doc-{i}")
+        uids = self._delete(self.folder, "doc-0", "doc-1")
+        api.content.create(container=self.folder, type="Document", id="doc-0")
+        # A second deleted object with the same original id
+        api.content.create(container=self.folder, type="Document", id="doc-1")
+        uids += self._delete(self.folder, "doc-1")
+
+        # do it
+        result = self._call({"uids": uids})
+
+        # postcondition
+        self.assertEqual(result["restored"], 0)
+        self.assertEqual(
+            [item["error"]["type"] for item in result["results"]],
+            ["Conflict"] * 3,
+        )
+        self.assertEqual(len(self.container.objectIds()), 3)
+        self.assertEqual(DeletionLog.count_entries_by_status("pending"), 3)
+
+    def test_reply__per_uid_results(self):
+        # setup
+        for obj_id in ("doc", "marked", "other"):
+            api.content.create(container=self.folder, type="Document", id=obj_id)
+        uids = self._delete(self.folder, "doc")
+        DeletionLog.add_entry(self.folder["marked"], status="pending")
+        mark_for_deletion(self.folder["marked"])
+        uids.append(self.folder["marked"].UID())
+        DeletionLog.add_entry(self.folder["other"], status="deleted")
+        uids.append(self.folder["other"].UID())
+        uids.append("missing-uid")
+
+        # do it
+        result = self._call({"uids": uids + [uids[0]]})
+
+        # postcondition
+        self.assertEqual(result["restored"], 2)
+        self.assertEqual(result["failed"], 2)
+        self.assertEqual([item["uid"] for item in result["results"]], uids)
+        self.assertEqual(
+            [item["status"] for item in result["results"]],
+            ["restored", "restored", "error", "error"],
+        )
+        self.assertEqual(result["results"][1]["restored_path"], "/plone/folder/marked")
+        self.assertEqual(result["results"][2]["error"]["type"], "NotFound")
+        self.assertIn("doc", self.folder.objectIds())
+
+    def test_reply__parent_gone(self):
+        # setup
+        api.content.create(container=self.folder, type="Document", id="doc")
+        uids = self._delete(self.folder, "doc")
+        api.content.delete(obj=self.folder)
+
+        # do it
+        result = self._call({"uids": uids})
+
+        # postcondition
+        self.assertEqual(result["results"][0]["error"]["type"], "NotFound")
+        self.assertIn(uids[0], self.container.objectIds())
+
+    def test_reply__invalid_body(self):
+        for body in ({}, {"uids": []}, {"uids": "uid"}, {"uids": [1]}, ["uid"]):
+            # do it
+            result = self._call(body)
+
+            # postcondition
+            self.assertEqual(self.request.response.getStatus(), 400)
+            self.assertEqual(result["error"]["type"], "BadRequest")
@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta
+
+from zExceptions import NotFound
+from zope.annotation.interfaces import IAnnotations
+
+from interaktiv.gdpr.archive import DELETION_LOG_ARCHIVE_ANNOTATION_KEY
+from interaktiv.gdpr.deletion_log import DeletionLog
+from interaktiv.gdpr.services.log.archive import DeletionLogArchiveGet
+from interaktiv.gdpr.testing import (
+    INTERAKTIV_GDPR_INTEGRATION_TESTING,
+    InteraktivGDPRTestCase,
+)
+from interaktiv.gdpr.views.archive_download import DeletionLogArchiveDownloadView
+
+
+def _entry(uid: str, logged: datetime, status: str = "deleted") -> dict:
+    return {
+        "uid": uid,
+        "datetime": logged.isoformat(),
+        "title": f"Title {uid}",
+        "portal_type": "Document",
+        "original_path": f"/plone/{uid}",
+        "user_id": "admin",
+        "status": status,
+    }
+
+
+class TestDeletionLogArchiveGet(InteraktivGDPRTestCase):
+    layer = INTERAKTIV_GDPR_INTEGRATION_TESTING
+
+    def setUp(self):
+        super().setUp()
+        IAnnotations(self.portal).pop(DELETION_LOG_ARCHIVE_ANNOTATION_KEY, None)
+        now = datetime.now()
+        DeletionLog.set_deletion_log(
+            [
+                _entry("uid-1", now - timedelta(days=500)),
+                _entry("uid-2", now - timedelta(days=450), status="withdrawn"),
+                _entry("uid-3", now - timedelta(days=10)),
+            ]
+        )
+
+    def test_reply__no_archive(self):
+        # setup
+        service = DeletionLogArchiveGet(self.portal, self.request)
+
+        # do it
+        result = service.reply()
+
+        # postcondition
+        self.assertEqual(result["segments"], [])
+        self.assertEqual(result["items"], [])
+
+    def test_reply__lists_segments_and_entries(self):
+        # setup
+        DeletionLog.rotate_deletion_log()
+        service = DeletionLogArchiveGet(self.portal, self.request)
+
+        # do it
+        result = service.reply()
+
+        # postcondition
+        # One segment per month of the archived entries
+        self.assertEqual([segment["count"] for segment in result["segments"]], [1, 1])
+        self.assertIn("download_url", result["segments"][0])
+        self.assertEqual([item["uid"] for item in result["items"]], ["uid-1", "uid-2"])
+
+    def test_reply__filters(self):
+        # setup
+        DeletionLog.rotate_deletion_log()
+        self.request.form["status"] = "withdrawn"
+        service = DeletionLogArchiveGet(self.portal, self.request)
+
+        # do it
+        result = service.reply()
+
+        # postcondition
+        self.assertEqual([item["uid"] for item in result["items"]], ["uid-2"])
+
+
+class TestDeletionLogArchiveDownloadView(InteraktivGDPRTestCase):
+    layer = INTERAKTIV_GDPR_INTEGRATION_TESTING
+
+    def test_call__streams_segment(self):
+        # setup
+        DeletionLog.set_deletion_log(
+            [_entry("uid-1", datetime.now() - timedelta(days=500))]
+        )
+        DeletionLog.rotate_deletion_log()
+        segment_id = DeletionLogArchiveGet(self.portal, self.request).reply()[
+            "segments"
+        ][0]["id"]
+        self.request.form["segment"] = str(segment_id)
+        view = DeletionLogArchiveDownloadView(self.portal, self.request)
+
+        # do it
+        result = view()
+
+        # postcondition
+        self.assertEqual(result[:2], b"\x1f\x8b")
+        self.assertEqual(
+            self.request.response.getHeader("Content-Type"), "application/gzip"
+        )
+
+    def test_call__unknown_segment(self):
+        # setup
+        self.request.form["segment"] = "42"
+        view = DeletionLogArchiveDownloadView(self.portal, self.request)
+
+        # do it & postcondition
+        with self.assertRaises(NotFound):
+            view()
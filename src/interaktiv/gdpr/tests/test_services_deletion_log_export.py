@@ -0,0 +1,84 @@
+import csv
+import io
+import json
+
+from interaktiv.gdpr.deletion_log import DeletionLog
+from interaktiv.gdpr.services.log.export import DeletionLogExportGet
+from interaktiv.gdpr.testing import (
+    INTERAKTIV_GDPR_INTEGRATION_TESTING,
+    InteraktivGDPRTestCase,
+)
+
+
+class TestDeletionLogExportGet(InteraktivGDPRTestCase):
+    layer = INTERAKTIV_GDPR_INTEGRATION_TESTING
+
+    def setUp(self):
+        super().setUp()
+        self.entries = [
+            {
+                "uid": f"uid-{i}",
+                "datetime": f"2024-0{i + 1}-15T10:00:00+00:00",
+                "title": f'Entry "{i}", exported',
+                "portal_type": "Document",
+                "original_path": f"/plone/doc-{i}",
+                "user_id": "alice" if i % 2 else "bob",
+                "status": "deleted",
+            }
+            for i in range(3)
+        ]
+        DeletionLog.set_deletion_log(self.entries)
+
+    def _export(self) -> str:
+        body = DeletionLogExportGet(self.portal, self.request).reply()
+        return body.read().decode("utf-8")
+
+    def test_render__ndjson(self):
+        # do it
+        result = self._export()
+
+        # postcondition
+        lines = result.splitlines()
+        self.assertEqual([json.loads(line) for line in lines], self.entries)
+        response = self.request.response
+        self.assertEqual(
+            response.getHeader("Content-Type"), "application/x-ndjson; charset=utf-8"
+        )
+        self.assertIn(".ndjson", response.getHeader("Content-Disposition"))
+
+    def test_render__csv(self):
+        # setup
+        self.request.form["format"] = "csv"
+
+        # do it
+        result = self._export()
+
+        # postcondition
+        rows = list(csv.DictReader(io.StringIO(result)))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[1]["title"], 'Entry "1", exported')
+        self.assertEqual(rows[1]["subobject_count"], "")
+        self.assertTrue(
+            self.request.response.getHeader("Content-Type").startswith("text/csv")
+        )
+
+    def test_render__filters(self):
+        # setup
+        self.request.form.update({"user_id": "bob", "sort_order": "descending"})
+
+        # do it
+        result = self._export()
+
+        # postcondition
+        uids = [json.loads(line)["uid"] for line in result.splitlines()]
+        self.assertEqual(uids, ["uid-2", "uid-0"])
+
+    def test_render__unknown_format_exports_ndjson(self):
+        # setup
+        self.request.form["format"] = "xml"
+
+        # do it
+        result = self._export()
+
+        # postcondition
+        self.assertEqual(len(result.splitlines()), 3)
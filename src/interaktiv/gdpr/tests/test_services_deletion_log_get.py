@@ -1,3 +1,5 @@
+from datetime import datetime, timedelta
+
 import plone.api as api
 
 from interaktiv.gdpr.deletion_log import DeletionLog
@@ -38,3 +40,203 @@ class TestDeletionLogGet(InteraktivGDPRTestCase):
         # postcondition
         self.assertGreater(result["total"], 0)
         self.assertEqual(len(result["items"]), result["total"])
+
+    def test_reply__days_param_limits_window(self):
+        # setup
+        DeletionLog.set_deletion_log(
+            [
+                {
+                    "uid": "old-uid",
+                    "datetime": (datetime.now() - timedelta(days=400)).isoformat(),
+                    "title": "Old Entry",
+                    "portal_type": "Document",
+                    "original_path": "/plone/old",
+                    "user_id": "admin",
+                    "status": "deleted",
+                },
+                {
+                    "uid": "recent-uid",
+                    "datetime": datetime.now().isoformat(),
+                    "title": "Recent Entry",
+                    "portal_type": "Document",
+                    "original_path": "/plone/recent",
+                    "user_id": "admin",
+                    "status": "pending",
+                },
+            ]
+        )
+        self.request.form["days"] = "30"
+        service = DeletionLogGet(self.portal, self.request)
+
+        # do it
+        result = service.reply()
+
+        # postcondition
+        self.assertEqual(result["total"], 1)
+        self.assertEqual(result["items"][0]["uid"], "recent-uid")
+
+    def test_reply__pagination_skips_partitions(self):
+        # setup
+        DeletionLog.set_deletion_log(
+            [
+                {
+                    "uid": f"uid-{month}",
+                    "datetime": f"2024-{month:02d}-15T10:00:00",
+                    "title": f"Entry {month}",
+                    "portal_type": "Document",
+                    "original_path": f"/plone/doc-{month}",
+                    "user_id": "admin",
+                    "status": "deleted",
+                }
+                for month in range(1, 13)
+            ]
+        )
+        self.request.form["start"] = "10"
+        service = DeletionLogGet(self.portal, self.request)
+
+        # do it
+        result = service.reply()
+
+        # postcondition
+        self.assertEqual(result["total"], 12)
+        self.assertEqual(
+            [item["uid"] for item in result["items"]], ["uid-11", "uid-12"]
+        )
+
+
+class TestDeletionLogGetConditional(InteraktivGDPRTestCase):
+    layer = INTERAKTIV_GDPR_INTEGRATION_TESTING
+
+    def setUp(self):
+        super().setUp()
+        self.document = api.content.create(
+            container=self.portal, type="Document", id="test-doc", title="Test Document"
+        )
+        DeletionLog.add_entry(self.document, status="pending")
+
+    def test_reply__sets_validators(self):
+        # do it
+        DeletionLogGet(self.portal, self.request).reply()
+
+        # postcondition
+        response = self.request.response
+        self.assertTrue(response.getHeader("ETag"))
+        self.assertTrue(response.getHeader("Last-Modified"))
+        self.assertEqual(response.getHeader("Cache-Control"), "no-cache")
+
+    def test_reply__not_modified(self):
+        # setup
+        DeletionLogGet(self.portal, self.request).reply()
+        etag = self.request.response.getHeader("ETag")
+        self.request.environ["HTTP_IF_NONE_MATCH"] = etag
+
+        # do it
+        DeletionLogGet(self.portal, self.request).reply()
+
+        # postcondition
+        self.assertEqual(self.request.response.getStatus(), 304)
+
+    def test_reply__modified_by_status_change(self):
+        # setup
+        DeletionLogGet(self.portal, self.request).reply()
+        etag = self.request.response.getHeader("ETag")
+        self.request.environ["HTTP_IF_NONE_MATCH"] = etag
+        DeletionLog.update_entry_status(self.document.UID(), "withdrawn")
+
+        # do it
+        result = DeletionLogGet(self.portal, self.request).reply()
+
+        # postcondition
+        self.assertEqual(result["items"][0]["status"], "withdrawn")
+        self.assertNotEqual(self.request.response.getHeader("ETag"), etag)
+
+
+class TestDeletionLogGetQuery(InteraktivGDPRTestCase):
+    layer = INTERAKTIV_GDPR_INTEGRATION_TESTING
+
+    def setUp(self):
+        super().setUp()
+        DeletionLog.set_deletion_log(
+            [
+                {
+                    "uid": f"uid-{i}",
+                    "datetime": f"2024-{month:02d}-15T10:00:00",
+                    "title": f"Entry {i}",
+                    "portal_type": portal_type,
+                    "original_path": path,
+                    "user_id": user_id,
+                    "status": status,
+                }
+                for i, (month, portal_type, path, user_id, status) in enumerate(
+                    [
+                        (1, "Document", "/plone/news/a", "alice", "deleted"),
+                        (4, "News Item", "/plone/news/b", "bob", "deleted"),
+                        (5, "Document", "/plone/docs/c", "bob", "withdrawn"),
+                        (7, "Document", "/plone/news/d", "bob", "deleted"),
+                    ]
+                )
+            ]
+        )
+        self.service = DeletionLogGet(self.portal, self.request)
+
+    def _uids(self, result: dict) -> list[str]:
+        return [item["uid"] for item in result["items"]]
+
+    def test_reply__filter_by_user_and_date_range(self):
+        # setup
+        self.request.form.update(
+            {"user_id": "bob", "since": "2024-04-01", "until": "2024-06-30"}
+        )
+
+        # do it
+        result = self.service.reply()
+
+        # postcondition
+        self.assertEqual(result["total"], 2)
+        self.assertEqual(self._uids(result), ["uid-1", "uid-2"])
+
+    def test_reply__filter_by_several_statuses_and_type(self):
+        # setup
+        self.request.form.update(
+            {"status": ["withdrawn", "pending"], "portal_type": "Document"}
+        )
+
+        # do it
+        result = self.service.reply()
+
+        # postcondition
+        self.assertEqual(self._uids(result), ["uid-2"])
+
+    def test_reply__filter_by_path_and_title(self):
+        # setup
+        self.request.form.update({"path": "/plone/news", "title": "entry 3"})
+
+        # do it
+        result = self.service.reply()
+
+        # postcondition
+        self.assertEqual(self._uids(result), ["uid-3"])
+
+    def test_reply__sort_and_paginate(self):
+        # setup
+        self.request.form.update(
+            {"sort_on": "user_id", "sort_order": "descending", "size": "2"}
+        )
+
+        # do it
+        result = self.service.reply()
+
+        # postcondition
+        self.assertEqual(result["total"], 4)
+        self.assertEqual(self._uids(result), ["uid-3", "uid-2"])
+
+    def test_reply__invalid_params_ignored(self):
+        # setup
+        self.request.form.update({"sort_on": "title", "since": "yesterday"})
+
+        # do it
+        result = self.service.reply()
+
+        # postcondition
+        self.assertEqual(result["total"], 4)
+        self.assertEqual(self._uids(result), ["uid-0", "uid-1", "uid-2", "uid-3"])
@@ -0,0 +1,91 @@
+from unittest import mock
+
+import plone.api as api
+from plone.app.testing import TEST_USER_ID
+
+from interaktiv.gdpr.jobs import queue_job
+from interaktiv.gdpr.services.jobs.get import JobsGet
+from interaktiv.gdpr.testing import (
+    INTERAKTIV_GDPR_INTEGRATION_TESTING,
+    InteraktivGDPRTestCase,
+)
+
+
+class TestJobsGet(InteraktivGDPRTestCase):
+    layer = INTERAKTIV_GDPR_INTEGRATION_TESTING
+
+    def setUp(self):
+        super().setUp()
+        document = api.content.create(
+            container=self.portal, type="Document", id="test-doc", title="Test"
+        )
+        self.job = queue_job("delete", document)
+
+    def test_reply__returns_job(self):
+        # setup
+        service = JobsGet(self.portal, self.request)
+        service.publishTraverse(self.request, self.job.id)
+
+        # do it
+        result = service.reply()
+
+        # postcondition
+        self.assertEqual(
+            result["@id"], f"{self.portal.absolute_url()}/@gdpr-jobs/{self.job.id}"
+        )
+        self.assertEqual(result["status"], "queued")
+        self.assertEqual(result["progress"], 0)
+        self.assertEqual(result["total"], 1)
+        self.assertEqual(result["title"], "Test")
+
+    def test_reply__lists_jobs(self):
+        # setup
+        service = JobsGet(self.portal, self.request)
+
+        # do it
+        result = service.reply()
+
+        # postcondition
+        self.assertEqual(result["items_total"], 1)
+        self.assertEqual(result["items"][0]["id"], self.job.id)
+
+    def test_reply__unknown_job__returns_not_found(self):
+        # setup
+        service = JobsGet(self.portal, self.request)
+        service.publishTraverse(self.request, "unknown")
+
+        # do it
+        result = service.reply()
+
+        # postcondition
+        self.assertEqual(self.request.response.getStatus(), 404)
+        self.assertEqual(result["error"]["type"], "NotFound")
+
+    def test_reply__job_of_other_user__returns_not_found(self):
+        # setup
+        self.job.user_id = "someone-else"
+        service = JobsGet(self.portal, self.request)
+        service.publishTraverse(self.request, self.job.id)
+
+        # do it
+        with mock.patch.object(api.user, "has_permission", return_value=False):
+            result = service.reply()
+
+        # postcondition
+        self.assertEqual(self.request.response.getStatus(), 404)
+        self.assertEqual(result["error"]["type"], "NotFound")
+
+    def test_reply__own_job_without_controlpanel_permission(self):
+        # setup
+        service = JobsGet(self.portal, self.request)
+        service.publishTraverse(self.request, self.job.id)
+
+        # precondition
+        self.assertEqual(self.job.user_id, TEST_USER_ID)
+
+        # do it
+        with mock.patch.object(api.user, "has_permission", return_value=False):
+            result = service.reply()
+
+        # postcondition
+        self.assertEqual(result["id"], self.job.id)
@@ -1,4 +1,9 @@
+from plone import api
+
+from interaktiv.gdpr.deletion_log import DeletionLog
+from interaktiv.gdpr.registry.deletion_log import IGDPRSettingsSchema
 from interaktiv.gdpr.services.settings.get import GDPRSettingsGet
+from interaktiv.gdpr.storage import get_deletion_log_storage
 from interaktiv.gdpr.testing import (
     INTERAKTIV_GDPR_INTEGRATION_TESTING,
     InteraktivGDPRTestCase,
@@ -44,3 +49,97 @@ class TestGDPRSettingsGet(InteraktivGDPRTestCase):
         self.assertIn("display_days", result)
         self.assertIsInstance(result["display_days"], int)
         self.assertGreater(result["display_days"], 0)
+
+    def test_reply__returns_archive_days(self):
+        # setup
+        service = GDPRSettingsGet(self.portal, self.request)
+
+        # do it
+        result = service.reply()
+
+        # postcondition
+        self.assertEqual(result["archive_days"], 365)
+
+    def test_reply__returns_marked_deletion_mode(self):
+        # setup
+        service = GDPRSettingsGet(self.portal, self.request)
+
+        # do it
+        result = service.reply()
+
+        # postcondition
+        self.assertEqual(result["marked_deletion_mode"], "container")
+
+    def test_reply__returns_async_threshold(self):
+        # setup
+        service = GDPRSettingsGet(self.portal, self.request)
+
+        # do it
+        result = service.reply()
+
+        # postcondition
+        self.assertEqual(result["async_threshold"], 0)
+
+    def test_reply__not_modified(self):
+        # setup
+        GDPRSettingsGet(self.portal, self.request).reply()
+        etag = self.request.response.getHeader("ETag")
+        self.request.environ["HTTP_IF_NONE_MATCH"] = etag
+        service = GDPRSettingsGet(self.portal, self.request)
+
+        # do it
+        service.reply()
+
+        # postcondition
+        self.assertEqual(self.request.response.getStatus(), 304)
+
+    def test_reply__modified_by_settings_change(self):
+        # setup
+        GDPRSettingsGet(self.portal, self.request).reply()
+        etag = self.request.response.getHeader("ETag")
+        self.request.environ["HTTP_IF_NONE_MATCH"] = etag
+        api.portal.set_registry_record(
+            name="retention_days", value=7, interface=IGDPRSettingsSchema
+        )
+        service = GDPRSettingsGet(self.portal, self.request)
+
+        # do it
+        result = service.reply()
+
+        # postcondition
+        self.assertEqual(result["retention_days"], 7)
+        self.assertNotEqual(self.request.response.getHeader("ETag"), etag)
+
+    def test_reply__pending_count_from_counter(self):
+        # setup
+        document = api.content.create(
+            container=self.portal, type="Document", id="test-doc", title="Test Document"
+        )
+        DeletionLog.add_entry(document, status="pending")
+        # The log itself is not read, a wrong counter shows up unchanged
+        get_deletion_log_storage()._status_counts["pending"].change(1)
+        service = GDPRSettingsGet(self.portal, self.request)
+
+        # do it
+        result = service.reply()
+
+        # postcondition
+        self.assertEqual(result["pending_deletions_count"], 2)
+
+    def test_reply__modified_by_pending_count(self):
+        # setup
+        GDPRSettingsGet(self.portal, self.request).reply()
+        etag = self.request.response.getHeader("ETag")
+        self.request.environ["HTTP_IF_NONE_MATCH"] = etag
+        document = api.content.create(
+            container=self.portal, type="Document", id="test-doc", title="Test Document"
+        )
+        DeletionLog.add_entry(document, status="pending")
+        service = GDPRSettingsGet(self.portal, self.request)
+
+        # do it
+        result = service.reply()
+
+        # postcondition
+        self.assertEqual(result["pending_deletions_count"], 1)
+        self.assertNotEqual(self.request.response.getHeader("ETag"), etag)
@@ -89,6 +89,88 @@ class TestGDPRSettingsSet(InteraktivGDPRTestCase):
         )
         self.assertEqual(registry_value, 120)
 
+    def test_reply__sets_archive_days(self):
+        # setup
+        service = GDPRSettingsSet(self.portal, self.request)
+        self.request["BODY"] = json.dumps({"archive_days": 730}).encode()
+
+        # do it
+        result = service.reply()
+
+        # postcondition
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(result["archive_days"], 730)
+        registry_value = api.portal.get_registry_record(
+            name="archive_days", interface=IGDPRSettingsSchema
+        )
+        self.assertEqual(registry_value, 730)
+
+    def test_reply__archive_days_invalid__returns_error(self):
+        # setup
+        service = GDPRSettingsSet(self.portal, self.request)
+        self.request["BODY"] = json.dumps({"archive_days": "never"}).encode()
+
+        # do it
+        result = service.reply()
+
+        # postcondition
+        self.assertEqual(self.request.response.getStatus(), 400)
+        self.assertEqual(result["error"]["type"], "BadRequest")
+
+    def test_reply__sets_marked_deletion_mode(self):
+        # setup
+        service = GDPRSettingsSet(self.portal, self.request)
+        self.request["BODY"] = json.dumps({"marked_deletion_mode": "virtual"}).encode()
+
+        # do it
+        result = service.reply()
+
+        # postcondition
+        self.assertEqual(result["marked_deletion_mode"], "virtual")
+        registry_value = api.portal.get_registry_record(
+            name="marked_deletion_mode", interface=IGDPRSettingsSchema
+        )
+        self.assertEqual(registry_value, "virtual")
+
+    def test_reply__marked_deletion_mode_invalid__returns_error(self):
+        # setup
+        service = GDPRSettingsSet(self.portal, self.request)
+        self.request["BODY"] = json.dumps({"marked_deletion_mode": "trash"}).encode()
+
+        # do it
+        result = service.reply()
+
+        # postcondition
+        self.assertEqual(self.request.response.getStatus(), 400)
+        self.assertEqual(result["error"]["type"], "BadRequest")
+
+    def test_reply__sets_async_threshold(self):
+        # setup
+        service = GDPRSettingsSet(self.portal, self.request)
+        self.request["BODY"] = json.dumps({"async_threshold": 1000}).encode()
+
+        # do it
+        result = service.reply()
+
+        # postcondition
+        self.assertEqual(result["async_threshold"], 1000)
+        registry_value = api.portal.get_registry_record(
+            name="async_threshold", interface=IGDPRSettingsSchema
+        )
+        self.assertEqual(registry_value, 1000)
+
+    def test_reply__async_threshold_negative__returns_error(self):
+        # setup
+        service = GDPRSettingsSet(self.portal, self.request)
+        self.request["BODY"] = json.dumps({"async_threshold": -1}).encode()
+
+        # do it
+        result = service.reply()
+
+        # postcondition
+        self.assertEqual(self.request.response.getStatus(), 400)
+        self.assertEqual(result["error"]["type"], "BadRequest")
+
     def test_reply__retention_days_invalid__returns_error(self):
         # setup
         service = GDPRSettingsSet(self.portal, self.request)
@@ -0,0 +1,155 @@
+from plone import api
+from plone.registry import Record, field
+from plone.registry.interfaces import IRegistry
+from zope.annotation.interfaces import IAnnotations
+from zope.component import getUtility
+
+from interaktiv.gdpr import settings
+from interaktiv.gdpr.registry.deletion_log import IGDPRSettingsSchema
+from interaktiv.gdpr.settings import (
+    SETTINGS_VERSION_ANNOTATION_KEY,
+    GDPRSettings,
+    get_gdpr_settings,
+    get_settings_version,
+    invalidate_gdpr_settings,
+)
+from interaktiv.gdpr.testing import (
+    INTERAKTIV_GDPR_INTEGRATION_TESTING,
+    InteraktivGDPRTestCase,
+)
+
+RETENTION_DAYS_RECORD = f"{IGDPRSettingsSchema.__identifier__}.retention_days"
+ASYNC_THRESHOLD_RECORD = f"{IGDPRSettingsSchema.__identifier__}.async_threshold"
+
+
+class TestGDPRSettings(InteraktivGDPRTestCase):
+    layer = INTERAKTIV_GDPR_INTEGRATION_TESTING
+
+    def test_from_registry(self):
+        # setup
+        api.portal.set_registry_record(
+            name="retention_days", value=14, interface=IGDPRSettingsSchema
+        )
+
+        # do it
+        result = GDPRSettings.from_registry()
+
+        # postcondition
+        self.assertEqual(result.retention_days, 14)
+        self.assertTrue(result.deletion_log_enabled)
+        self.assertFalse(result.marked_deletion_enabled)
+
+    def test_from_registry__missing_records_use_defaults(self):
+        # setup
+        registry = getUtility(IRegistry)
+        del registry.records[RETENTION_DAYS_RECORD]
+
+        # do it
+        result = GDPRSettings.from_registry()
+
+        # postcondition
+        self.assertEqual(result.retention_days, 30)
+
+
+class TestGetGDPRSettings(InteraktivGDPRTestCase):
+    layer = INTERAKTIV_GDPR_INTEGRATION_TESTING
+
+    def test_get_gdpr_settings__cached(self):
+        # setup
+        first = get_gdpr_settings()
+
+        # do it
+        result = get_gdpr_settings()
+
+        # postcondition
+        self.assertIs(result, first)
+
+    def test_get_gdpr_settings__invalidated_by_record_change(self):
+        # setup
+        get_gdpr_settings()
+        version = get_settings_version(self.portal)
+
+        # do it
+        api.portal.set_registry_record(
+            name="retention_days", value=7, interface=IGDPRSettingsSchema
+        )
+
+        # postcondition
+        self.assertNotEqual(get_settings_version(self.portal), version)
+        self.assertEqual(get_gdpr_settings().retention_days, 7)
+
+    def test_get_gdpr_settings__invalidated_by_added_record(self):
+        # setup
+        registry = getUtility(IRegistry)
+        del registry.records[ASYNC_THRESHOLD_RECORD]
+
+        # precondition
+        self.assertEqual(get_gdpr_settings().async_threshold, 0)
+
+        # do it
+        # Like an upgrade step adding a new record to the registry
+        registry.records[ASYNC_THRESHOLD_RECORD] = Record(
+            field.Int(title="Async Threshold"), 5
+        )
+
+        # postcondition
+        self.assertEqual(get_gdpr_settings().async_threshold, 5)
+
+    def test_get_gdpr_settings__invalidated_by_removed_record(self):
+        # setup
+        api.portal.set_registry_record(
+            name="retention_days", value=7, interface=IGDPRSettingsSchema
+        )
+
+        # precondition
+        self.assertEqual(get_gdpr_settings().retention_days, 7)
+
+        # do it
+        del getUtility(IRegistry).records[RETENTION_DAYS_RECORD]
+
+        # postcondition
+        self.assertEqual(get_gdpr_settings().retention_days, 30)
+
+    def test_get_gdpr_settings__other_records_keep_cache(self):
+        # setup
+        first = get_gdpr_settings()
+
+        # do it
+        api.portal.set_registry_record("plone.site_title", "Another title")
+
+        # postcondition
+        self.assertIs(get_gdpr_settings(), first)
+
+    def test_get_gdpr_settings__version_changed_by_other_client(self):
+        # setup
+        stale = get_gdpr_settings()
+        version = get_settings_version(self.portal)
+        api.portal.set_registry_record(
+            name="retention_days", value=7, interface=IGDPRSettingsSchema
+        )
+        # The cache of another client still holds the snapshot read before
+        # the change, the event only cleared the cache of this process
+        site_key = "/".join(self.portal.getPhysicalPath())
+        settings._settings_cache[site_key] = (version, stale)
+
+        # do it
+        result = get_gdpr_settings()
+
+        # postcondition
+        self.assertEqual(result.retention_days, 7)
+
+    def test_invalidate_gdpr_settings__creates_version(self):
+        # setup
+        annotations = IAnnotations(self.portal)
+        annotations.pop(SETTINGS_VERSION_ANNOTATION_KEY, None)
+        settings._settings_cache.clear()
+
+        # precondition
+        self.assertEqual(get_settings_version(self.portal), 0)
+
+        # do it
+        invalidate_gdpr_settings()
+
+        # postcondition
+        self.assertGreater(get_settings_version(self.portal), 0)
+        self.assertEqual(settings._settings_cache, {})
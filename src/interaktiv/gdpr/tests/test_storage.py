@@ -0,0 +1,678 @@
+import pickle
+import shutil
+import tempfile
+from datetime import datetime
+from unittest import mock
+
+import transaction
+from ZODB import DB
+from ZODB.FileStorage import FileStorage
+from ZODB.POSException import ConflictError
+from zope.annotation.interfaces import IAnnotations
+
+from interaktiv.gdpr.config import DELETION_LOG_STATUSES
+from interaktiv.gdpr.storage import (
+    DELETION_LOG_ANNOTATION_KEY,
+    DeletionLogRecord,
+    DeletionLogStorage,
+    _reverse_keys,
+    datetime_to_timestamp,
+    get_deletion_log_storage,
+    get_partition_key,
+)
+from interaktiv.gdpr.testing import (
+    INTERAKTIV_GDPR_INTEGRATION_TESTING,
+    InteraktivGDPRTestCase,
+)
+
+
+def _entry(
+    uid: str, status: str = "pending", iso_datetime: str = "2024-01-15T10:30:00"
+) -> dict:
+    return {
+        "uid": uid,
+        "datetime": iso_datetime,
+        "title": f"Title {uid}",
+        "portal_type": "Document",
+        "original_path": f"/plone/{uid}",
+        "user_id": "admin",
+        "status": status,
+    }
+
+
+class TestDeletionLogRecord(InteraktivGDPRTestCase):
+    layer = INTERAKTIV_GDPR_INTEGRATION_TESTING
+
+    def test_update(self):
+        # setup
+        record = DeletionLogRecord(_entry("uid-1"))
+
+        # do it
+        record.update(status="deleted")
+
+        # postcondition
+        self.assertEqual(record["status"], "deleted")
+        self.assertEqual(record["uid"], "uid-1")
+
+    def test_to_dict__returns_copy(self):
+        # setup
+        record = DeletionLogRecord(_entry("uid-1"))
+
+        # do it
+        result = record.to_dict()
+        result["status"] = "deleted"
+
+        # postcondition
+        self.assertEqual(record["status"], "pending")
+
+    def test_to_dict__round_trip(self):
+        # setup
+        entry = _entry("uid-1")
+        entry["datetime"] = "2024-01-15T10:30:00.123456+00:00"
+        entry["subobject_count"] = 0
+
+        # do it
+        result = DeletionLogRecord(entry).to_dict()
+
+        # postcondition
+        self.assertEqual(result, entry)
+
+    def test_getstate__compact_values(self):
+        # setup
+        record = DeletionLogRecord(_entry("uid-1"))
+
+        # do it
+        state = record.__getstate__()
+
+        # postcondition
+        self.assertIsInstance(state, tuple)
+        self.assertIn(DELETION_LOG_STATUSES.index("pending"), state)
+        self.assertEqual(
+            record.get_timestamp(),
+            datetime_to_timestamp(datetime(2024, 1, 15, 10, 30)),
+        )
+        self.assertLess(
+            len(pickle.dumps(state)), len(pickle.dumps(_entry("uid-1"))) / 2
+        )
+
+    def test_timestamps_in_utc(self):
+        # setup
+        entry = _entry("uid-1", iso_datetime="2024-01-15T12:30:00+02:00")
+
+        # do it
+        record = DeletionLogRecord(entry)
+
+        # postcondition
+        self.assertEqual(record.get_timestamp(), 1705314600 * 10**6)
+        self.assertEqual(record["datetime"], "2024-01-15T10:30:00+00:00")
+
+    def test_timestamps__naive_times_are_local(self):
+        # setup
+        naive = datetime(2024, 7, 15, 10, 30)
+
+        # do it
+        result = datetime_to_timestamp(naive.isoformat())
+
+        # postcondition
+        self.assertEqual(result, int(naive.timestamp()) * 10**6)
+
+    def test_get__unparseable_datetime_kept(self):
+        # setup
+        record = DeletionLogRecord(_entry("uid-1", iso_datetime="yesterday"))
+
+        # postcondition
+        self.assertEqual(record["datetime"], "yesterday")
+        self.assertIsNone(record.get_timestamp())
+
+    def test_get__missing_field(self):
+        # setup
+        record = DeletionLogRecord(_entry("uid-1"))
+
+        # postcondition
+        self.assertIsNone(record.get("review_state"))
+        self.assertIsNone(record.get("unknown"))
+        with self.assertRaises(KeyError):
+            record["review_state"]
+
+
+class TestDeletionLogStorage(InteraktivGDPRTestCase):
+    layer = INTERAKTIV_GDPR_INTEGRATION_TESTING
+
+    def test_append__assigns_monotonic_ids(self):
+        # setup
+        storage = DeletionLogStorage()
+
+        # do it
+        first_id = storage.append(_entry("uid-1"))
+        second_id = storage.append(_entry("uid-2"))
+
+        # postcondition
+        self.assertGreater(second_id, first_id)
+        self.assertEqual(len(storage), 2)
+        self.assertEqual(storage.get(second_id)["uid"], "uid-2")
+
+    def test_update(self):
+        # setup
+        storage = DeletionLogStorage()
+        entry_id = storage.append(_entry("uid-1"))
+
+        # do it
+        storage.update(entry_id, status="withdrawn")
+
+        # postcondition
+        self.assertEqual(storage.get(entry_id)["status"], "withdrawn")
+
+    def test_update__unknown_id(self):
+        # setup
+        storage = DeletionLogStorage()
+
+        # do it
+        result = storage.update(42, status="withdrawn")
+
+        # postcondition
+        self.assertIsNone(result)
+
+    def test_values__reverse(self):
+        # setup
+        storage = DeletionLogStorage()
+        for uid in ("uid-1", "uid-2", "uid-3"):
+            storage.append(_entry(uid))
+
+        # do it
+        result = [record["uid"] for record in storage.values(reverse=True)]
+
+        # postcondition
+        self.assertEqual(result, ["uid-3", "uid-2", "uid-1"])
+
+    def test_version__bumped_by_writes(self):
+        # setup
+        storage = DeletionLogStorage()
+
+        # do it
+        entry_id = storage.append(_entry("uid-1"))
+        storage.update(entry_id, status="deleted")
+        storage.remove(entry_id)
+
+        # postcondition
+        self.assertEqual(storage.version.counter, 3)
+        self.assertGreater(storage.version.modified, 0)
+
+    def test_clear(self):
+        # setup
+        storage = DeletionLogStorage()
+        storage.append(_entry("uid-1"))
+
+        # do it
+        storage.clear()
+
+        # postcondition
+        self.assertEqual(len(storage), 0)
+        self.assertEqual(list(storage.values()), [])
+
+
+class TestGetDeletionLogStorage(InteraktivGDPRTestCase):
+    layer = INTERAKTIV_GDPR_INTEGRATION_TESTING
+
+    def setUp(self):
+        super().setUp()
+        IAnnotations(self.portal).pop(DELETION_LOG_ANNOTATION_KEY, None)
+
+    def test_get_deletion_log_storage__not_created_on_read(self):
+        # do it
+        result = get_deletion_log_storage()
+
+        # postcondition
+        self.assertIsNone(result)
+        self.assertNotIn(DELETION_LOG_ANNOTATION_KEY, IAnnotations(self.portal))
+
+    def test_get_deletion_log_storage__create(self):
+        # do it
+        result = get_deletion_log_storage(create=True)
+
+        # postcondition
+        self.assertIsInstance(result, DeletionLogStorage)
+        self.assertIs(get_deletion_log_storage(), result)
+
+
+class TestDeletionLogStorageIndexes(InteraktivGDPRTestCase):
+    layer = INTERAKTIV_GDPR_INTEGRATION_TESTING
+
+    def setUp(self):
+        super().setUp()
+        self.storage = DeletionLogStorage()
+
+    def test_append__indexes_uid_and_status(self):
+        # do it
+        entry_id = self.storage.append(_entry("uid-1"))
+
+        # postcondition
+        self.assertEqual(list(self.storage.get_ids("uid", "uid-1")), [entry_id])
+        self.assertEqual(list(self.storage.get_ids("status", "pending")), [entry_id])
+
+    def test_update__reindexes_status(self):
+        # setup
+        entry_id = self.storage.append(_entry("uid-1"))
+
+        # do it
+        self.storage.update(entry_id, status="deleted")
+
+        # postcondition
+        self.assertEqual(list(self.storage.get_ids("status", "pending")), [])
+        self.assertEqual(list(self.storage.get_ids("status", "deleted")), [entry_id])
+
+    def test_remove__unindexes_entry(self):
+        # setup
+        entry_id = self.storage.append(_entry("uid-1"))
+
+        # do it
+        self.storage.remove(entry_id)
+
+        # postcondition
+        self.assertEqual(len(self.storage), 0)
+        self.assertIsNone(self.storage.get(entry_id))
+        self.assertEqual(list(self.storage.get_ids("uid", "uid-1")), [])
+        self.assertEqual(self.storage.verify_indexes(), [])
+
+    def test_append__same_uid_twice(self):
+        # setup
+        first_id = self.storage.append(_entry("uid-1"))
+
+        # do it
+        second_id = self.storage.append(_entry("uid-1"))
+        self.storage.remove(first_id)
+
+        # postcondition
+        self.assertEqual(list(self.storage.get_ids("uid", "uid-1")), [second_id])
+        self.assertEqual(self.storage.verify_indexes(), [])
+
+    def test_verify_indexes__detects_and_rebuild_repairs(self):
+        # setup
+        entry_id = self.storage.append(_entry("uid-1"))
+        self.storage._indexes["status"]["pending"].remove(entry_id)
+
+        # precondition
+        self.assertNotEqual(self.storage.verify_indexes(), [])
+
+        # do it
+        self.storage.rebuild_indexes()
+
+        # postcondition
+        self.assertEqual(self.storage.verify_indexes(), [])
+        self.assertEqual(list(self.storage.get_ids("status", "pending")), [entry_id])
+
+    def test_get_first_id(self):
+        # setup
+        first_id = self.storage.append(_entry("uid-1"))
+        second_id = self.storage.append(_entry("uid-2"))
+
+        # do it
+        result = self.storage.get_first_id("status", "pending")
+
+        # postcondition
+        self.assertEqual(result, first_id)
+        self.assertEqual(
+            self.storage.get_first_id("status", "pending", min_id=first_id + 1),
+            second_id,
+        )
+        self.assertEqual(self.storage.get_first_id("uid", "uid-2"), second_id)
+        self.assertIsNone(self.storage.get_first_id("status", "deleted"))
+
+    def test_count_status__follows_transitions(self):
+        # setup
+        first_id = self.storage.append(_entry("uid-1"))
+        second_id = self.storage.append(_entry("uid-2"))
+        self.storage.append(_entry("uid-3", status="deleted"))
+
+        # do it
+        self.storage.update(first_id, status="withdrawn")
+        self.storage.remove(second_id)
+
+        # postcondition
+        self.assertEqual(self.storage.count_status("pending"), 0)
+        self.assertEqual(self.storage.count_status("withdrawn"), 1)
+        self.assertEqual(self.storage.count_status("deleted"), 1)
+        self.assertEqual(self.storage.count_status("unknown"), 0)
+
+    def test_count_status__cleared(self):
+        # setup
+        self.storage.append(_entry("uid-1"))
+
+        # do it
+        self.storage.clear()
+
+        # postcondition
+        self.assertEqual(self.storage.count_status("pending"), 0)
+
+    def test_repair_status_counts(self):
+        # setup
+        self.storage.append(_entry("uid-1"))
+        self.storage.append(_entry("uid-2"))
+        self.storage._status_counts["pending"].set(5)
+        self.storage._status_counts["deleted"].set(-1)
+
+        # precondition
+        self.assertNotEqual(self.storage.verify_indexes(), [])
+
+        # do it
+        result = self.storage.repair_status_counts()
+
+        # postcondition
+        self.assertEqual(result, {"pending": -3, "deleted": 1})
+        self.assertEqual(self.storage.count_status("pending"), 2)
+        self.assertEqual(self.storage.verify_indexes(), [])
+
+
+class TestDeletionLogStoragePartitions(InteraktivGDPRTestCase):
+    layer = INTERAKTIV_GDPR_INTEGRATION_TESTING
+
+    def setUp(self):
+        super().setUp()
+        self.storage = DeletionLogStorage()
+        self.storage.append(_entry("uid-jan", iso_datetime="2024-01-10T10:00:00"))
+        self.storage.append(_entry("uid-mar", iso_datetime="2024-03-10T10:00:00"))
+        self.storage.append(_entry("uid-feb", iso_datetime="2024-02-10T10:00:00"))
+
+    def test_get_partition_key(self):
+        # postcondition
+        self.assertEqual(get_partition_key("2024-03-10T10:00:00"), 202403)
+        self.assertEqual(get_partition_key(datetime(2023, 12, 15)), 202312)
+        self.assertEqual(get_partition_key("not-a-datetime"), 0)
+        self.assertEqual(get_partition_key(None), 0)
+
+    def test_append__partitions_by_month(self):
+        # postcondition
+        # The partition of the following month is created ahead of time
+        self.assertEqual(
+            self.storage.partition_keys(), [202401, 202402, 202403, 202404]
+        )
+
+    def test_values__ordered_by_time(self):
+        # do it
+        result = [record["uid"] for record in self.storage.values()]
+
+        # postcondition
+        self.assertEqual(result, ["uid-jan", "uid-feb", "uid-mar"])
+
+    def test_values__since_skips_older_partitions(self):
+        # do it
+        result = [
+            record["uid"] for record in self.storage.values(since=datetime(2024, 2, 20))
+        ]
+
+        # postcondition
+        self.assertEqual(result, ["uid-feb", "uid-mar"])
+
+    def test_values__start_and_reverse(self):
+        # do it
+        forward = [record["uid"] for record in self.storage.values(start=1)]
+        backward = [
+            record["uid"] for record in self.storage.values(start=1, reverse=True)
+        ]
+
+        # postcondition
+        self.assertEqual(forward, ["uid-feb", "uid-mar"])
+        self.assertEqual(backward, ["uid-feb", "uid-jan"])
+
+
+class TestDeletionLogStorageQuery(InteraktivGDPRTestCase):
+    layer = INTERAKTIV_GDPR_INTEGRATION_TESTING
+
+    def setUp(self):
+        super().setUp()
+        self.storage = DeletionLogStorage()
+        entries = [
+            (
+                "uid-1",
+                "2024-01-10T10:00:00",
+                "deleted",
+                "Document",
+                "alice",
+                "/plone/a",
+            ),
+            (
+                "uid-2",
+                "2024-02-10T10:00:00",
+                "pending",
+                "News Item",
+                "bob",
+                "/plone/a/b",
+            ),
+            ("uid-3", "2024-02-20T10:00:00", "deleted", "Document", "bob", "/plone/ab"),
+            ("uid-4", "2024-03-10T10:00:00", "withdrawn", "Image", "alice", "/plone/c"),
+        ]
+        for uid, logged, status, portal_type, user_id, path in entries:
+            entry = _entry(uid, status=status, iso_datetime=logged)
+            entry.update(portal_type=portal_type, user_id=user_id, original_path=path)
+            self.storage.append(entry)
+
+    def _uids(self, entry_ids: list[int]) -> list[str]:
+        return [self.storage.get(entry_id)["uid"] for entry_id in entry_ids]
+
+    def test_query__no_criteria(self):
+        # do it
+        result = self.storage.query()
+
+        # postcondition
+        self.assertEqual(self._uids(result), ["uid-1", "uid-2", "uid-3", "uid-4"])
+
+    def test_query__indexed_fields(self):
+        # do it
+        by_user = self.storage.query(user_id="bob", status="deleted")
+        by_types = self.storage.query(portal_type=["Image", "News Item"])
+        by_missing = self.storage.query(user_id="carol")
+
+        # postcondition
+        self.assertEqual(self._uids(by_user), ["uid-3"])
+        self.assertEqual(self._uids(by_types), ["uid-2", "uid-4"])
+        self.assertEqual(by_missing, [])
+
+    def test_query__time_window(self):
+        # do it
+        result = self.storage.query(
+            since=datetime(2024, 2, 10, 10), until=datetime(2024, 3, 10, 10)
+        )
+        with_index = self.storage.query(user_id="alice", until=datetime(2024, 2, 1))
+
+        # postcondition
+        self.assertEqual(self._uids(result), ["uid-2", "uid-3", "uid-4"])
+        self.assertEqual(self._uids(with_index), ["uid-1"])
+
+    def test_query__path_prefix(self):
+        # do it
+        result = self.storage.query(path="/plone/a/")
+
+        # postcondition
+        self.assertEqual(self._uids(result), ["uid-1", "uid-2"])
+
+    def test_query__title_substring(self):
+        # do it
+        result = self.storage.query(title="UID-3", status="deleted")
+
+        # postcondition
+        self.assertEqual(self._uids(result), ["uid-3"])
+
+    def test_query__sort(self):
+        # do it
+        by_user = self.storage.query(sort_on="user_id")
+        newest_first = self.storage.query(reverse=True)
+
+        # postcondition
+        self.assertEqual(self._uids(by_user), ["uid-1", "uid-4", "uid-2", "uid-3"])
+        self.assertEqual(self._uids(newest_first), ["uid-4", "uid-3", "uid-2", "uid-1"])
+
+    def test_query__min_id_and_limit(self):
+        # setup
+        entry_ids = self.storage.query()
+
+        # do it
+        after_first = self.storage.query(min_id=entry_ids[0] + 1)
+        limited = self.storage.query(status="pending", min_id=entry_ids[0], limit=1)
+        newest = self.storage.query(reverse=True, limit=2)
+
+        # postcondition
+        self.assertEqual(after_first, entry_ids[1:])
+        self.assertEqual(self._uids(limited), ["uid-2"])
+        self.assertEqual(newest, entry_ids[:1:-1])
+
+    def test_query__sorted_with_limit(self):
+        # do it
+        first = self.storage.query(sort_on="user_id", limit=2)
+        last = self.storage.query(sort_on="user_id", reverse=True, limit=3)
+        filtered = self.storage.query(
+            sort_on="portal_type", reverse=True, status="deleted", limit=1
+        )
+
+        # postcondition
+        self.assertEqual(self._uids(first), ["uid-1", "uid-4"])
+        self.assertEqual(self._uids(last), ["uid-3", "uid-2", "uid-4"])
+        self.assertEqual(self._uids(filtered), ["uid-3"])
+
+    def test_query__reverse_reads_only_limit(self):
+        # setup
+        entry_ids = self.storage.query()
+
+        # do it
+        with mock.patch(
+            "interaktiv.gdpr.storage._reverse_keys", wraps=_reverse_keys
+        ) as reverse_keys:
+            result = self.storage.query(reverse=True, limit=1)
+
+        # postcondition
+        self.assertEqual(result, entry_ids[-1:])
+        # The older partitions were not walked
+        walked = {id(call.args[0]) for call in reverse_keys.call_args_list}
+        for partition_key in (202401, 202402):
+            self.assertNotIn(
+                id(self.storage._partitions[partition_key].entries), walked
+            )
+
+    def test_count(self):
+        # setup
+        entry_ids = self.storage.query()
+
+        # do it & postcondition
+        self.assertEqual(self.storage.count(), 4)
+        self.assertEqual(self.storage.count(min_id=entry_ids[1]), 3)
+        self.assertEqual(self.storage.count(status="deleted", user_id="bob"), 1)
+        self.assertEqual(self.storage.count(until=datetime(2024, 2, 15)), 2)
+        self.assertEqual(self.storage.count(user_id="carol"), 0)
+        self.assertEqual(self.storage.count(status=["deleted", "pending"]), 3)
+
+    def test_count__single_status_from_counter(self):
+        # do it
+        with mock.patch.object(
+            self.storage, "_select", wraps=self.storage._select
+        ) as select:
+            result = self.storage.count(status="deleted")
+
+        # postcondition
+        self.assertEqual(result, 2)
+        select.assert_not_called()
+
+    def test_query__invalid_sort_on(self):
+        # do it & postcondition
+        with self.assertRaises(ValueError):
+            self.storage.query(sort_on="title")
+
+
+class TestDeletionLogStorageConcurrency(InteraktivGDPRTestCase):
+    layer = INTERAKTIV_GDPR_INTEGRATION_TESTING
+
+    def setUp(self):
+        super().setUp()
+        self.tempdir = tempfile.mkdtemp()
+        self.db = DB(FileStorage(f"{self.tempdir}/Data.fs"))
+
+        transaction_manager = transaction.TransactionManager()
+        connection = self.db.open(transaction_manager=transaction_manager)
+        storage = DeletionLogStorage()
+        self.initial_id = storage.append(
+            _entry("uid-initial", iso_datetime="2024-01-15T10:00:00")
+        )
+        connection.root()["deletion_log"] = storage
+        transaction_manager.commit()
+        connection.close()
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tempdir)
+        super().tearDown()
+
+    def _open_connections(self, count: int) -> list:
+        connections = []
+        for _i in range(count):
+            transaction_manager = transaction.TransactionManager()
+            connection = self.db.open(transaction_manager=transaction_manager)
+            connections.append((transaction_manager, connection))
+        return connections
+
+    def test_concurrent_appends__no_conflicts(self):
+        # setup
+        connections = self._open_connections(4)
+        conflicts = 0
+
+        # do it
+        # Every connection appends based on the same initial state before
+        # any of them commits, like simultaneous requests on ZEO clients.
+        for number, (transaction_manager, connection) in enumerate(connections):
+            storage = connection.root()["deletion_log"]
+            for i in range(5):
+                storage.append(
+                    _entry(f"uid-{number}-{i}", iso_datetime="2024-01-15T10:00:00")
+                )
+
+        for transaction_manager, connection in connections:
+            try:
+                transaction_manager.commit()
+            except ConflictError:
+                conflicts += 1
+                transaction_manager.abort()
+            connection.close()
+
+        # postcondition
+        self.assertEqual(conflicts, 0)
+        connection = self.db.open()
+        storage = connection.root()["deletion_log"]
+        self.assertEqual(len(storage), 21)
+        self.assertEqual(len(list(storage.values())), 21)
+        self.assertEqual(storage.version.counter, 21)
+        self.assertEqual(storage.count_status("pending"), 21)
+        self.assertEqual(storage.verify_indexes(), [])
+        connection.close()
+
+    def test_concurrent_status_changes__no_conflicts(self):
+        # setup
+        connections = self._open_connections(2)
+        conflicts = 0
+        storage = connections[0][1].root()["deletion_log"]
+        entry_ids = [
+            self.initial_id,
+            storage.append(_entry("uid-other", iso_datetime="2024-01-15T10:00:00")),
+        ]
+        connections[0][0].commit()
+        connections[1][0].begin()
+
+        # do it
+        # One of the transactions moves the oldest pending entry.
+        for (transaction_manager, connection), entry_id in zip(
+            connections, entry_ids, strict=True
+        ):
+            connection.root()["deletion_log"].update(entry_id, status="deleted")
+
+        for transaction_manager, connection in connections:
+            try:
+                transaction_manager.commit()
+            except ConflictError:
+                conflicts += 1
+                transaction_manager.abort()
+            connection.close()
+
+        # postcondition
+        self.assertEqual(conflicts, 0)
+        connection = self.db.open()
+        storage = connection.root()["deletion_log"]
+        self.assertEqual(len(list(storage.get_ids("status", "deleted"))), 2)
+        self.assertEqual(storage.count_status("deleted"), 2)
+        self.assertEqual(storage.count_status("pending"), 0)
+        self.assertEqual(storage.verify_indexes(), [])
+        connection.close()
@@ -0,0 +1,151 @@
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from plone import api
+from plone.registry.interfaces import IRegistry
+from zope.annotation.interfaces import IAnnotations
+from zope.component import getUtility
+
+from interaktiv.gdpr.deletion_log import DeletionLog
+from interaktiv.gdpr.registry.deletion_log import IDeletionLogSchema
+from interaktiv.gdpr.storage import get_deletion_log_storage
+from interaktiv.gdpr.testing import (
+    INTERAKTIV_GDPR_INTEGRATION_TESTING,
+    InteraktivGDPRTestCase,
+)
+from interaktiv.gdpr.upgrades.deletion_log import (
+    MIGRATION_BATCHES_ANNOTATION_KEY,
+    _stage_registry_log,
+    migrate_deletion_log,
+)
+
+REGISTRY_LOG_RECORD = f"{IDeletionLogSchema.__identifier__}.deletion_log"
+
+
+def _entries(count: int) -> list[dict]:
+    start = datetime(2023, 1, 1)
+    statuses = ("pending", "deleted", "withdrawn")
+    return [
+        {
+            "uid": f"{i:032x}",
+            "datetime": (start + timedelta(minutes=i)).isoformat(),
+            "title": f"Document {i}",
+            "portal_type": "Document",
+            "original_path": f"/plone/folder-{i % 100}/document-{i}",
+            "user_id": "admin",
+            "subobject_count": 0,
+            "review_state": "published",
+            "status": statuses[i % 3],
+            "status_changed": (start + timedelta(minutes=i)).isoformat(),
+            "status_changed_by": "admin",
+        }
+        for i in range(count)
+    ]
+
+
+def _in_utc(entries: list[dict]) -> list[dict]:
+    # The registry log holds naive local times, the storage returns UTC
+    return [
+        {
+            **entry,
+            "datetime": datetime.fromisoformat(entry["datetime"])
+            .astimezone(timezone.utc)
+            .isoformat(),
+            "status_changed": datetime.fromisoformat(entry["status_changed"])
+            .astimezone(timezone.utc)
+            .isoformat(),
+        }
+        for entry in entries
+    ]
+
+
+def _set_registry_log(entries: list[dict]) -> None:
+    # Written directly, validating a large log against the JSON schema of
+    # the field takes too long for a test
+    getUtility(IRegistry).records._values[REGISTRY_LOG_RECORD] = entries
+
+
+class TestMigrateDeletionLog(InteraktivGDPRTestCase):
+    layer = INTERAKTIV_GDPR_INTEGRATION_TESTING
+
+    def setUp(self):
+        super().setUp()
+        DeletionLog.set_deletion_log([])
+
+    def test_migrate_deletion_log(self):
+        # setup
+        entries = _entries(5)
+        _set_registry_log(entries)
+
+        # do it
+        result = migrate_deletion_log(batch_size=2, commit=False)
+
+        # postcondition
+        self.assertEqual(result, 5)
+        self.assertEqual(DeletionLog.get_deletion_log(), _in_utc(entries))
+        registry_log = api.portal.get_registry_record(
+            name="deletion_log", interface=IDeletionLogSchema
+        )
+        self.assertEqual(registry_log, [])
+        self.assertNotIn(MIGRATION_BATCHES_ANNOTATION_KEY, IAnnotations(self.portal))
+
+    def test_migrate_deletion_log__resumes_remaining_batches(self):
+        # setup
+        entries = _entries(5)
+        _set_registry_log(entries)
+        # Simulate an interrupted migration that committed its first batch
+        batches = _stage_registry_log(batch_size=2)
+        DeletionLog.set_deletion_log(list(batches[0]))
+        del batches[0]
+
+        # do it
+        result = migrate_deletion_log(batch_size=2, commit=False)
+
+        # postcondition
+        self.assertEqual(result, 3)
+        self.assertEqual(DeletionLog.get_deletion_log(), _in_utc(entries))
+        self.assertNotIn(MIGRATION_BATCHES_ANNOTATION_KEY, IAnnotations(self.portal))
+
+    def test_migrate_deletion_log__skips_invalid_entries(self):
+        # setup
+        _set_registry_log([*_entries(1), "garbage", {"title": "no uid"}])
+
+        # do it
+        result = migrate_deletion_log(commit=False)
+
+        # postcondition
+        self.assertEqual(result, 1)
+        self.assertEqual(len(DeletionLog.get_deletion_log()), 1)
+
+
+class TestMigrateDeletionLogLarge(InteraktivGDPRTestCase):
+    layer = INTERAKTIV_GDPR_INTEGRATION_TESTING
+    # Takes a few minutes, run with zope-testrunner --at-level 2
+    level = 2
+
+    def test_migrate_deletion_log__200k_entries_bounded_memory(self):
+        # setup
+        DeletionLog.set_deletion_log([])
+        tracemalloc.start()
+        entries = _entries(200_000)
+        registry_log_size = tracemalloc.get_traced_memory()[0]
+        _set_registry_log(entries)
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+
+        # do it
+        try:
+            result = migrate_deletion_log(commit=False)
+            peak = tracemalloc.get_traced_memory()[1] - baseline
+        finally:
+            tracemalloc.stop()
+
+        # postcondition
+        self.assertEqual(result, 200_000)
+        storage = get_deletion_log_storage()
+        self.assertEqual(len(storage), 200_000)
+        self.assertEqual(len(list(storage.get_ids("status", "pending"))), 66_667)
+        # The entries are never all materialized at once: the migration
+        # needs less memory than the registry log it migrates, although
+        # the savepoints keep some bookkeeping per written object.
+        self.assertLess(peak, registry_log_size * 0.75)
@@ -0,0 +1,114 @@
+import json
+from unittest import mock
+
+import plone.api as api
+from freezegun import freeze_time
+
+from interaktiv.gdpr.deletion_log import DeletionLog
+from interaktiv.gdpr.scheduled_deletion import get_scheduled_deletion_run, get_worker
+from interaktiv.gdpr.testing import (
+    INTERAKTIV_GDPR_INTEGRATION_TESTING,
+    InteraktivGDPRTestCase,
+)
+from interaktiv.gdpr.views.scheduled_deletion import ScheduledDeletionView
+
+
+class TestScheduledDeletionView(InteraktivGDPRTestCase):
+    layer = INTERAKTIV_GDPR_INTEGRATION_TESTING
+
+    def setUp(self):
+        super().setUp()
+        with freeze_time("2000-01-01 12:00:00"):
+            documents = [
+                api.content.create(
+                    container=self.container, type="Document", id=f"doc-{i}"
+                )
+                for i in range(5)
+            ]
+            DeletionLog.add_entries(documents, status="pending")
+
+        # Integration tests must not commit
+        patcher = mock.patch("interaktiv.gdpr.views.scheduled_deletion.transaction")
+        self.transaction = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _call(self, **params) -> dict:
+        self.request.form.update(params)
+        return json.loads(ScheduledDeletionView(self.portal, self.request)())
+
+    def test_call__deletes_in_batches(self):
+        # do it
+        result = self._call(batch_size="2")
+
+        # postcondition
+        self.assertTrue(result["complete"])
+        self.assertFalse(result["resumed"])
+        self.assertEqual(result["batches"], 3)
+        self.assertEqual(result["deleted"], 5)
+        self.assertEqual(result["remaining"], 0)
+        self.assertEqual(list(self.container.objectIds()), [])
+        self.assertEqual(DeletionLog.count_entries_by_status("deleted"), 5)
+        # One commit for the start of the run, one per batch
+        self.assertEqual(self.transaction.commit.call_count, 4)
+        self.assertIsNone(result["next_expiry"])
+        self.assertIsNone(get_scheduled_deletion_run())
+
+    def test_call__time_limit_and_resume(self):
+        # setup
+        first = self._call(batch_size="2", max_seconds="0.000001")
+
+        # precondition
+        self.assertFalse(first["complete"])
+        self.assertEqual(first["batches"], 1)
+        self.assertEqual(first["remaining"], 3)
+        self.assertEqual(len(self.container.objectIds()), 3)
+        self.assertEqual(first["next_expiry"], "2000-01-31T12:00:00+00:00")
+
+        # do it
+        result = self._call(batch_size="2", max_seconds="60")
+
+        # postcondition
+        self.assertTrue(result["complete"])
+        self.assertTrue(result["resumed"])
+        self.assertEqual(result["deleted"], 3)
+        self.assertEqual(result["run"]["deleted"], 5)
+        self.assertEqual(result["run"]["batches"], 3)
+        self.assertIsNone(get_scheduled_deletion_run())
+
+    def test_call__parallel_workers(self):
+        # setup
+        uids = {obj.UID(): obj.getId() for obj in self.container.objectValues()}
+        shares = [
+            {uid for uid in uids if get_worker(uid, 2) == worker} for worker in (0, 1)
+        ]
+
+        # do it
+        first = self._call(worker="0", workers="2")
+        remaining_ids = set(self.container.objectIds())
+        second = self._call(worker="1", workers="2")
+
+        # postcondition
+        self.assertEqual(first["deleted"], len(shares[0]))
+        self.assertEqual(remaining_ids, {uids[uid] for uid in shares[1]})
+        self.assertTrue(first["complete"])
+        self.assertTrue(second["complete"])
+        self.assertEqual(second["deleted"], len(shares[1]))
+        self.assertEqual(second["archived"], 0)
+        self.assertEqual(list(self.container.objectIds()), [])
+
+    def test_call__invalid_worker(self):
+        # do it
+        result = self._call(worker="2", workers="2")
+
+        # postcondition
+        self.assertEqual(result["error"]["type"], "BadRequest")
+        self.assertEqual(self.request.response.getStatus(), 400)
+        self.assertEqual(len(self.container.objectIds()), 5)
+
+    def test_call__invalid_params_use_defaults(self):
+        # do it
+        result = self._call(batch_size="none", max_seconds="-1")
+
+        # postcondition
+        self.assertTrue(result["complete"])
+        self.assertEqual(result["batches"], 1)
@@ -0,0 +1,285 @@
+from unittest import mock
+
+import plone.api as api
+import transaction
+from plone.app.testing import logout
+from zExceptions import Unauthorized
+from ZTUtils.Lazy import Lazy
+
+from interaktiv.gdpr.config import MARKED_FOR_DELETION_REQUEST_PARAM_NAME
+from interaktiv.gdpr.deletion_log import DeletionLog
+from interaktiv.gdpr.interfaces import IMarkedForDeletion
+from interaktiv.gdpr.registry.deletion_log import IGDPRSettingsSchema
+from interaktiv.gdpr.testing import (
+    INTERAKTIV_GDPR_FUNCTIONAL_TESTING,
+    INTERAKTIV_GDPR_INTEGRATION_TESTING,
+    InteraktivGDPRTestCase,
+)
+from interaktiv.gdpr.views.traverser import MarkedForDeletionTraverser
+from interaktiv.gdpr.virtual_deletion import (
+    get_hidden_rids,
+    get_marked_paths,
+    is_marked_for_deletion,
+    is_virtual_mode,
+    mark_for_deletion,
+    unmark_for_deletion,
+)
+
+SHOW_MARKED = {"show_marked_for_deletion": True}
+
+
+class TestVirtualDeletion(InteraktivGDPRTestCase):
+    layer = INTERAKTIV_GDPR_INTEGRATION_TESTING
+
+    def setUp(self):
+        super().setUp()
+        api.portal.set_registry_record(
+            name="marked_deletion_enabled", interface=IGDPRSettingsSchema, value=True
+        )
+        api.portal.set_registry_record(
+            name="marked_deletion_mode", interface=IGDPRSettingsSchema, value="virtual"
+        )
+        self.tree = api.content.create(
+            container=self.portal, type="Document", id="tree", title="Tree"
+        )
+        self.child = api.content.create(
+            container=self.tree, type="Document", id="child", title="Child"
+        )
+        self.other = api.content.create(
+            container=self.portal, type="Document", id="other", title="Other"
+        )
+        self.catalog = api.portal.get_tool("portal_catalog")
+
+    def _search_ids(self, **query) -> set[str]:
+        return {brain.getId for brain in self.catalog(portal_type="Document", **query)}
+
+    def test_is_virtual_mode(self):
+        # precondition
+        self.assertTrue(is_virtual_mode())
+
+        # do it
+        api.portal.set_registry_record(
+            name="marked_deletion_mode",
+            interface=IGDPRSettingsSchema,
+            value="container",
+        )
+
+        # postcondition
+        self.assertFalse(is_virtual_mode())
+
+    def test_mark_for_deletion(self):
+        # do it
+        mark_for_deletion(self.tree)
+
+        # postcondition
+        self.assertTrue(IMarkedForDeletion.providedBy(self.tree))
+        self.assertFalse(IMarkedForDeletion.providedBy(self.child))
+        self.assertTrue(is_marked_for_deletion(self.child))
+        self.assertFalse(is_marked_for_deletion(self.other))
+        self.assertEqual(get_marked_paths(self.catalog), ["/plone/tree"])
+
+    def test_get_hidden_rids(self):
+        # precondition
+        self.assertIsNone(get_hidden_rids(self.catalog))
+
+        # do it
+        mark_for_deletion(self.tree)
+
+        # postcondition
+        rids = {
+            brain.getRID()
+            for brain in self.catalog.unrestrictedSearchResults(path="/plone/tree")
+        }
+        self.assertEqual(set(get_hidden_rids(self.catalog)), rids)
+        self.assertEqual(len(rids), 2)
+
+    def test_search__hides_marked_subtree(self):
+        # do it
+        mark_for_deletion(self.tree)
+
+        # postcondition
+        self.assertEqual(self._search_ids(), {"other"})
+        self.assertEqual(
+            self._search_ids(show_marked_for_deletion=True), {"tree", "child", "other"}
+        )
+        self.assertEqual(len(self.catalog(portal_type="Document")), 1)
+
+    def test_search__sort_limit_and_batching(self):
+        # setup
+        mark_for_deletion(self.tree)
+
+        # do it
+        results = self.catalog(
+            portal_type="Document", sort_on="getId", sort_limit=1, b_size=1
+        )
+
+        # postcondition
+        self.assertIsInstance(results, Lazy)
+        # The marked child sorts first, it is left out before the limit
+        self.assertEqual([brain.getId for brain in results], ["other"])
+
+    def test_search__uid_query(self):
+        # setup
+        mark_for_deletion(self.tree)
+
+        # do it
+        by_child = self.catalog(UID=self.child.UID())
+        by_both = self.catalog(UID={"query": [self.child.UID(), self.other.UID()]})
+
+        # postcondition
+        self.assertEqual(len(by_child), 0)
+        self.assertEqual([brain.getId for brain in by_both], ["other"])
+
+    def test_search__container_mode_leaves_query(self):
+        # setup
+        mark_for_deletion(self.tree)
+        api.portal.set_registry_record(
+            name="marked_deletion_mode",
+            interface=IGDPRSettingsSchema,
+            value="container",
+        )
+
+        # do it
+        with mock.patch(
+            "interaktiv.gdpr.virtual_deletion.get_marked_paths"
+        ) as get_marked_paths_mock:
+            result = self._search_ids()
+
+        # postcondition
+        get_marked_paths_mock.assert_not_called()
+        self.assertEqual(result, {"tree", "child", "other"})
+
+    def test_unmark_for_deletion(self):
+        # setup
+        mark_for_deletion(self.tree)
+
+        # do it
+        unmark_for_deletion(self.tree)
+
+        # postcondition
+        self.assertFalse(is_marked_for_deletion(self.child))
+        self.assertEqual(self._search_ids(), {"tree", "child", "other"})
+
+    def test_copy_is_not_marked(self):
+        # setup
+        mark_for_deletion(self.tree)
+
+        # do it
+        copy = api.content.copy(source=self.tree, target=self.other)
+
+        # postcondition
+        self.assertFalse(IMarkedForDeletion.providedBy(copy))
+        self.assertIn("tree", self._search_ids())
+
+    def test_manage_delObjects__marks_in_place(self):
+        # setup
+        self.request.set(MARKED_FOR_DELETION_REQUEST_PARAM_NAME, True)
+
+        # do it
+        self.portal.manage_delObjects(["tree"])
+
+        # postcondition
+        self.assertIn("tree", self.portal.objectIds())
+        self.assertNotIn("tree", self.container.objectIds())
+        self.assertTrue(IMarkedForDeletion.providedBy(self.tree))
+        entry = DeletionLog.get_pending_entry_by_uid(self.tree.UID())
+        self.assertEqual(entry["original_path"], "/plone/tree")
+        self.assertEqual(self._search_ids(), {"other"})
+
+    def test_purge_of_marked_item__logs_single_entry(self):
+        # setup
+        self.request.set(MARKED_FOR_DELETION_REQUEST_PARAM_NAME, True)
+        self.portal.manage_delObjects(["tree"])
+        self.request.set(MARKED_FOR_DELETION_REQUEST_PARAM_NAME, False)
+
+        # do it
+        self.tree.manage_delObjects(["child"])
+
+        # postcondition
+        self.assertEqual(DeletionLog.get_deletion_log_length(), 1)
+
+    def test_traverser__restricts_access(self):
+        # setup
+        mark_for_deletion(self.tree)
+        traverser = MarkedForDeletionTraverser(self.tree, self.request)
+
+        # precondition
+        self.assertEqual(traverser.publishTraverse(self.request, "child"), self.child)
+
+        # do it
+        logout()
+
+        # postcondition
+        with self.assertRaises(Unauthorized):
+            traverser.publishTraverse(self.request, "child")
+        with self.assertRaises(Unauthorized):
+            traverser.browserDefault(self.request)
+
+
+class TestVirtualDeletionCommitted(InteraktivGDPRTestCase):
+    """The hidden records are only cached for the committed catalog."""
+
+    layer = INTERAKTIV_GDPR_FUNCTIONAL_TESTING
+
+    def setUp(self):
+        super().setUp()
+        api.portal.set_registry_record(
+            name="marked_deletion_enabled", interface=IGDPRSettingsSchema, value=True
+        )
+        api.portal.set_registry_record(
+            name="marked_deletion_mode", interface=IGDPRSettingsSchema, value="virtual"
+        )
+        self.tree = api.content.create(
+            container=self.portal, type="Document", id="tree", title="Tree"
+        )
+        self.child = api.content.create(
+            container=self.tree, type="Document", id="child", title="Child"
+        )
+        self.other = api.content.create(
+            container=self.portal, type="Document", id="other", title="Other"
+        )
+        self.catalog = api.portal.get_tool("portal_catalog")
+
+    def test_get_hidden_rids__cached_until_catalog_changes(self):
+        # setup
+        mark_for_deletion(self.tree)
+        transaction.commit()
+
+        # do it
+        with mock.patch(
+            "interaktiv.gdpr.virtual_deletion.get_marked_paths",
+            wraps=get_marked_paths,
+        ) as get_marked_paths_mock:
+            first = get_hidden_rids(self.catalog)
+            second = get_hidden_rids(self.catalog)
+            api.content.create(container=self.tree, type="Document", id="new")
+            changed = get_hidden_rids(self.catalog)
+
+        # postcondition
+        self.assertEqual(get_marked_paths_mock.call_count, 2)
+        self.assertIs(first, second)
+        self.assertEqual(len(changed), 3)
+
+    def test_search__large_marked_subtree(self):
+        # setup
+        for i in range(100):
+            api.content.create(
+                container=self.tree, type="Document", id=f"doc-{i}", title=f"Doc {i}"
+            )
+        mark_for_deletion(self.tree)
+        transaction.commit()
+
+        # do it
+        with mock.patch(
+            "interaktiv.gdpr.virtual_deletion.get_marked_paths",
+            wraps=get_marked_paths,
+        ) as get_marked_paths_mock:
+            documents = self.catalog(portal_type="Document", sort_on="getId")
+            below_tree = self.catalog(path="/plone/tree")
+
+        # postcondition
+        self.assertEqual([brain.getId for brain in documents], ["other"])
+        self.assertEqual(len(below_tree), 0)
+        self.assertEqual(len(self.catalog(path="/plone/tree", **SHOW_MARKED)), 102)
+        # The hidden records are looked up once for both searches
+        self.assertEqual(get_marked_paths_mock.call_count, 1)
@@ -0,0 +1,107 @@
+import transaction
+from BTrees.IOBTree import IOBTree
+from persistent.list import PersistentList
+from plone import api
+from zope.annotation.interfaces import IAnnotations
+
+from interaktiv.gdpr import logger
+from interaktiv.gdpr.registry.deletion_log import IDeletionLogSchema
+from interaktiv.gdpr.storage import get_deletion_log_storage
+
+# Number of registry log entries migrated per savepoint or commit
+MIGRATION_BATCH_SIZE = 5000
+
+# Annotation holding the batches of registry log entries that still have to
+# be migrated, so an interrupted migration continues where it stopped
+MIGRATION_BATCHES_ANNOTATION_KEY = "interaktiv.gdpr.deletion_log_migration"
+
+
+def _get_registry_log() -> list:
+    try:
+        return (
+            api.portal.get_registry_record(
+                name="deletion_log", interface=IDeletionLogSchema
+            )
+            or []
+        )
+    except (KeyError, api.exc.InvalidParameterError):
+        return []
+
+
+def _finish_batch(commit: bool) -> None:
+    if commit:
+        transaction.commit()
+    else:
+        transaction.savepoint(optimistic=True)
+    # Turn the objects written so far back into ghosts
+    api.portal.get()._p_jar.cacheGC()
+
+
+def _stage_registry_log(batch_size: int) -> IOBTree:
+    # The registry log is split into persistent batches and the registry
+    # record is emptied right away. Each batch is loaded on its own later
+    # and the registry no longer carries the log.
+    registry_log = _get_registry_log()
+    batches = IOBTree()
+    for number, start in enumerate(range(0, len(registry_log), batch_size)):
+        batches[number] = PersistentList(registry_log[start : start + batch_size])
+
+    IAnnotations(api.portal.get())[MIGRATION_BATCHES_ANNOTATION_KEY] = batches
+    api.portal.set_registry_record(
+        name="deletion_log", interface=IDeletionLogSchema, value=[]
+    )
+    logger.info(
+        f"Staged {len(registry_log)} deletion log entries in {len(batches)} "
+        f"batches for migration"
+    )
+    return batches
+
+
+def migrate_deletion_log(
+    batch_size: int = MIGRATION_BATCH_SIZE, commit: bool = True
+) -> int:
+    """Move the entries of the deletion_log registry record into the
+    deletion log storage.
+
+    The entries are migrated in batches of batch_size. After every batch
+    the transaction is committed (or, with commit=False, a savepoint is
+    taken) and the pickle cache is reduced, so memory stays bounded. A
+    rerun after an interruption continues with the remaining batches.
+
+    Returns the number of entries migrated by this run.
+    """
+    annotations = IAnnotations(api.portal.get())
+    batches = annotations.get(MIGRATION_BATCHES_ANNOTATION_KEY)
+    if batches is None:
+        batches = _stage_registry_log(batch_size)
+        _finish_batch(commit)
+    else:
+        logger.info(
+            f"Resuming deletion log migration with {len(batches)} remaining batches"
+        )
+
+    storage = get_deletion_log_storage(create=True)
+    migrated = 0
+    remaining = len(batches)
+    for number in list(batches.keys()):
+        for entry in batches[number]:
+            if isinstance(entry, dict) and entry.get("uid"):
+                storage.append(entry)
+                migrated += 1
+            else:
+                logger.warning(f"Skipping invalid deletion log entry: {entry!r}")
+
+        del batches[number]
+        remaining -= 1
+        _finish_batch(commit)
+        logger.info(
+            f"Migrated {migrated} deletion log entries, {remaining} batches remaining"
+        )
+
+    del annotations[MIGRATION_BATCHES_ANNOTATION_KEY]
+    logger.info(f"Deletion log migration finished, {migrated} entries migrated")
+    return migrated
+
+
+def migrate_deletion_log_to_storage(context) -> None:
+    migrate_deletion_log()
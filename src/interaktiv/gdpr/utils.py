@@ -1,3 +1,4 @@
+from email.utils import formatdate
 from typing import Any
 
 from plone import api
@@ -5,6 +6,7 @@ from zope.i18n import translate
 from zope.interface import Interface
 from zope.publisher.interfaces.browser import IBrowserRequest
 
+from interaktiv.gdpr import _
 from interaktiv.gdpr.registry.deletion_log import IGDPRSettingsSchema
 
 
@@ -17,6 +19,27 @@ def get_registry_setting(
         return default
 
 
+def is_not_modified(
+    request: IBrowserRequest, etag: str, last_modified: float | None = None
+) -> bool:
+    """Set the ETag and Last-Modified headers of the response.
+
+    Returns True if the If-None-Match header of the request matches the
+    ETag, i.e. the client may reuse its copy and gets a 304.
+    """
+    etag = f'"{etag}"'
+    response = request.response
+    response.setHeader("ETag", etag)
+    if last_modified:
+        response.setHeader("Last-Modified", formatdate(last_modified, usegmt=True))
+    # Clients revalidate on every request, so a change is seen immediately
+    response.setHeader("Cache-Control", "no-cache")
+
+    if_none_match = request.getHeader("If-None-Match") or ""
+    etags = {value.strip().removeprefix("W/") for value in if_none_match.split(",")}
+    return etag in etags or "*" in etags
+
+
 def create_error_response(
     request: IBrowserRequest,
     status_code: int,
@@ -56,3 +79,19 @@ def create_success_response(
     response.update(extra_fields)
 
     return response
+
+
+def create_job_response(request: IBrowserRequest, job: Any) -> dict[str, Any]:
+    """Return the 202 response for a job queued by interaktiv.gdpr.jobs."""
+    url = f"{api.portal.get().absolute_url()}/@gdpr-jobs/{job.id}"
+    request.response.setHeader("Location", url)
+
+    return create_success_response(
+        request,
+        _(
+            'The deletion of "${title}" runs in the background',
+            mapping={"title": job.title},
+        ),
+        status_code=202,
+        job={"@id": url, **job.to_dict()},
+    )
@@ -0,0 +1,38 @@
+from Products.Five.browser import BrowserView
+from zExceptions import NotFound
+from ZPublisher.Iterators import filestream_iterator
+
+from interaktiv.gdpr.archive import get_deletion_log_archive
+from interaktiv.gdpr.storage import timestamp_to_datetime
+
+
+class DeletionLogArchiveDownloadView(BrowserView):
+    """Stream an archive segment as gzip compressed JSON Lines file."""
+
+    def __call__(self) -> filestream_iterator | bytes:
+        archive = get_deletion_log_archive()
+        try:
+            segment_id = int(self.request.get("segment", ""))
+        except (ValueError, TypeError):
+            segment_id = None
+
+        segment = None
+        if archive is not None and segment_id is not None:
+            segment = archive.get_segment(segment_id)
+        if segment is None:
+            raise NotFound("Archive segment not found")
+
+        first = timestamp_to_datetime(segment.first_timestamp)
+        last = timestamp_to_datetime(segment.last_timestamp)
+        filename = f"deletion-log-{first:%Y%m%d}-{last:%Y%m%d}.jsonl.gz"
+
+        response = self.request.response
+        response.setHeader("Content-Type", "application/gzip")
+        response.setHeader("Content-Disposition", f'attachment; filename="{filename}"')
+        response.setHeader("Content-Length", str(segment.size))
+
+        # The segment is only readable from the blob directory once committed
+        if segment.blob._p_blob_uncommitted:
+            with segment.open() as blob_file:
+                return blob_file.read()
+        return filestream_iterator(segment.blob.committed(), "rb")
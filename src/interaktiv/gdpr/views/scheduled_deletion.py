@@ -0,0 +1,133 @@
+import json
+import time
+
+import transaction
+from plone.protect.interfaces import IDisableCSRFProtection
+from Products.Five.browser import BrowserView
+from ZODB.POSException import ConflictError
+from zope.interface import alsoProvides
+
+from interaktiv.gdpr import logger
+from interaktiv.gdpr.deletion_log import DeletionLog
+from interaktiv.gdpr.scheduled_deletion import (
+    ScheduledDeletionRun,
+    finish_scheduled_deletion_run,
+    get_scheduled_deletion_run,
+)
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_MAX_SECONDS = 60.0
+# How often a batch is tried again after a conflict with another worker
+MAX_CONFLICT_RETRIES = 3
+
+
+class ScheduledDeletionView(BrowserView):
+    """Run the scheduled deletion in batches, meant to be called by a cronjob.
+
+    Every batch of expired items is deleted and committed in a transaction
+    of its own. No new batch is started once max_seconds have passed. The
+    cursor of the run is stored with each batch, so the next call resumes
+    an interrupted or time limited run. Returns a JSON report.
+
+    Several workers, e.g. on different ZEO clients, can purge at once
+    when each is called with the same workers count and its own worker
+    number (0 to workers - 1). Each worker deletes a disjoint share of the
+    expired items and keeps its own cursor. Only worker 0 rotates the log.
+    """
+
+    def __call__(self) -> str:
+        # The view commits on its own and is not called from a form
+        alsoProvides(self.request, IDisableCSRFProtection)
+        self.request.response.setHeader("Content-Type", "application/json")
+
+        batch_size = self._get_number_param("batch_size", DEFAULT_BATCH_SIZE, int)
+        max_seconds = self._get_number_param("max_seconds", DEFAULT_MAX_SECONDS, float)
+        worker, workers = self._get_worker_params()
+        if worker is None:
+            self.request.response.setStatus(400)
+            return json.dumps(
+                {
+                    "error": {
+                        "type": "BadRequest",
+                        "message": "workers must be a positive integer and worker "
+                        "a number from 0 to workers - 1",
+                    }
+                }
+            )
+        started = time.monotonic()
+
+        resumed = get_scheduled_deletion_run(worker=worker, workers=workers) is not None
+        archived = 0
+        if not resumed and worker == 0:
+            archived = DeletionLog.rotate_deletion_log()
+        run = get_scheduled_deletion_run(create=True, worker=worker, workers=workers)
+        previous = {
+            "batches": run.batches,
+            "deleted": run.deleted,
+            "skipped": run.skipped,
+        }
+        transaction.commit()
+
+        while True:
+            remaining = self._run_batch(run, batch_size)
+            if not remaining or time.monotonic() - started >= max_seconds:
+                break
+
+        next_expiry = DeletionLog.get_next_expiry()
+        report = {
+            "complete": not remaining,
+            "resumed": resumed,
+            "worker": worker,
+            "workers": workers,
+            "archived": archived,
+            "batches": run.batches - previous["batches"],
+            "deleted": run.deleted - previous["deleted"],
+            "skipped": run.skipped - previous["skipped"],
+            "remaining": remaining,
+            "run": {
+                "started": run.started,
+                "batches": run.batches,
+                "deleted": run.deleted,
+                "skipped": run.skipped,
+            },
+            "next_expiry": next_expiry.isoformat() if next_expiry else None,
+            "seconds": round(time.monotonic() - started, 3),
+        }
+
+        return json.dumps(report)
+
+    @staticmethod
+    def _run_batch(run: ScheduledDeletionRun, batch_size: int) -> int:
+        for attempt in range(MAX_CONFLICT_RETRIES + 1):
+            try:
+                remaining = DeletionLog.run_scheduled_deletion_batch(run, batch_size)
+                if not remaining:
+                    finish_scheduled_deletion_run(run.worker, run.workers)
+                transaction.commit()
+                return remaining
+            except ConflictError:
+                # The abort also resets the cursor of the run
+                transaction.abort()
+                if attempt == MAX_CONFLICT_RETRIES:
+                    raise
+                logger.info(
+                    f"Scheduled deletion batch of worker {run.worker} conflicted, "
+                    "trying again"
+                )
+
+    def _get_worker_params(self) -> tuple[int | None, int]:
+        try:
+            worker = int(self.request.get("worker", 0))
+            workers = int(self.request.get("workers", 1))
+        except (ValueError, TypeError):
+            return None, 1
+        if workers < 1 or not 0 <= worker < workers:
+            return None, 1
+        return worker, workers
+
+    def _get_number_param(self, name: str, default: float, type_: type) -> float:
+        try:
+            value = type_(self.request.get(name, default))
+        except (ValueError, TypeError):
+            return default
+        return value if value > 0 else default
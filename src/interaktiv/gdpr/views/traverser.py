@@ -3,6 +3,7 @@ from zope.publisher.interfaces import IPublishTraverse
 from ZPublisher.BaseRequest import DefaultPublishTraverse
 
 from interaktiv.gdpr.views import check_access_allowed, is_inside_deletion_container
+from interaktiv.gdpr.virtual_deletion import is_marked_for_deletion
 
 
 @implementer(IPublishTraverse)
@@ -20,7 +21,25 @@ class MarkedDeletionContainerRESTTraverser(DefaultPublishTraverse):
     def publishTraverse(self, request, name):
         obj = super().publishTraverse(request, name)
 
-        if is_inside_deletion_container(self.context):
+        if is_inside_deletion_container(self.context) or is_marked_for_deletion(
+            self.context
+        ):
             check_access_allowed(self.context)
 
         return obj
+
+
+@implementer(IPublishTraverse)
+class MarkedForDeletionTraverser(DefaultPublishTraverse):
+    """Restrict access to content marked for deletion in place and its
+    subtree, which is traversed through the marked content."""
+
+    def publishTraverse(self, request, name):
+        check_access_allowed(self.context)
+
+        return super().publishTraverse(request, name)
+
+    def browserDefault(self, request):
+        check_access_allowed(self.context)
+
+        return super().browserDefault(request)
@@ -0,0 +1,106 @@
+from Acquisition import aq_base, aq_chain, aq_inner, aq_parent
+from BTrees.IIBTree import IISet
+from plone.dexterity.content import DexterityContent
+from Products.ZCatalog.query import IndexQuery
+from Products.ZCatalog.ZCatalog import ZCatalog
+from zope.interface import alsoProvides, noLongerProvides
+from zope.lifecycleevent.interfaces import IObjectCopiedEvent
+
+from interaktiv.gdpr import logger
+from interaktiv.gdpr.interfaces import IMarkedForDeletion
+from interaktiv.gdpr.move import get_moving_paths
+from interaktiv.gdpr.settings import get_gdpr_settings
+
+# Only the marker of the marked item itself is indexed, its subtree is
+# hidden by the path of the item, see get_hidden_rids()
+MARKER_INDEX = "object_provides"
+
+
+def is_virtual_mode() -> bool:
+    return get_gdpr_settings().marked_deletion_mode == "virtual"
+
+
+def mark_for_deletion(obj: DexterityContent) -> None:
+    """Hide obj and its subtree in place.
+
+    Only obj is reindexed, so the cost does not depend on the size of the
+    subtree.
+    """
+    alsoProvides(obj, IMarkedForDeletion)
+    obj.reindexObject(idxs=[MARKER_INDEX])
+    logger.info(f"Marked object '{obj.title_or_id()}' for deletion in place")
+
+
+def unmark_for_deletion(obj: DexterityContent) -> None:
+    noLongerProvides(obj, IMarkedForDeletion)
+    obj.reindexObject(idxs=[MARKER_INDEX])
+    logger.info(f"Unmarked object '{obj.title_or_id()}' for deletion")
+
+
+def is_marked_for_deletion(obj: DexterityContent) -> bool:
+    """Whether obj or one of its parents is marked for deletion in place."""
+    return any(IMarkedForDeletion.providedBy(item) for item in aq_chain(aq_inner(obj)))
+
+
+def get_marked_paths(catalog: ZCatalog) -> list[str]:
+    brains = catalog.unrestrictedSearchResults(
+        **{MARKER_INDEX: IMarkedForDeletion.__identifier__}
+    )
+    return [brain.getPath() for brain in brains]
+
+
+def _get_catalog_version(catalog: ZCatalog) -> tuple[int, bytes | None] | None:
+    # Changes with every committed change of the catalog. None while the
+    # catalog has changes in the current transaction, which may still be
+    # aborted and reuse the counter.
+    value = catalog.getCounter()
+    counter = getattr(aq_base(catalog), "_counter", None)
+    if counter is None:
+        return value, None
+    if counter._p_changed:
+        return None
+    return value, counter._p_serial
+
+
+def get_hidden_rids(catalog: ZCatalog, marked: bool = True) -> IISet | None:
+    """Return the catalog record ids searches leave out, or None if there
+    are none.
+
+    These are the items marked for deletion in place and their subtrees,
+    unless marked is False, and the items still cataloged at the old path
+    of a subtree moved by a deletion job, see get_moving_paths(). The
+    subtrees are looked up in the path index by the paths of their roots,
+    so nothing below them has to be indexed as marked. The result is kept
+    on the catalog until the catalog changes, so searches don't look it up
+    again.
+    """
+    moving_paths = get_moving_paths(aq_parent(aq_inner(catalog)))
+    moving = tuple(moving_paths) if moving_paths else ()
+    if not marked and not moving:
+        return None
+
+    version = _get_catalog_version(catalog)
+    key = (version, marked, moving)
+    cached = getattr(aq_base(catalog), "_v_gdpr_hidden_rids", None)
+    if version is not None and cached is not None and cached[0] == key:
+        return cached[1]
+
+    rids = None
+    paths = list(moving)
+    if marked:
+        paths.extend(get_marked_paths(catalog))
+    if paths:
+        index = catalog._catalog.getIndex("path")
+        query = IndexQuery(
+            {"path": {"query": paths, "operator": "or"}}, "path", index.query_options
+        )
+        # A copy, the result may be a set of the index itself
+        rids = IISet(index.query_index(query) or ())
+    if version is not None:
+        catalog._v_gdpr_hidden_rids = (key, rids)
+    return rids
+
+
+def handle_object_copied(obj: DexterityContent, event: IObjectCopiedEvent) -> None:
+    # A copy of an item marked for deletion is not marked itself
+    noLongerProvides(obj, IMarkedForDeletion)